@@ -0,0 +1,123 @@
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.signals import request_finished
+from django.db import connections, models
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Userprofile
+
+logger = logging.getLogger(__name__)
+
+# A user's last_activity is moved forward at most once per this many seconds
+MIN_INTERVAL = getattr(settings, 'ACTIVITY_MIN_INTERVAL', 60)
+
+
+def flush_interval():
+    """
+    Buffered heartbeats are written by the first request to finish at least
+    this many seconds after the previous flush, and by the worker_exit hook in
+    gunicorn.conf.py when a worker shuts down. None turns the buffer off and
+    ignores heartbeats. Read per call so tests can override it.
+    """
+    return getattr(settings, 'ACTIVITY_FLUSH_INTERVAL', 30)
+
+
+HEARTBEATS_KEY = 'activity:heartbeats'
+WRITES_KEY = 'activity:writes'
+
+_pending = {}  # profile id -> latest activity not yet written
+_heartbeats = 0
+_lock = threading.Lock()
+_last_flush = time.monotonic()
+
+
+def record(profile):
+    """
+    Note that the user behind ``profile`` was just active. The write is
+    skipped when the stored timestamp is still fresh, and otherwise buffered
+    until the next flush.
+    """
+    global _heartbeats
+    if flush_interval() is None:
+        return
+    now = timezone.now()
+    threshold = now - timedelta(seconds=MIN_INTERVAL)
+
+    with _lock:
+        _heartbeats += 1
+        last = _pending.get(profile.pk, profile.last_activity)
+        if last is None or last <= threshold:
+            _pending[profile.pk] = now
+
+
+@receiver(request_finished)
+def flush_if_due(sender, **kwargs):
+    # After the response, on the thread and database of the request that ends
+    interval = flush_interval()
+    with _lock:
+        due = _heartbeats and interval is not None and time.monotonic() - _last_flush >= interval
+    if due:
+        try:
+            flush()
+        except Exception:
+            logger.exception("Could not flush activity heartbeats")
+
+
+def flush():
+    """Write every buffered heartbeat in one UPDATE. Returns the number of rows written."""
+    global _heartbeats, _last_flush
+    with _lock:
+        pending = dict(_pending)
+        heartbeats = _heartbeats
+        _pending.clear()
+        _heartbeats = 0
+        _last_flush = time.monotonic()
+
+    if pending:
+        Userprofile.objects.filter(pk__in=pending).update(
+            last_activity=models.Case(
+                *[models.When(pk=pk, then=models.Value(seen)) for pk, seen in pending.items()],
+                output_field=models.DateTimeField(),
+            )
+        )
+
+    if heartbeats:
+        _add(HEARTBEATS_KEY, heartbeats)
+        _add(WRITES_KEY, len(pending))
+        logger.debug("Flushed %d of %d activity heartbeats", len(pending), heartbeats)
+    return len(pending)
+
+
+def flush_on_exit():
+    """Write what is still buffered when a worker shuts down, see gunicorn.conf.py."""
+    try:
+        flush()
+    except Exception:
+        logger.exception("Could not flush activity heartbeats at exit")
+    finally:
+        connections.close_all()
+
+
+def _add(key, amount):
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key, amount)
+    except ValueError:
+        cache.set(key, amount, None)
+
+
+def stats():
+    """Heartbeats seen and rows written across all processes since the counters were last reset."""
+    heartbeats = cache.get(HEARTBEATS_KEY, 0)
+    writes = cache.get(WRITES_KEY, 0)
+    return {
+        'heartbeats': heartbeats,
+        'writes': writes,
+        'writes_saved': heartbeats - writes,
+    }
@@ -1,6 +1,8 @@
 from django.contrib.auth.backends import ModelBackend
 from django.contrib.auth import get_user_model
+from django.core.exceptions import PermissionDenied
 
+from . import throttle
 from .models import Userprofile
 
 UserModel = get_user_model()
@@ -13,17 +15,35 @@ class UsernameOrIdNumberBackend(ModelBackend):
         if username is None or password is None:
             return None
 
+        # Checked before the lookups and the PBKDF2 hash; PermissionDenied
+        # stops authenticate() from trying any other backend
+        retry_after = throttle.attempt(request, username)
+        if retry_after is not None:
+            if request is not None:
+                request.login_throttled = retry_after
+            raise PermissionDenied
+
         try:
             # Try username first
             user = UserModel.objects.get(username=username)
         except UserModel.DoesNotExist:
             # Try ID number from profile
             try:
-                profile = Userprofile.objects.get(id_number=username)
+                profile = Userprofile.objects.select_related('user').get(id_number=username)
                 user = profile.user
             except Userprofile.DoesNotExist:
                 return None
 
         if user.check_password(password) and self.user_can_authenticate(user):
+            throttle.reset(username)
             return user
-        return None
\ No newline at end of file
+        return None
+
+    def get_user(self, user_id):
+        # The profile is read on almost every request (role checks, the
+        # navigation bar), so load it with the user in one query
+        try:
+            user = UserModel._default_manager.select_related('profile').get(pk=user_id)
+        except UserModel.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
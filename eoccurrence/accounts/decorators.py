@@ -7,7 +7,7 @@ from django.utils.http import urlencode
 def login_required_with_message(view_func):
     @wraps(view_func)
     def wrapper(request, *args, **kwargs):
-        if not request.user.is_authenticated:
+        if not request.principal.is_authenticated:
             messages.warning(request, "You must be logged in to access this page.")
             next_url = request.get_full_path()
             return redirect(f"/accounts/login/?next={next_url}")
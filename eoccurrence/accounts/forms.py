@@ -1,3 +1,5 @@
+import math
+
 from django import forms
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
@@ -21,8 +23,18 @@ class loginForm(AuthenticationForm):
     }))
     error_messages = {
         'invalid_login': _("Invalid username or ID number, or password."),
+        'throttled': _("Too many sign-in attempts. Please try again in %(minutes)s minutes."),
     }
 
+    def get_invalid_login_error(self):
+        retry_after = getattr(self.request, 'login_throttled', None)
+        if retry_after:
+            return ValidationError(
+                self.error_messages['throttled'], code='throttled',
+                params={'minutes': math.ceil(retry_after / 60)},
+            )
+        return super().get_invalid_login_error()
+
     def confirm_login_allowed(self, user):
         # If your UserProfile is linked via OneToOne
         if hasattr(user, "profile"):
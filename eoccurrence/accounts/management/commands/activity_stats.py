@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from accounts import activity
+
+
+class Command(BaseCommand):
+    help = "Show how many last_activity writes the heartbeat buffer has saved."
+
+    def handle(self, *args, **options):
+        stats = activity.stats()
+        self.stdout.write(
+            f"{stats['heartbeats']} heartbeats, {stats['writes']} writes, "
+            f"{stats['writes_saved']} writes saved."
+        )
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from accounts import throttle
+
+
+class Command(BaseCommand):
+    help = "Show how many login attempts the throttle has rejected, per username and per client address."
+
+    def handle(self, *args, **options):
+        stats = throttle.stats()
+        self.stdout.write(
+            f"{stats['rejected']} attempts rejected ({stats['rejected_by_username']} by username, "
+            f"{stats['rejected_by_ip']} by address), {stats['cache_fallbacks']} cache fallbacks in this process."
+        )
@@ -1,15 +1,28 @@
-from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
+
+from . import activity
+from .principal import get_principal
+
+
+class PrincipalMiddleware:
+    """Expose request.principal, the role and capabilities of request.user, built once on first use."""
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.principal = SimpleLazyObject(lambda: get_principal(request))
+        return self.get_response(request)
+
 
 class ActiveUserMiddleware:
-    """Update last_activity timestamp for logged-in users."""
+    """Record activity for logged-in users; last_activity is written in batches by accounts.activity."""
     def __init__(self, get_response):
         self.get_response = get_response
 
     def __call__(self, request):
         response = self.get_response(request)
         if request.user.is_authenticated:
-            profile = getattr(request.user, 'profile', None)
+            profile = request.principal.profile
             if profile:
-                profile.last_activity = timezone.now()
-                profile.save(update_fields=['last_activity'])
+                activity.record(profile)
         return response
@@ -0,0 +1,48 @@
+class Principal:
+    """
+    Who is making a request, as the permission checks see it: the user, their
+    profile and role, and what that role may do. Built once per request by
+    PrincipalMiddleware from a user whose profile the auth backend already
+    joined, so no check costs a query.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self.is_authenticated = user.is_authenticated
+        # Accounts created outside the registration form may have no profile
+        self.profile = getattr(user, 'profile', None) if self.is_authenticated else None
+        self.role = self.profile.user_role if self.profile else 'anonymous'
+
+    def __repr__(self):
+        return f"<Principal {self.user} ({self.role})>"
+
+    def has_role(self, *roles):
+        return self.role in roles
+
+    @property
+    def is_admin(self):
+        return self.role == 'admin'
+
+    @property
+    def can_edit_cases(self):
+        """Change case details beyond the status."""
+        return self.has_role('admin', 'police')
+
+    @property
+    def can_record_rulings(self):
+        """Record court decisions and suspect rulings."""
+        return self.has_role('admin', 'court')
+
+    @property
+    def can_view_reports(self):
+        return self.has_role('admin', 'court')
+
+    @property
+    def can_view_deleted(self):
+        return self.is_admin
+
+
+def get_principal(request):
+    if not hasattr(request, '_cached_principal'):
+        request._cached_principal = Principal(request.user)
+    return request._cached_principal
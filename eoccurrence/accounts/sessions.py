@@ -0,0 +1,58 @@
+"""
+Session engine (SESSION_ENGINE = 'accounts.sessions') that keeps sliding
+expiry without writing the session row on every request.
+
+Sessions are read through the cache named by SESSION_CACHE_ALIAS and stored
+in the database, as with Django's cached_db engine. With
+SESSION_SAVE_EVERY_REQUEST the middleware still calls save() and refreshes the
+cookie on each response, but the row is only written when the session data
+changed, or when more than SESSION_REFRESH_FRACTION of the expiry age (30
+minutes, or 7 days with "remember me") has passed since the last write. A
+session therefore expires between (1 - fraction) x age and age after the
+last request, instead of exactly age.
+
+When several worker processes serve requests, SESSION_CACHE_ALIAS should
+name a cache they share, or a logout in one process is not seen by the
+cache of another until the entry expires.
+"""
+import time
+
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+
+REFRESH_FRACTION = getattr(settings, 'SESSION_REFRESH_FRACTION', 0.1)
+
+# When the row was last written, kept in the session data itself
+WRITTEN_AT_KEY = '_session_written_at'
+
+
+class SessionStore(CachedDBStore):
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        self._persisted = None  # Serialized data as last loaded or written
+
+    def _fingerprint(self, data):
+        return self.serializer().dumps(data)
+
+    def load(self):
+        data = super().load()
+        self._persisted = self._fingerprint(data) if data else None
+        return data
+
+    def needs_write(self):
+        data = self._get_session()
+        if self._persisted is None or self._fingerprint(data) != self._persisted:
+            return True
+        written_at = data.get(WRITTEN_AT_KEY)
+        if written_at is None:
+            return True
+        return time.time() - written_at >= self.get_expiry_age() * REFRESH_FRACTION
+
+    def save(self, must_create=False):
+        if self.session_key is not None and not must_create and not self.needs_write():
+            return
+        # Stamped without touching self.modified, so the middleware does not
+        # see a change the view did not make
+        self._get_session(no_load=must_create)[WRITTEN_AT_KEY] = int(time.time())
+        super().save(must_create=must_create)
+        self._persisted = self._fingerprint(self._session)
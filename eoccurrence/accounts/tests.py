@@ -1,3 +1,225 @@
-from django.test import TestCase
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from . import activity, sessions, throttle
+from .backends import UsernameOrIdNumberBackend
+from .models import Userprofile
+from .principal import Principal
+
+
+# Counts the queries of whole requests, which a heartbeat flush falling due would add to
+@override_settings(ACTIVITY_FLUSH_INTERVAL=None)
+class PrincipalTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("clerk", password="pw")
+        Userprofile.objects.create(user=cls.user, id_number="ID1", user_role="court")
+
+    def test_backend_loads_profile_with_user(self):
+        with self.assertNumQueries(1):
+            user = UsernameOrIdNumberBackend().get_user(self.user.pk)
+            self.assertEqual(user.profile.user_role, "court")
+
+    def test_capabilities_follow_role(self):
+        principal = Principal(self.user)
+        self.assertTrue(principal.can_record_rulings)
+        self.assertFalse(principal.can_edit_cases)
+        self.assertFalse(principal.is_admin)
+
+        anonymous = Principal(type("Anonymous", (), {"is_authenticated": False})())
+        self.assertEqual(anonymous.role, "anonymous")
+        self.assertFalse(anonymous.can_view_deleted)
+
+    def test_request_reads_user_and_profile_once(self):
+        self.client.force_login(self.user)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse("cases:view_cases"))
+        self.assertEqual(response.status_code, 200)
+        tables = [query["sql"].split(" FROM ")[1].split()[0] for query in context.captured_queries
+                  if query["sql"].startswith("SELECT") and " FROM " in query["sql"]]
+        self.assertEqual(tables.count('"auth_user"'), 1)
+        self.assertNotIn('"accounts_userprofile"', tables)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class LoginThrottleTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("officer", password="correct-horse")
+        Userprofile.objects.create(user=cls.user, id_number="ID42", user_role="police")
+
+    def setUp(self):
+        cache.clear()
+        throttle._local.clear()
+
+    def login(self, username, password="wrong", address="10.0.0.1"):
+        return self.client.post(
+            reverse("accounts:login"), {"username": username, "password": password}, REMOTE_ADDR=address,
+        )
+
+    def test_rejects_before_hashing_once_limit_is_reached(self):
+        for _ in range(throttle.PER_USERNAME):
+            self.assertEqual(self.login("officer").status_code, 200)
+
+        with mock.patch.object(User, "check_password") as check_password:
+            response = self.login("officer", password="correct-horse")
+        check_password.assert_not_called()
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("Retry-After", response)
+        self.assertEqual(throttle.stats()["rejected_by_username"], 1)
+
+        # The same client can still sign in to other accounts
+        self.assertEqual(self.login("someone-else").status_code, 200)
+
+    def test_id_number_and_address_are_throttled(self):
+        for n in range(throttle.PER_IP):
+            self.login(f"guess{n}", address="10.0.0.9")
+        self.assertEqual(self.login("ID42", "correct-horse", address="10.0.0.9").status_code, 429)
+        self.assertEqual(self.login("ID42", "correct-horse", address="10.0.0.10").status_code, 302)
+
+    def test_successful_login_clears_username_attempts(self):
+        for _ in range(throttle.PER_USERNAME - 1):
+            self.login("officer")
+        self.assertEqual(self.login("officer", "correct-horse").status_code, 302)
+        self.client.logout()
+        self.assertEqual(self.login("officer").status_code, 200)
+
+    def test_falls_back_to_process_memory_without_cache(self):
+        broken = mock.Mock(side_effect=ConnectionError)
+        throttle._warned = False
+        with mock.patch.multiple(throttle.cache, get_many=broken, add=broken, incr=broken, set=broken), \
+                self.assertLogs("accounts.throttle", "WARNING"):
+            for _ in range(throttle.PER_USERNAME):
+                self.login("officer")
+            self.assertEqual(self.login("officer").status_code, 429)
+        self.assertGreater(throttle.stats()["cache_fallbacks"], 0)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+@override_settings(ACTIVITY_FLUSH_INTERVAL=None)
+class SessionWriteTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("desk", password="pw")
+        Userprofile.objects.create(user=cls.user, id_number="ID7", user_role="police")
+
+    def setUp(self):
+        cache.clear()
+
+    def session_writes(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return [query["sql"] for query in context.captured_queries
+                if "django_session" in query["sql"] and not query["sql"].startswith("SELECT")]
+
+    def login(self, remember_me=False):
+        data = {"username": "desk", "password": "pw"}
+        if remember_me:
+            data["remember_me"] = "on"
+        self.assertEqual(self.client.post(reverse("accounts:login"), data).status_code, 302)
+
+    def test_unchanged_session_is_not_rewritten(self):
+        self.login()
+        url = reverse("cases:view_cases")
+        self.session_writes(url)
+        self.assertEqual(self.session_writes(url), [])
+        self.assertEqual(self.session_writes(url), [])
+
+    def test_session_is_refreshed_after_threshold(self):
+        self.login()
+        url = reverse("cases:view_cases")
+        self.session_writes(url)
+        later = sessions.time.time() + 30 * 60 * sessions.REFRESH_FRACTION + 1
+        with mock.patch.object(sessions.time, "time", return_value=later):
+            self.assertEqual(len(self.session_writes(url)), 1)
+            self.assertEqual(self.session_writes(url), [])
+
+    def test_changed_data_is_written(self):
+        self.login()
+        session = self.client.session
+        session["filter"] = "open"
+        session.save()
+        self.assertEqual(self.client.session["filter"], "open")
+
+    def test_remember_me_keeps_week_long_expiry(self):
+        self.login(remember_me=True)
+        self.session_writes(reverse("cases:view_cases"))
+        self.assertEqual(self.client.session.get_expiry_age(), 7 * 24 * 60 * 60)
+        self.assertGreater(self.client.cookies["sessionid"]["max-age"], 30 * 60)
+
+
+class ActivityTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [User.objects.create_user(f"officer{n}", password="pw") for n in range(2)]
+        cls.profiles = [
+            Userprofile.objects.create(user=user, id_number=f"ID{n}", user_role="police")
+            for n, user in enumerate(cls.users)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        for patcher in (
+            mock.patch.object(activity, "_pending", {}),
+            mock.patch.object(activity, "_heartbeats", 0),
+            mock.patch.object(activity, "_last_flush", activity.time.monotonic()),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def last_activity(self):
+        return list(Userprofile.objects.filter(pk__in=[p.pk for p in self.profiles]).order_by("pk").values_list(
+            "last_activity", flat=True,
+        ))
+
+    def test_heartbeats_coalesce_into_one_update(self):
+        with self.assertNumQueries(0):
+            for _ in range(3):
+                activity.record(self.profiles[0])
+            activity.record(self.profiles[1])
+        self.assertEqual(len(activity._pending), 2)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(activity.flush(), 2)
+        self.assertTrue(all(self.last_activity()))
+        self.assertEqual(activity.stats(), {"heartbeats": 4, "writes": 2, "writes_saved": 2})
+
+        # A fresh timestamp is not written again within MIN_INTERVAL
+        profile = Userprofile.objects.get(pk=self.profiles[0].pk)
+        activity.record(profile)
+        self.assertEqual(activity._pending, {})
+        self.assertEqual(activity.flush(), 0)
+
+    def test_requests_flush_once_the_interval_has_passed(self):
+        self.client.force_login(self.users[0])
+        self.client.get(reverse("cases:view_cases"))
+        self.assertEqual(self.last_activity(), [None, None])
+        self.assertIn(self.profiles[0].pk, activity._pending)
+
+        activity._last_flush -= activity.flush_interval()
+        self.client.get(reverse("cases:view_cases"))
+        self.assertIsNotNone(self.last_activity()[0])
+        self.assertEqual(activity._pending, {})
+
+    @override_settings(ACTIVITY_FLUSH_INTERVAL=None)
+    def test_nothing_is_buffered_without_an_interval(self):
+        self.client.force_login(self.users[0])
+        self.client.get(reverse("cases:view_cases"))
+        self.assertEqual(activity._pending, {})
+        self.assertEqual(self.last_activity(), [None, None])
+
+    def test_worker_exit_writes_the_buffer(self):
+        activity.record(self.profiles[0])
+        with mock.patch.object(activity.connections, "close_all") as close_all:
+            activity.flush_on_exit()
+        close_all.assert_called_once_with()
+        self.assertEqual(activity._pending, {})
+        self.assertIsNotNone(self.last_activity()[0])
 
-# Create your tests here.
@@ -0,0 +1,141 @@
+import hashlib
+import logging
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+
+logger = logging.getLogger(__name__)
+
+# Login attempts allowed per sliding window of WINDOW seconds
+WINDOW = getattr(settings, 'LOGIN_THROTTLE_WINDOW', 15 * 60)
+PER_USERNAME = getattr(settings, 'LOGIN_THROTTLE_PER_USERNAME', 10)
+PER_IP = getattr(settings, 'LOGIN_THROTTLE_PER_IP', 50)
+# Reverse proxies in front of the app; the client address is the entry this
+# far from the end of X-Forwarded-For. 0 trusts REMOTE_ADDR only.
+PROXY_COUNT = getattr(settings, 'LOGIN_THROTTLE_PROXY_COUNT', 0)
+
+LIMITS = {'username': PER_USERNAME, 'ip': PER_IP}
+REJECTED_KEY = 'login-throttle:rejected:{}'
+FALLBACKS_KEY = 'login-throttle:fallbacks'
+
+# Used when the configured cache cannot be reached, so throttling carries on per process
+_local = LocMemCache('accounts-login-throttle', {'MAX_ENTRIES': 10000})
+_warned = False
+
+
+def _call(method, *args, **kwargs):
+    global _warned
+    try:
+        return getattr(cache, method)(*args, **kwargs)
+    except ValueError:
+        # incr() of a missing key, not a cache failure
+        raise
+    except Exception:
+        if not _warned:
+            logger.warning("Cache unavailable, login throttling falls back to process memory", exc_info=True)
+            _warned = True
+        _add(_local, FALLBACKS_KEY, 1)
+        return getattr(_local, method)(*args, **kwargs)
+
+
+def _add(store, key, amount, timeout=None):
+    store.add(key, 0, timeout)
+    try:
+        return store.incr(key, amount)
+    except ValueError:
+        store.set(key, amount, timeout)
+        return amount
+
+
+def client_ip(request):
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR', '')
+    if PROXY_COUNT and forwarded:
+        addresses = [address.strip() for address in forwarded.split(',')]
+        if len(addresses) >= PROXY_COUNT:
+            return addresses[-PROXY_COUNT]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def _subjects(request, username):
+    # Usernames and ID numbers are hashed so the cache holds no credentials
+    subjects = {'username': hashlib.sha256(username.strip().lower().encode()).hexdigest()}
+    if request is not None:
+        subjects['ip'] = client_ip(request)
+    return subjects
+
+
+def _keys(kind, subject, window):
+    return f"login-throttle:{kind}:{subject}:{window}", f"login-throttle:{kind}:{subject}:{window - 1}"
+
+
+def attempt(request, username):
+    """
+    Count a login attempt for ``username`` from the request's client address.
+
+    Returns None when the attempt may go ahead, or the number of seconds to
+    wait when the username or the address has used up its attempts. The
+    count is a sliding window: this window's attempts plus the previous
+    window's, weighted by how much of it still overlaps. It runs before any
+    user lookup or password hashing, so rejected attempts cost one cache read.
+    """
+    now = time.time()
+    window, offset = divmod(now, WINDOW)
+    window = int(window)
+    overlap = 1 - offset / WINDOW
+
+    subjects = _subjects(request, username)
+    keys = {kind: _keys(kind, subject, window) for kind, subject in subjects.items() if subject}
+    counts = _call('get_many', [key for pair in keys.values() for key in pair])
+
+    for kind, (current, previous) in keys.items():
+        used = counts.get(current, 0) + counts.get(previous, 0) * overlap
+        if used >= LIMITS[kind]:
+            _reject(kind, subjects)
+            return math.ceil(WINDOW - offset)
+
+    for current, _ in keys.values():
+        _call('add', current, 0, WINDOW * 2)
+        try:
+            _call('incr', current)
+        except ValueError:
+            # Evicted between add() and incr()
+            _call('set', current, 1, WINDOW * 2)
+    return None
+
+
+def _reject(kind, subjects):
+    try:
+        _add(cache, REJECTED_KEY.format(kind), 1)
+    except Exception:
+        _add(_local, REJECTED_KEY.format(kind), 1)
+    logger.info(
+        "Login attempt rejected by the %s throttle", kind,
+        extra={'throttle': kind, 'client_ip': subjects.get('ip')},
+    )
+
+
+def reset(username):
+    """Forget the failed attempts against ``username`` after it signs in."""
+    window = int(time.time() // WINDOW)
+    subject = _subjects(None, username)['username']
+    _call('delete_many', list(_keys('username', subject, window)))
+
+
+def stats():
+    """Rejected attempts per throttle, and cache fallbacks, since the counters were last reset."""
+    keys = [REJECTED_KEY.format(kind) for kind in LIMITS]
+    try:
+        shared = cache.get_many(keys)
+    except Exception:
+        shared = {}
+    local = _local.get_many(keys + [FALLBACKS_KEY])
+    result = {
+        f"rejected_by_{kind}": shared.get(REJECTED_KEY.format(kind), 0) + local.get(REJECTED_KEY.format(kind), 0)
+        for kind in LIMITS
+    }
+    result['rejected'] = sum(result.values())
+    result['cache_fallbacks'] = local.get(FALLBACKS_KEY, 0)
+    return result
@@ -53,7 +53,12 @@ def login_view(request):
     else:
         form = loginForm()
 
-    return render(request, 'accounts/login.html', {'form': form})
+    response = render(request, 'accounts/login.html', {'form': form})
+    retry_after = getattr(request, 'login_throttled', None)
+    if retry_after:
+        response.status_code = 429
+        response['Retry-After'] = str(retry_after)
+    return response
 
 def logout_view(request):
     logout(request)
@@ -1,10 +1,15 @@
 from django.contrib import admin
 
-from .models import Complainant, Case, Suspect, Witness, CourtDecision, SuspectCourtRuling
+from django.utils import timezone
+
+from core.pagination import CachedCountPaginator
+
+from .models import Area, ArchivedCase, DuplicateCluster, DuplicateMember, Complainant, Case, Suspect, Witness, CourtDecision, SuspectCourtRuling, CaseStatisticsRollup, CaseNumberSequence
 # Register your models here.
 admin.site.register(Suspect)
 admin.site.register(CourtDecision)
 admin.site.register(SuspectCourtRuling)
+admin.site.register(CaseNumberSequence)
 
 
 class WitnessInline(admin.TabularInline):
@@ -31,10 +36,91 @@ class WitnessInline(admin.TabularInline):
 class CaseAdmin(admin.ModelAdmin):
     list_display = ("case_number", "uuid", "created_at", "deleted")
     readonly_fields = ("uuid",)
+    # Cached/estimated totals instead of a COUNT(*) per changelist page
+    paginator = CachedCountPaginator
+    show_full_result_count = False
     inlines = [WitnessInline]  # <-- add this line
 
+    def get_queryset(self, request):
+        # The admin lists and edits deleted cases too
+        return Case.all_with_deleted.all()
+
 @admin.register(Complainant)
 class ComplainantAdmin(admin.ModelAdmin):
     list_display = ("first_name", "last_name", "uuid") # Display first name, last name, and UUID in the list view
     readonly_fields = ("uuid",)  # shows on the detail page but not editable
 
+
+
+@admin.register(CaseStatisticsRollup)
+class CaseStatisticsRollupAdmin(admin.ModelAdmin):
+    list_display = ("report_month", "case_type", "status", "case_count", "suspect_count", "witness_count")
+    list_filter = ("status", "case_type")
+
+
+@admin.register(ArchivedCase)
+class ArchivedCaseAdmin(admin.ModelAdmin):
+    # Moved in and out by the archive_cases and restore_cases commands only
+    list_display = ("case_number", "uuid", "status", "archived_at")
+    search_fields = ("case_number",)
+    paginator = CachedCountPaginator
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(Area)
+class AreaAdmin(admin.ModelAdmin):
+    list_display = ("name", "level", "parent")
+    list_filter = ("level",)
+    search_fields = ("name",)
+    raw_id_fields = ("parent",)
+
+
+class DuplicateMemberInline(admin.TabularInline):
+    model = DuplicateMember
+    extra = 0
+    can_delete = False
+    fields = ('kind', 'person_id', 'person')
+    readonly_fields = fields
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(DuplicateCluster)
+class DuplicateClusterAdmin(admin.ModelAdmin):
+    # Written by the find_duplicates command; reviewers only set the status
+    list_display = ("id", "status", "size", "score", "created_at", "reviewed_by")
+    list_filter = ("status",)
+    fields = ("status", "score", "size", "created_at", "reviewed_by", "reviewed_at")
+    readonly_fields = ("score", "size", "created_at", "reviewed_by", "reviewed_at")
+    inlines = [DuplicateMemberInline]
+    actions = ["mark_same", "mark_different"]
+
+    def has_add_permission(self, request):
+        return False
+
+    def save_model(self, request, obj, form, change):
+        if 'status' in form.changed_data:
+            obj.reviewed_by, obj.reviewed_at = request.user, timezone.now()
+        super().save_model(request, obj, form, change)
+
+    def review(self, request, queryset, status):
+        queryset.update(status=status, reviewed_by=request.user, reviewed_at=timezone.now())
+
+    @admin.action(description="Mark as the same person")
+    def mark_same(self, request, queryset):
+        self.review(request, queryset, 'same')
+
+    @admin.action(description="Mark as different people")
+    def mark_different(self, request, queryset):
+        self.review(request, queryset, 'different')
+
@@ -0,0 +1,114 @@
+"""
+Moving cases in a final status between the live tables and the archive
+tables (ArchivedCase and friends), for the archive_cases and restore_cases
+commands.
+
+A case moves together with its suspect and witness links, court decisions,
+suspect rulings and history, keeping every id. Rows are copied to the other
+side and deleted from the one they left in a single transaction per call,
+without going through the Case signals: an archived case still counts in
+the statistics rollup and in its suspects' and witnesses' case summaries,
+so only the search index and the listing counts change.
+"""
+import datetime
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from core import counts
+
+from . import search
+from .bulk import backdated
+from .models import (
+    ArchivedCase, ArchivedCaseEvent, ArchivedCaseSuspect, ArchivedCaseWitness, ArchivedCourtDecision,
+    ArchivedSuspectCourtRuling, Case, CaseEvent, CourtDecision, SuspectCourtRuling,
+)
+
+# No court outcome moves a case out of these statuses
+ARCHIVE_STATUSES = ('closed', 'dismissed', 'transferred')
+# How long a case has to go unchanged before archive_cases picks it up
+ARCHIVE_AFTER_DAYS = getattr(settings, 'CASE_ARCHIVE_AFTER_DAYS', 365)
+
+# (live, archived) tables moved with a case, in insert order; rows are
+# deleted in the reverse order
+TABLES = [
+    (Case, ArchivedCase),
+    (Case.suspects.through, ArchivedCaseSuspect),
+    (Case.witnesses.through, ArchivedCaseWitness),
+    (CourtDecision, ArchivedCourtDecision),
+    (SuspectCourtRuling, ArchivedSuspectCourtRuling),
+    (CaseEvent, ArchivedCaseEvent),
+]
+
+
+def _rows(model, case_ids):
+    key = 'pk__in' if model in (Case, ArchivedCase) else 'case_id__in'
+    return model._base_manager.filter(**{key: case_ids})
+
+
+def _copy(source, target, case_ids):
+    source_fields = {field.attname for field in source._meta.concrete_fields}
+    names = [field.attname for field in target._meta.concrete_fields if field.attname in source_fields]
+    # Restored rows keep their dates instead of getting today's
+    dated = [
+        field for field in target._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    with backdated(*dated):
+        target._base_manager.bulk_create(
+            [target(**row) for row in _rows(source, case_ids).values(*names)], batch_size=1000,
+        )
+
+
+def _move(pairs, case_ids):
+    for source, target in pairs:
+        _copy(source, target, case_ids)
+    for source, _ in reversed(pairs):
+        # A plain DELETE: Case.delete() and its signals would take the case
+        # out of the statistics and its people's case summaries
+        rows = _rows(source, case_ids)
+        rows._raw_delete(rows.db)
+
+
+def archivable(days=ARCHIVE_AFTER_DAYS):
+    """Cases in one of ARCHIVE_STATUSES that have not changed for ``days`` days."""
+    cutoff = timezone.now() - datetime.timedelta(days=days)
+    return Case.all_with_deleted.filter(status__in=ARCHIVE_STATUSES, updated_at__lt=cutoff)
+
+
+def archive_cases(queryset, actor_id=None):
+    """
+    Move the cases in ``queryset`` that are in one of ARCHIVE_STATUSES to
+    the archive, in one transaction. Returns the number of cases moved.
+    """
+    with transaction.atomic():
+        ids = list(queryset.filter(status__in=ARCHIVE_STATUSES).select_for_update().values_list('pk', flat=True))
+        if not ids:
+            return 0
+        CaseEvent.objects.bulk_create([
+            CaseEvent(case_id=pk, kind='archived', actor_id=actor_id, summary="Case archived") for pk in ids
+        ])
+        _move(TABLES, ids)
+        search.remove_cases(ids)
+        counts.invalidate(Case)
+    return len(ids)
+
+
+def restore_cases(queryset, actor_id=None):
+    """
+    Move the archived cases in ``queryset`` back to the live tables, in one
+    transaction. Returns the number of cases moved.
+    """
+    with transaction.atomic():
+        ids = list(queryset.select_for_update().values_list('pk', flat=True))
+        if not ids:
+            return 0
+        _move([(archived, live) for live, archived in TABLES], ids)
+        CaseEvent.objects.bulk_create([
+            CaseEvent(case_id=pk, kind='unarchived', actor_id=actor_id, summary="Case restored from the archive")
+            for pk in ids
+        ])
+        search.index_cases(Case.all_with_deleted.select_related('complainant').filter(pk__in=ids))
+        counts.invalidate(Case)
+    return len(ids)
@@ -0,0 +1,22 @@
+from contextlib import contextmanager
+
+
+@contextmanager
+def backdated(*fields):
+    """
+    Let bulk inserts keep the dates set on auto_now/auto_now_add fields, for
+    historical or synthetic records. Not thread safe: the flags are switched
+    off on the shared field objects until the block exits.
+    """
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field, _, _ in saved:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def model_fields(model, *names):
+    return [model._meta.get_field(name) for name in names]
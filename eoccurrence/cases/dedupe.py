@@ -0,0 +1,344 @@
+"""
+Batch detection of people entered more than once as complainants,
+suspects or witnesses.
+
+Every person gets blocking keys (PersonKey): their normalised ID number,
+each phone number in their contact details and a phonetic key of their
+first and last names. Only people who share a key are compared, so the
+work grows with the size of the blocks rather than with the square of the
+number of people; blocks above MAX_BLOCK_SIZE, such as a very common name,
+are skipped. Blocks are scored in worker processes, pairs scoring
+MATCH_THRESHOLD or more are stored as DuplicatePair rows, and each
+connected group of pairs becomes a DuplicateCluster for review.
+
+refresh() keys and scores only the people changed since the last run, and
+rebuilds only the clusters they touch.
+"""
+import difflib
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from .models import Complainant, DuplicateCluster, DuplicateMember, DuplicatePair, PersonKey, Suspect, Witness
+
+# Pairs scoring at least this much (0-1) are kept for review
+MATCH_THRESHOLD = getattr(settings, 'DUPLICATE_MATCH_THRESHOLD', 0.6)
+# Blocks with more people than this are too unspecific to compare in full
+MAX_BLOCK_SIZE = getattr(settings, 'DUPLICATE_MAX_BLOCK_SIZE', 200)
+WORKERS = getattr(settings, 'DUPLICATE_WORKERS', 2)
+# Blocks sent to a worker at a time
+CHUNK_SIZE = 200
+
+# Added to a pair's score when the evidence agrees, subtracted when it conflicts
+WEIGHTS = {'id': 0.6, 'phone': 0.25, 'name': 0.4, 'date of birth': 0.2}
+PENALTIES = {'id': 0.4, 'date of birth': 0.3, 'gender': 0.2}
+# Names less alike than this (difflib ratio) count as different
+NAME_CUTOFF = 0.75
+
+MODELS = {'complainant': Complainant, 'suspect': Suspect, 'witness': Witness}
+
+PHONE = re.compile(r'\+?\d(?:[\s().-]?\d){8,}')
+SOUNDEX = str.maketrans('bfpvcgjkqsxzdtlmnr', '111122222222334556')
+
+
+def normalise_id(value):
+    """An ID or passport number without spaces, dashes or leading zeros; None if too short to tell people apart."""
+    value = re.sub(r'[^0-9A-Z]', '', (value or '').upper())
+    if value.isdigit():
+        value = value.lstrip('0')
+    return value if len(value) >= 5 and len(set(value)) > 1 else None
+
+
+def phones(text):
+    """The phone numbers in free text by their last nine digits, so +254 712 345678 is 0712345678."""
+    found = set()
+    for number in PHONE.findall(text or ''):
+        digits = re.sub(r'\D', '', number)
+        found.add(digits[-9:])
+    return frozenset(found)
+
+
+def soundex(word):
+    """American Soundex: "Otieno" and "Otiyeno" are both O350."""
+    word = re.sub(r'[^a-z]', '', word.lower())
+    if not word:
+        return ''
+    codes = word.translate(SOUNDEX)
+    result, last = word[0].upper(), codes[0]
+    for char, code in zip(word[1:], codes[1:]):
+        if code.isdigit() and code != last:
+            result += code
+        # Vowels separate repeated codes, h and w do not
+        if char not in 'hw':
+            last = code
+    return (result + '000')[:4]
+
+
+def _person(kind, pk, name, id_number, contact, date_of_birth, gender):
+    """(record, keys) of a person. Records are plain tuples so they can be sent to workers."""
+    words = re.findall(r'[a-z]+', (name or '').lower())
+    record = ((kind, pk), ' '.join(sorted(words)), normalise_id(id_number), phones(contact), date_of_birth, gender)
+
+    keys = {f"phone:{phone}" for phone in record[3]}
+    if record[2]:
+        keys.add(f"id:{record[2]}")
+    if words:
+        # Either order of first and last name gives the same key
+        keys.add("name:" + '|'.join(sorted({soundex(words[0]), soundex(words[-1])})))
+    return record, keys
+
+
+def _people(kind, queryset):
+    if kind == 'complainant':
+        rows = queryset.values_list(
+            'pk', 'first_name', 'last_name', 'id_number', 'phone_number', 'date_of_birth', 'gender',
+        )
+        for pk, first, last, *details in rows.iterator(chunk_size=2000):
+            yield _person(kind, pk, f"{first} {last or ''}", *details)
+    else:
+        rows = queryset.values_list('pk', 'name', 'national_id', 'contact_info', 'date_of_birth', 'gender')
+        for row in rows.iterator(chunk_size=2000):
+            yield _person(kind, *row)
+
+
+def score(a, b):
+    """(score, reasons) for two records being the same person."""
+    _, name_a, id_a, phones_a, born_a, gender_a = a
+    _, name_b, id_b, phones_b, born_b, gender_b = b
+    total, reasons = 0.0, []
+
+    similarity = difflib.SequenceMatcher(None, name_a, name_b).ratio() if name_a and name_b else 0
+    if similarity >= NAME_CUTOFF:
+        total += WEIGHTS['name'] * similarity
+        reasons.append('name')
+    if id_a and id_b:
+        if id_a == id_b:
+            total += WEIGHTS['id']
+            reasons.append('id')
+        else:
+            total -= PENALTIES['id']
+    if phones_a & phones_b:
+        total += WEIGHTS['phone']
+        reasons.append('phone')
+    if born_a and born_b:
+        if born_a == born_b:
+            total += WEIGHTS['date of birth']
+            reasons.append('date of birth')
+        else:
+            total -= PENALTIES['date of birth']
+    if gender_a and gender_b and gender_a != gender_b:
+        total -= PENALTIES['gender']
+    return round(min(total, 1.0), 3), reasons
+
+
+def _score_blocks(blocks):
+    """
+    Matching pairs of a list of (records, focus) blocks. With a focus, only
+    pairs involving one of those people are scored. Runs in a worker process.
+    """
+    pairs = {}
+    for records, focus in blocks:
+        for i, a in enumerate(records):
+            for b in records[i + 1:]:
+                if focus is not None and a[0] not in focus and b[0] not in focus:
+                    continue
+                first, second = sorted((a, b))
+                pair = (first[0], second[0])
+                if pair not in pairs:
+                    pairs[pair] = score(first, second)
+    return {pair: result for pair, result in pairs.items() if result[0] >= MATCH_THRESHOLD}
+
+
+def _score(blocks, workers):
+    chunks = [blocks[start:start + CHUNK_SIZE] for start in range(0, len(blocks), CHUNK_SIZE)]
+    pairs = {}
+    if workers > 1 and len(chunks) > 1:
+        # Forked workers must not share the parent's database connections
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for found in executor.map(_score_blocks, chunks):
+                pairs.update(found)
+    else:
+        for chunk in chunks:
+            pairs.update(_score_blocks(chunk))
+    return pairs
+
+
+def _batches(refs, size=500):
+    """(kind, ids) of (kind, id) references, at most ``size`` ids at a time."""
+    by_kind = {}
+    for kind, pk in refs:
+        by_kind.setdefault(kind, []).append(pk)
+    for kind, ids in by_kind.items():
+        ids.sort()
+        for start in range(0, len(ids), size):
+            yield kind, ids[start:start + size]
+
+
+def _pairs_of(kind, ids):
+    return DuplicatePair.objects.filter(
+        Q(first_kind=kind, first_id__in=ids) | Q(second_kind=kind, second_id__in=ids),
+    )
+
+
+def _pairs_touching(refs):
+    """((kind, id), (kind, id), score) of the stored pairs involving any of ``refs``."""
+    for kind, ids in _batches(refs):
+        rows = _pairs_of(kind, ids).values_list('first_kind', 'first_id', 'second_kind', 'second_id', 'score')
+        for first_kind, first_id, second_kind, second_id, value in rows:
+            yield (first_kind, first_id), (second_kind, second_id), value
+
+
+def _blocks(keys):
+    blocks = {}
+    keys = sorted(keys)
+    for start in range(0, len(keys), 500):
+        rows = PersonKey.objects.filter(key__in=keys[start:start + 500]).values_list('key', 'kind', 'person_id')
+        for key, kind, pk in rows:
+            blocks.setdefault(key, []).append((kind, pk))
+    return blocks
+
+
+def _recluster(seeds):
+    """
+    Rebuild the clusters of the connected groups of pairs around ``seeds``.
+    Clusters whose members are unchanged are kept with their review status.
+    Returns the number of clusters created.
+    """
+    seen, frontier, edges = set(), set(seeds), {}
+    while frontier:
+        seen |= frontier
+        reached = set()
+        for first, second, value in _pairs_touching(frontier):
+            edges[first, second] = value
+            reached |= {first, second}
+        # Whole existing clusters, so one that splits is rebuilt in full
+        for kind, ids in _batches(frontier):
+            clusters = DuplicateMember.objects.filter(kind=kind, person_id__in=ids).values('cluster_id')
+            reached |= set(DuplicateMember.objects.filter(cluster_id__in=clusters).values_list('kind', 'person_id'))
+        frontier = reached - seen
+
+    parent = {}
+
+    def root(ref):
+        while parent.setdefault(ref, ref) != ref:
+            parent[ref] = parent[parent[ref]]
+            ref = parent[ref]
+        return ref
+
+    for first, second in edges:
+        parent[root(first)] = root(second)
+    groups = {}
+    for ref in parent:
+        groups.setdefault(root(ref), set()).add(ref)
+    best = {}
+    for (first, _), value in edges.items():
+        best[root(first)] = max(best.get(root(first), 0), value)
+
+    old = {}
+    for kind, ids in _batches(seen):
+        clusters = DuplicateMember.objects.filter(kind=kind, person_id__in=ids).values('cluster_id')
+        for cluster_id, kind, pk in DuplicateMember.objects.filter(cluster_id__in=clusters).values_list(
+            'cluster_id', 'kind', 'person_id',
+        ):
+            old.setdefault(cluster_id, set()).add((kind, pk))
+    kept = {frozenset(members): cluster_id for cluster_id, members in old.items()}
+
+    created = 0
+    DuplicateCluster.objects.filter(pk__in=set(old) - {kept.get(frozenset(group)) for group in groups.values()}).delete()
+    for top, group in groups.items():
+        cluster_id = kept.get(frozenset(group))
+        if cluster_id is not None:
+            DuplicateCluster.objects.filter(pk=cluster_id).update(score=best[top], size=len(group))
+            continue
+        cluster = DuplicateCluster.objects.create(score=best[top], size=len(group))
+        DuplicateMember.objects.bulk_create([
+            DuplicateMember(cluster=cluster, kind=kind, person_id=pk) for kind, pk in sorted(group)
+        ])
+        created += 1
+    return created
+
+
+def refresh(full=False, workers=WORKERS):
+    """
+    Key the people created or updated since the last run (everyone with
+    ``full``), score them against the people they share a block with and
+    rebuild the clusters they touch. Returns counts of people keyed, pairs
+    found, oversized blocks skipped and clusters created.
+    """
+    started = timezone.now()
+    changed, rows = {}, []
+    for kind, model in MODELS.items():
+        people = model.objects.all()
+        since = None if full else PersonKey.objects.filter(kind=kind).aggregate(last=Max('indexed_at'))['last']
+        if since:
+            people = people.filter(updated_at__gte=since)
+        for record, keys in _people(kind, people):
+            changed[record[0]] = record
+            rows += [PersonKey(kind=kind, person_id=record[0][1], key=key, indexed_at=started) for key in keys]
+
+    with transaction.atomic():
+        if full:
+            PersonKey.objects.all().delete()
+        for kind, ids in _batches(changed):
+            PersonKey.objects.filter(kind=kind, person_id__in=ids).delete()
+        PersonKey.objects.bulk_create(rows, batch_size=1000)
+
+    if full:
+        blocks = {}
+        for row in rows:
+            blocks.setdefault(row.key, []).append((row.kind, row.person_id))
+    else:
+        blocks = _blocks({row.key for row in rows})
+    skipped = sum(1 for refs in blocks.values() if len(refs) > MAX_BLOCK_SIZE)
+    blocks = [refs for refs in blocks.values() if 1 < len(refs) <= MAX_BLOCK_SIZE]
+
+    # Block mates not changed in this run are read as they are
+    records = dict(changed)
+    missing = {ref for refs in blocks for ref in refs if ref not in records}
+    for kind, ids in _batches(missing):
+        records.update((record[0], record) for record, _ in _people(kind, MODELS[kind].objects.filter(pk__in=ids)))
+
+    pairs = _score([
+        ([records[ref] for ref in refs if ref in records], None if full else {ref for ref in refs if ref in changed})
+        for refs in blocks
+    ], workers)
+
+    with transaction.atomic():
+        if full:
+            seeds = set(DuplicateMember.objects.values_list('kind', 'person_id'))
+            DuplicatePair.objects.all().delete()
+        else:
+            # The people they used to match may now belong to other clusters, or none
+            seeds = {ref for first, second, _ in _pairs_touching(changed) for ref in (first, second)}
+            for kind, ids in _batches(changed):
+                _pairs_of(kind, ids).delete()
+        DuplicatePair.objects.bulk_create([
+            DuplicatePair(
+                first_kind=first[0], first_id=first[1], second_kind=second[0], second_id=second[1],
+                score=value, reasons=', '.join(reasons),
+            )
+            for (first, second), (value, reasons) in pairs.items()
+        ], batch_size=1000)
+        created = _recluster(seeds | set(changed) | {ref for pair in pairs for ref in pair})
+
+    return {'people': len(changed), 'pairs': len(pairs), 'skipped': skipped, 'clusters': created}
+
+
+def forget(kind, pk):
+    """Drop a deleted person's keys and pairs and rebuild the cluster they were in."""
+    ref = (kind, pk)
+    with transaction.atomic():
+        seeds = {other for pair in _pairs_touching([ref]) for other in pair[:2]}
+        members = DuplicateMember.objects.filter(kind=kind, person_id=pk)
+        seeds |= set(DuplicateMember.objects.filter(cluster__in=members.values('cluster_id')).values_list(
+            'kind', 'person_id',
+        ))
+        PersonKey.objects.filter(kind=kind, person_id=pk).delete()
+        _pairs_of(kind, [pk]).delete()
+        members.delete()
+        _recluster(seeds - {ref})
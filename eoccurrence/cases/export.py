@@ -0,0 +1,90 @@
+import csv
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+
+from .models import Case, CourtDecision
+
+FORMATS = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+
+# Rows fetched per round trip; on PostgreSQL through a server-side cursor
+CHUNK_SIZE = getattr(settings, 'CASE_EXPORT_CHUNK_SIZE', 2000)
+
+COLUMNS = [
+    ('case_number', 'case_number'),
+    ('uuid', 'uuid'),
+    ('case_type', 'case_type'),
+    ('status', 'status'),
+    ('title', 'title'),
+    ('location', 'location'),
+    ('incident_date', 'incident_date'),
+    ('report_date', 'report_date'),
+    ('court_date', 'court_date'),
+    ('created_at', 'created_at'),
+    ('recorded_by', 'recorded_by__username'),
+    ('deleted', 'deleted'),
+    ('complainant_first_name', 'complainant__first_name'),
+    ('complainant_last_name', 'complainant__last_name'),
+    ('complainant_id_number', 'complainant__id_number'),
+    ('complainant_phone_number', 'complainant__phone_number'),
+    ('suspect_count', 'suspect_count'),
+    ('latest_decision', 'latest_decision'),
+    ('latest_decision_date', 'latest_decision_date'),
+]
+
+# Complainant contact details, only exported for roles that may view reports
+PERSONAL_COLUMNS = {'complainant_id_number', 'complainant_phone_number'}
+
+
+def export_columns(personal=True):
+    return [column for column in COLUMNS if personal or column[0] not in PERSONAL_COLUMNS]
+
+
+def export_rows(cases, columns=COLUMNS):
+    """
+    Export rows for a case queryset as tuples in ``columns`` order. Suspect count
+    and latest court decision are correlated subqueries of the same
+    statement, and rows are streamed in chunks, so memory does not grow with
+    the size of the export.
+    """
+    latest = CourtDecision.objects.filter(case=OuterRef('pk')).order_by('-decision_date', '-id')
+    suspects = Case.suspects.through.objects.filter(case=OuterRef('pk')).order_by().values('case')
+
+    rows = cases.annotate(
+        suspect_count=Subquery(
+            suspects.annotate(n=Count('id')).values('n')[:1], output_field=IntegerField(),
+        ),
+        latest_decision=Subquery(latest.values('decision_type')[:1]),
+        latest_decision_date=Subquery(latest.values('decision_date')[:1]),
+    ).values_list(*[lookup for _, lookup in columns])
+
+    for row in rows.iterator(chunk_size=CHUNK_SIZE):
+        # A case without suspects has no group to count
+        yield row[:-3] + (row[-3] or 0,) + row[-2:]
+
+
+class _Echo:
+    """File-like object whose write() hands back the line csv.writer formatted."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(cases, columns=COLUMNS):
+    writer = csv.writer(_Echo())
+    yield writer.writerow([name for name, _ in columns])
+    for row in export_rows(cases, columns):
+        yield writer.writerow(row)
+
+
+def iter_ndjson(cases, columns=COLUMNS):
+    names = [name for name, _ in columns]
+    for row in export_rows(cases, columns):
+        yield json.dumps(dict(zip(names, row)), cls=DjangoJSONEncoder) + "\n"
+
+
+def iter_export(cases, fmt, personal=True):
+    columns = export_columns(personal)
+    return iter_csv(cases, columns) if fmt == 'csv' else iter_ndjson(cases, columns)
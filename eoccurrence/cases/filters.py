@@ -0,0 +1,54 @@
+from django.db.models import Q
+
+from .models import ArchivedCase, Case
+
+
+def visible_cases(principal):
+    """Every case for principals who may see deleted ones, live cases for everyone else."""
+    return Case.all_with_deleted.all() if principal.can_view_deleted else Case.objects.all()
+
+
+def visible_archived_cases(principal):
+    """visible_cases() for the archive, which has no live-only manager."""
+    cases = ArchivedCase.objects.all()
+    return cases if principal.can_view_deleted else cases.filter(deleted=False)
+
+
+def report_cases(principal, search_query=''):
+    """Cases on the reports page: deleted ones only for admins, narrowed by report_filter()."""
+    return report_filter(visible_cases(principal).order_by('-created_at'), search_query)
+
+
+def report_filter(cases, search_query=''):
+    # Search by case number, title, or complainant name
+    if search_query:
+        cases = cases.filter(
+            case_number__icontains=search_query
+        ) | cases.filter(
+            title__icontains=search_query
+        ) | cases.filter(
+            complainant__first_name__icontains=search_query
+        ) | cases.filter(
+            complainant__last_name__icontains=search_query
+        )
+    return cases
+
+
+def search_filter(cases, query='', status='', recorded_by=''):
+    """The search page's filters, as ORM lookups (the unranked fallback of cases.search)."""
+    if status:
+        cases = cases.filter(status=status)
+
+    if recorded_by:
+        cases = cases.filter(recorded_by__username=recorded_by)
+
+    if query:
+        cases = cases.filter(
+            Q(case_number__icontains=query) |
+            Q(title__icontains=query) |
+            Q(description__icontains=query) |
+            Q(location__icontains=query) |
+            Q(complainant__first_name__icontains=query) |
+            Q(complainant__last_name__icontains=query)
+        )
+    return cases
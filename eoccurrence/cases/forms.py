@@ -95,16 +95,16 @@ class CaseForm(forms.ModelForm):
         }
 
     def __init__(self, *args, **kwargs):
-        self.user = kwargs.pop("user", None)  # store user
+        self.principal = kwargs.pop("principal", None)  # request.principal of the editor
         super().__init__(*args, **kwargs)
 
     def clean(self):
         cleaned_data = super().clean()
-        if not self.user:
+        if not self.principal:
             return cleaned_data  
 
         # Restrict non-police users to modify only the status field
-        if self.user.is_authenticated and self.user.profile.user_role not in ['admin', 'police']:
+        if not self.principal.can_edit_cases:
             for field in self.fields:
                 if field != "status":  
                     old_value = getattr(self.instance, field)
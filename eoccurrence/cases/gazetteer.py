@@ -0,0 +1,145 @@
+"""
+Matching free-text locations against the Area gazetteer.
+
+Each process holds the gazetteer in memory and reloads it when an Area is
+written by any process, load_gazetteer included (through the core.counts
+generation of Area, which lives in the shared cache), so matching at save
+time costs one cache read. A location is split into words, generic words such
+as "county" or "near" dropped, and every run of words up to the longest
+area name is looked up exactly. Runs of FUZZY_MIN_LENGTH characters or
+more that name no area are compared with difflib to names of the same
+number of words, so "Westlnds, Nairobi" still finds Westlands.
+
+Every area found scores its own match plus those of the areas above it
+that the text also names, and the best scoring area wins: "Central,
+Kisumu" picks Kisumu's Central over another county's. A tie between
+unrelated areas gives the deepest area they share, or no match.
+"""
+import difflib
+import re
+
+from django.conf import settings
+
+from core import counts
+
+from .models import Area
+
+# How close a misspelt name has to be to count (difflib ratio, 0-1)
+FUZZY_CUTOFF = getattr(settings, 'GAZETTEER_FUZZY_CUTOFF', 0.85)
+# Shorter runs of words are only matched exactly
+FUZZY_MIN_LENGTH = 5
+# Matches remembered per process, for backfills over repeated locations
+MEMO_SIZE = 10000
+
+# Words that say what kind of place follows, not which one
+GENERIC_WORDS = {
+    'county', 'subcounty', 'sub', 'ward', 'location', 'village', 'estate', 'area',
+    'near', 'at', 'in', 'the', 'of',
+}
+LEVELS = [level for level, _ in Area.LEVEL_CHOICES]
+
+
+def _words(text):
+    text = (text or '').lower().replace("'", '')
+    return [word for word in re.findall(r'[a-z0-9]+', text) if word not in GENERIC_WORDS]
+
+
+def normalise(name):
+    """A place name as the gazetteer compares it: "Murang'a County" is "muranga"."""
+    return ' '.join(_words(name))
+
+
+class Gazetteer:
+    def __init__(self, generation, areas):
+        """``areas``: (id, parent_id, level, key) of every Area."""
+        self.generation = generation
+        self.parent, self.level, self.by_key = {}, {}, {}
+        self.keys_by_size = {}  # Number of words -> keys
+        for pk, parent_id, level, key in areas:
+            self.parent[pk], self.level[pk] = parent_id, level
+            if key not in self.by_key:
+                self.keys_by_size.setdefault(len(key.split()), []).append(key)
+            self.by_key.setdefault(key, []).append(pk)
+        self.longest = max(self.keys_by_size, default=0)
+        self._memo = {}
+
+    def lineage(self, area_id):
+        """(id, level) of the area and of each area above it, most specific first."""
+        chain = []
+        while area_id in self.level:
+            chain.append((area_id, self.level[area_id]))
+            area_id = self.parent[area_id]
+        return chain
+
+    def _found(self, words):
+        scores = {}
+        for size in range(1, min(self.longest, len(words)) + 1):
+            for start in range(len(words) - size + 1):
+                phrase = ' '.join(words[start:start + size])
+                if phrase in self.by_key:
+                    found = [(phrase, 1.0)]
+                elif len(phrase) >= FUZZY_MIN_LENGTH:
+                    found = [
+                        (key, difflib.SequenceMatcher(None, phrase, key).ratio())
+                        for key in difflib.get_close_matches(phrase, self.keys_by_size.get(size, ()), 3, FUZZY_CUTOFF)
+                    ]
+                else:
+                    continue
+                for key, score in found:
+                    for pk in self.by_key[key]:
+                        scores[pk] = max(scores.get(pk, 0), score)
+        return scores
+
+    def _best(self, found):
+        if not found:
+            return None
+        chains = {pk: [area for area, _ in self.lineage(pk)] for pk in found}
+        totals = {pk: sum(found.get(area, 0) for area in chain) for pk, chain in chains.items()}
+        top = max(totals.values())
+        best = [pk for pk, total in totals.items() if total == top]
+        if len(best) == 1:
+            return best[0]
+        shared = set.intersection(*(set(chains[pk]) for pk in best))
+        return next((area for area in chains[best[0]] if area in shared), None)
+
+    def match(self, text):
+        """Id of the Area ``text`` names, or None."""
+        words = _words(text)
+        key = ' '.join(words)
+        if key not in self._memo:
+            if len(self._memo) >= MEMO_SIZE:
+                self._memo.clear()
+            self._memo[key] = self._best(self._found(words))
+        return self._memo[key]
+
+
+_current = None
+
+
+def current():
+    """The gazetteer as of the last Area write, loaded once per process and change."""
+    global _current
+    generation = counts.generation(Area)
+    if _current is None or _current.generation != generation:
+        _current = Gazetteer(generation, Area.objects.values_list('pk', 'parent_id', 'level', 'key'))
+    return _current
+
+
+def match(text):
+    """Id of the Area a free-text location names, or None."""
+    if not text or not text.strip():
+        return None
+    return current().match(text)
+
+
+def ensure(*names):
+    """
+    The Area for a county, sub-county and locality name (as many as given,
+    in that order), creating the missing ones. Returns the deepest.
+    """
+    area = None
+    for level, name in zip(LEVELS, names):
+        parent, area = area, Area.objects.filter(parent=area, key=normalise(name)).first()
+        if area is None:
+            area = Area.objects.create(name=name.strip(), level=level, parent=parent)
+    return area
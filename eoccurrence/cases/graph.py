@@ -0,0 +1,123 @@
+from django.db.models import Prefetch, prefetch_related_objects
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+
+from .models import (
+    ArchivedCase, ArchivedCaseEvent, ArchivedCourtDecision, ArchivedSuspectCourtRuling, Case, CaseEvent,
+    CourtDecision, Suspect, SuspectCourtRuling, Witness,
+)
+
+# 'events', the case history, is only loaded when asked for
+RELATED = ('witnesses', 'suspects', 'court_decisions')
+
+
+def _lookups(parts, archived=False):
+    lookups = []
+    if 'witnesses' in parts:
+        lookups.append(Prefetch(
+            'witnesses', queryset=Witness.objects.select_related('recorded_by__profile'),
+        ))
+    if 'suspects' in parts:
+        lookups.append(Prefetch(
+            'suspects', queryset=Suspect.objects.select_related('recorded_by__profile'),
+        ))
+        lookups.append(Prefetch(
+            'suspects__archived_rulings' if archived else 'suspects__rulings',
+            queryset=(ArchivedSuspectCourtRuling if archived else SuspectCourtRuling).objects.select_related(
+                'case', 'recorded_by__profile',
+            ).order_by('recorded_at'),
+        ))
+    if 'court_decisions' in parts:
+        lookups.append(Prefetch(
+            'court_decisions',
+            queryset=(ArchivedCourtDecision if archived else CourtDecision).objects.select_related(
+                'recorded_by__profile',
+            ).order_by('decision_date'),
+        ))
+    if 'events' in parts:
+        events = ArchivedCaseEvent if archived else CaseEvent
+        lookups.append(Prefetch(
+            'events', queryset=events.objects.select_related('actor__profile').order_by('occurred_at', 'id'),
+        ))
+    return lookups
+
+
+class CaseGraph:
+    """
+    A case with its complainant, witnesses, suspects and their rulings, court
+    decisions and every user and profile those reference, loaded with one
+    query per relation however large the case is.
+
+    The relations are prefetched onto the case itself, so templates can keep
+    using ``case.witnesses.all`` and friends without extra queries. ``parts``
+    limits which of RELATED are loaded.
+
+    An archived case (ArchivedCase) has the same fields and relations, so it
+    renders through the same templates; ``archived`` tells the two apart.
+    """
+
+    def __init__(self, case):
+        self.case = case
+
+    @property
+    def archived(self):
+        return isinstance(self.case, ArchivedCase)
+
+    @staticmethod
+    def queryset(parts=RELATED, archived=False):
+        # Views decide themselves whether a deleted case may be shown
+        cases = ArchivedCase.objects if archived else Case.all_with_deleted
+        return cases.select_related(
+            'complainant', 'recorded_by__profile', 'deleted_by__profile',
+        ).prefetch_related(*_lookups(parts, archived))
+
+    @classmethod
+    def get(cls, parts=RELATED, **lookup):
+        return cls(cls.queryset(parts).get(**lookup))
+
+    @classmethod
+    def get_or_404(cls, parts=RELATED, include_archived=False, **lookup):
+        """The case matching ``lookup``; with ``include_archived``, the archive is tried when no live case does."""
+        try:
+            return cls.get(parts, **lookup)
+        except Case.DoesNotExist:
+            if not include_archived:
+                raise Http404("No case matches the given query.")
+        return cls(get_object_or_404(cls.queryset(parts, archived=True), **lookup))
+
+    @classmethod
+    def prefetch(cls, cases, parts=RELATED):
+        """Load the graph for cases that were fetched without it, in bulk. All live or all archived."""
+        archived = bool(cases) and isinstance(cases[0], ArchivedCase)
+        prefetch_related_objects(
+            cases, 'complainant', 'recorded_by__profile', 'deleted_by__profile', *_lookups(parts, archived),
+        )
+        return [cls(case) for case in cases]
+
+    @property
+    def witnesses(self):
+        return list(self.case.witnesses.all())
+
+    @property
+    def suspects(self):
+        return list(self.case.suspects.all())
+
+    @property
+    def court_decisions(self):
+        return list(self.case.court_decisions.all())
+
+    @property
+    def events(self):
+        return list(self.case.events.all())
+
+    def suspect(self, uuid):
+        for suspect in self.case.suspects.all():
+            if suspect.uuid == uuid:
+                return suspect
+        raise Http404("No suspect with that id on this case.")
+
+    def witness(self, uuid):
+        for witness in self.case.witnesses.all():
+            if witness.uuid == uuid:
+                return witness
+        raise Http404("No witness with that id on this case.")
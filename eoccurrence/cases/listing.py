@@ -0,0 +1,31 @@
+import hashlib
+
+from django.conf import settings
+
+from core import counts
+
+from .models import Case
+
+# A rendered page of the case listing, for one Case write generation
+LISTING_TIMEOUT = getattr(settings, 'CASE_LISTING_CACHE_TIMEOUT', 60 * 60)
+# A single case card; its key changes whenever the case is saved
+CARD_TIMEOUT = getattr(settings, 'CASE_CARD_CACHE_TIMEOUT', 24 * 60 * 60)
+
+
+def listing_cache_context(request):
+    """
+    Template context for the fragment caches in cases/partials/case-listing.html.
+
+    The listing key combines the Case table's write generation (bumped by
+    every save or delete through core.counts.invalidate), the viewer's role
+    and the query string, so any write to a case retires every cached page
+    while repeat views of an unchanged listing render from one cache read.
+    """
+    role = request.principal.role
+    query = hashlib.md5(request.GET.urlencode().encode()).hexdigest()
+    return {
+        'viewer_role': role,
+        'listing_key': f"{counts.generation(Case)}:{role}:{request.path}:{query}",
+        'listing_timeout': LISTING_TIMEOUT,
+        'card_timeout': CARD_TIMEOUT,
+    }
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from cases import archive
+
+
+class Command(BaseCommand):
+    help = (
+        "Move closed, dismissed and transferred cases that have not changed for --days days, "
+        "with their links, court decisions, rulings and history, to the archive tables. Each "
+        "batch is moved in its own transaction. Archived cases leave listings and search but "
+        "still open by uuid; bring them back with restore_cases."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=archive.ARCHIVE_AFTER_DAYS)
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--dry-run', action='store_true', help="Only count the cases that would be moved.")
+
+    def handle(self, *args, **options):
+        cases = archive.archivable(options['days'])
+        ids = list(cases.order_by('pk').values_list('pk', flat=True))
+        if options['dry_run']:
+            self.stdout.write(f"{len(ids)} cases would be archived.")
+            return
+
+        total = 0
+        size = options['batch_size']
+        for start in range(0, len(ids), size):
+            # Filtered again inside the batch's transaction, so a case
+            # reopened or edited since it was listed stays where it is
+            total += archive.archive_cases(cases.filter(pk__in=ids[start:start + size]))
+            self.stdout.write(f"Archived {total} of {len(ids)} cases...")
+        self.stdout.write(self.style.SUCCESS(f"Archived {total} cases."))
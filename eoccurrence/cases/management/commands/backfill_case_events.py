@@ -0,0 +1,78 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from cases.models import Case, CaseEvent, CourtDecision, SuspectCourtRuling
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed the case history for cases that have none, e.g. after generate_dataset or an "
+        "upgrade: when each case was recorded and deleted, its suspects and witnesses, court "
+        "decisions and rulings. Status edits made before the history existed left no trace "
+        "and are not recovered."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        ids = list(Case.all_with_deleted.filter(
+            ~Exists(CaseEvent.objects.filter(case=OuterRef('pk')))
+        ).order_by('pk').values_list('pk', flat=True))
+
+        total = 0
+        size = options['batch_size']
+        for start in range(0, len(ids), size):
+            with transaction.atomic():
+                events = self.events(ids[start:start + size])
+                CaseEvent.objects.bulk_create(events, batch_size=1000)
+            total += len(events)
+        self.stdout.write(self.style.SUCCESS(f"Added {total} events for {len(ids)} cases."))
+
+    def events(self, ids):
+        cases = {
+            case.pk: case for case in Case.all_with_deleted.filter(pk__in=ids).only(
+                'created_at', 'updated_at', 'recorded_by', 'status', 'deleted', 'deleted_at', 'deleted_by',
+            )
+        }
+        events = []
+
+        def add(case_id, kind, occurred_at, actor_id, summary, **data):
+            events.append(CaseEvent(
+                case_id=case_id, kind=kind, occurred_at=occurred_at, actor_id=actor_id, summary=summary, data=data,
+            ))
+
+        for case in cases.values():
+            add(case.pk, 'created', case.created_at, case.recorded_by_id, "Case recorded", status=case.status)
+            if case.deleted:
+                add(case.pk, 'deleted', case.deleted_at or case.updated_at, case.deleted_by_id, "Case deleted")
+
+        # Link rows carry no timestamp; the person's own record date stands in,
+        # but never before the case was recorded
+        for link in Case.suspects.through.objects.filter(case_id__in=ids).select_related('suspect'):
+            suspect, case = link.suspect, cases[link.case_id]
+            day = datetime.datetime.combine(suspect.statement_date, datetime.time.min) if suspect.statement_date else None
+            added = max(case.created_at, timezone.make_aware(day)) if day else case.created_at
+            add(case.pk, 'suspect_added', added, suspect.recorded_by_id, f"Suspect {suspect.name} added",
+                suspect=str(suspect.uuid))
+        for link in Case.witnesses.through.objects.filter(case_id__in=ids).select_related('witness'):
+            witness, case = link.witness, cases[link.case_id]
+            add(case.pk, 'witness_added', max(case.created_at, witness.created_at), witness.recorded_by_id,
+                f"Witness {witness.name} added", witness=str(witness.uuid))
+
+        for decision in CourtDecision.objects.filter(case_id__in=ids):
+            add(decision.case_id, 'decision', decision.decision_date, decision.recorded_by_id,
+                f"Court decision recorded: {decision.get_decision_type_display()}",
+                decision=str(decision.uuid), decision_type=decision.decision_type)
+        for ruling in SuspectCourtRuling.objects.filter(case_id__in=ids).select_related('suspect'):
+            add(ruling.case_id, 'ruling', ruling.recorded_at, ruling.recorded_by_id,
+                f"Ruling recorded for {ruling.suspect.name}: {ruling.get_ruling_type_display()}",
+                ruling=str(ruling.uuid), suspect=str(ruling.suspect.uuid), ruling_type=ruling.ruling_type)
+
+        # Inserted in time order so ids break ties the same way
+        events.sort(key=lambda event: (event.case_id, event.occurred_at))
+        return events
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from cases import gazetteer
+from cases.models import ArchivedCase, Case, Complainant, HotspotCell
+from core import counts
+
+
+class Command(BaseCommand):
+    help = (
+        "Match the free-text location of every case and the county and sub-county of every "
+        "complainant against the gazetteer, e.g. after load_gazetteer, then rebuild the "
+        "hotspot grid. Rows are read and updated in primary key batches; repeated locations "
+        "are only matched once."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        size = options['batch_size']
+        for model, fields in (
+            (Case, ('location',)), (ArchivedCase, ('location',)), (Complainant, ('sub_county', 'county')),
+        ):
+            changed = self.backfill(model, fields, size)
+            self.stdout.write(f"{model._meta.verbose_name_plural}: {changed} matched differently.")
+        counts.invalidate(Case)
+
+        self.stdout.write("Rebuilding the hotspot grid...")
+        rows = HotspotCell.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} hotspot cells."))
+
+    def backfill(self, model, fields, size):
+        rows = model._base_manager.order_by('pk').values_list('pk', 'area_id', *fields)
+        changed, last = 0, None
+        while True:
+            batch = list((rows.filter(pk__gt=last) if last is not None else rows)[:size])
+            if not batch:
+                return changed
+            last = batch[-1][0]
+
+            updates = []
+            for pk, area_id, *parts in batch:
+                matched = gazetteer.match(", ".join(part for part in parts if part))
+                if matched != area_id:
+                    updates.append(model(pk=pk, area_id=matched))
+            # Written without save(), which would match each row again
+            with transaction.atomic():
+                model._base_manager.bulk_update(updates, ['area'], batch_size=500)
+            changed += len(updates)
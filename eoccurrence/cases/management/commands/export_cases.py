@@ -0,0 +1,50 @@
+import sys
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.principal import Principal
+from cases import export
+from cases.filters import report_cases, report_filter, search_filter
+from cases.models import Case
+
+
+class Command(BaseCommand):
+    help = "Stream cases to CSV or NDJSON with the filters of the reports and search pages."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=sorted(export.FORMATS), default='csv')
+        parser.add_argument('--output', help="File to write; defaults to stdout.")
+        parser.add_argument('--q', default='', help="Reports filter: case number, title or complainant name.")
+        parser.add_argument('--query', default='', help="Search filter over case and complainant fields.")
+        parser.add_argument('--status', default='')
+        parser.add_argument('--recorded-by', default='')
+        parser.add_argument(
+            '--as-user',
+            help="Apply this user's visibility (only admins see deleted cases). Defaults to every case.",
+        )
+
+    def handle(self, *args, **options):
+        if options['as_user']:
+            try:
+                user = User.objects.select_related('profile').get(username=options['as_user'])
+            except User.DoesNotExist:
+                raise CommandError(f"No user named {options['as_user']!r}.")
+            cases = report_cases(Principal(user), options['q'])
+        else:
+            cases = report_filter(Case.all_with_deleted.order_by('-created_at'), options['q'])
+        cases = search_filter(cases, options['query'], options['status'], options['recorded_by'])
+
+        output = open(options['output'], 'w', newline='', encoding='utf-8') if options['output'] else sys.stdout
+        try:
+            rows = 0
+            for chunk in export.iter_export(cases, options['format']):
+                output.write(chunk)
+                rows += 1
+        finally:
+            if options['output']:
+                output.close()
+
+        if options['format'] == 'csv':
+            rows -= 1  # header
+        self.stderr.write(self.style.SUCCESS(f"Exported {rows} cases."))
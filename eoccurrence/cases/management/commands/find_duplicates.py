@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from cases import dedupe
+
+
+class Command(BaseCommand):
+    help = (
+        "Find complainants, suspects and witnesses entered more than once. People created or "
+        "updated since the last run are keyed by ID number, phone number and phonetic name, "
+        "compared with the people who share a key in worker processes, and their clusters "
+        "rebuilt for review in the admin. --full keys and compares everyone again."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help="Re-key and re-score every person.")
+        parser.add_argument('--workers', type=int, default=dedupe.WORKERS)
+
+    def handle(self, *args, **options):
+        result = dedupe.refresh(full=options['full'], workers=options['workers'])
+        if result['skipped']:
+            self.stdout.write(
+                f"Skipped {result['skipped']} blocks of more than {dedupe.MAX_BLOCK_SIZE} people."
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"Keyed {result['people']} people, found {result['pairs']} likely duplicate pairs "
+            f"and {result['clusters']} new clusters to review."
+        ))
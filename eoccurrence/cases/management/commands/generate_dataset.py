@@ -0,0 +1,220 @@
+import datetime
+import random
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import Userprofile
+from cases import gazetteer, search
+from cases.bulk import backdated, model_fields
+from cases.models import (
+    Case, CaseNumberSequence, CaseStatisticsRollup, Complainant, CourtDecision, HotspotCell,
+    Suspect, SuspectCourtRuling, Witness,
+)
+from cases.transitions import RULING_BAIL_STATUS
+from core import counts
+
+FIRST_NAMES = [
+    'Achieng', 'Amina', 'Brian', 'Chebet', 'David', 'Esther', 'Faith', 'Grace', 'Hassan',
+    'Irene', 'James', 'Kamau', 'Lilian', 'Mercy', 'Njeri', 'Otieno', 'Peter', 'Wanjiru',
+]
+LAST_NAMES = [
+    'Kariuki', 'Mwangi', 'Ochieng', 'Wafula', 'Kiprono', 'Muthoni', 'Omondi', 'Njoroge',
+    'Chege', 'Barasa', 'Korir', 'Akinyi', 'Ali', 'Mutua', 'Wambui', 'Kimani',
+]
+PLACES = [
+    ('Nairobi', 'Westlands'), ('Nairobi', 'Embakasi'), ('Nairobi', 'Kasarani'),
+    ('Mombasa', 'Nyali'), ('Mombasa', 'Likoni'), ('Kisumu', 'Kisumu Central'),
+    ('Nakuru', 'Nakuru East'), ('Uasin Gishu', 'Kapseret'), ('Kiambu', 'Thika Town'),
+    ('Machakos', 'Mavoko'), ('Kakamega', 'Lurambi'), ('Nyeri', 'Nyeri Town'),
+]
+STATUS_WEIGHTS = {
+    'open': 30, 'under_investigation': 25, 'in_court': 20,
+    'closed': 15, 'dismissed': 7, 'transferred': 3,
+}
+DECISION_FOR_STATUS = {
+    'in_court': 'ADJOURNED', 'closed': 'CLOSED', 'dismissed': 'DISMISSED', 'transferred': 'TRANSFERRED',
+}
+
+
+class Command(BaseCommand):
+    help = "Generate a synthetic occurrence-book dataset with bulk inserts, for load and benchmark runs."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cases', type=int, default=10000)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--years', type=int, default=5, help="Spread report dates over this many years.")
+        parser.add_argument('--officers', type=int, default=50)
+        parser.add_argument('--max-suspects', type=int, default=3)
+        parser.add_argument('--max-witnesses', type=int, default=3)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--skip-search-index', action='store_true',
+            help="Leave the full-text index for a later rebuild_search_index run.",
+        )
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        self.run_id = f"{options['seed']}{int(time.time()) % 100000}"
+        # Nothing generated is dated after this, so date-range queries see data that could exist
+        self.now = timezone.now()
+        self.today = self.now.date()
+        self.days = max(options['years'] * 365, 1)
+        self.options = options
+
+        officers = self.officers(options['officers'])
+        # Generated places are in the gazetteer, so records get their area up front
+        self.areas = {place: gazetteer.ensure(*place).pk for place in PLACES}
+        started = time.monotonic()
+        created = 0
+        backdated_fields = (
+            model_fields(Case, 'report_date', 'created_at', 'updated_at')
+            + model_fields(Complainant, 'created_at', 'updated_at')
+            + model_fields(Suspect, 'statement_date', 'updated_at')
+            + model_fields(Witness, 'date_of_statement', 'created_at', 'updated_at')
+            + model_fields(CourtDecision, 'decision_date', 'updated_at')
+            + model_fields(SuspectCourtRuling, 'recorded_at', 'updated_at')
+        )
+
+        with backdated(*backdated_fields):
+            while created < options['cases']:
+                size = min(options['batch_size'], options['cases'] - created)
+                with transaction.atomic():
+                    self.batch(size, created, officers)
+                created += size
+                rate = created / max(time.monotonic() - started, 1e-6)
+                self.stdout.write(f"{created}/{options['cases']} cases ({rate:,.0f} cases/s)")
+
+        # Bulk inserts skip save() and signals, so rebuild the derived tables
+        self.stdout.write("Rebuilding case statistics...")
+        CaseStatisticsRollup.rebuild()
+        HotspotCell.rebuild()
+        if not options['skip_search_index']:
+            self.stdout.write("Rebuilding search index...")
+            search.rebuild_index()
+        for model in (Case, Complainant, Suspect, Witness):
+            counts.invalidate(model)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {created} cases in {time.monotonic() - started:.1f}s."
+        ))
+
+    def officers(self, count):
+        officers = list(User.objects.filter(username__startswith='officer_').order_by('pk')[:count])
+        new = [
+            User(username=f"officer_{self.run_id}_{n}", first_name=self.random.choice(FIRST_NAMES),
+                 last_name=self.random.choice(LAST_NAMES))
+            for n in range(count - len(officers))
+        ]
+        for user in new:
+            user.set_unusable_password()
+        new = User.objects.bulk_create(new)
+        Userprofile.objects.bulk_create([
+            Userprofile(user=user, id_number=f"P{self.run_id}{n}", user_role='police', department='Records')
+            for n, user in enumerate(new)
+        ])
+        return officers + new
+
+    def when(self, index):
+        # Cases are generated oldest first, so a batch spans only a few report
+        # days and takes its case numbers in a few blocks
+        day = self.today - datetime.timedelta(days=self.days - 1 - index * self.days // self.options['cases'])
+        moment = datetime.datetime.combine(day, datetime.time(self.random.randrange(24), self.random.randrange(60)))
+        return day, min(timezone.make_aware(moment), self.now)
+
+    def name(self):
+        return f"{self.random.choice(FIRST_NAMES)} {self.random.choice(LAST_NAMES)}"
+
+    def batch(self, size, offset, officers):
+        rand = self.random
+        case_types = [choice for choice, _ in Case.CASE_TYPE_CHOICES]
+        statuses, weights = zip(*STATUS_WEIGHTS.items())
+
+        dates = sorted((self.when(offset + n) for n in range(size)), key=lambda pair: pair[1])
+        complainants = []
+        for n, (day, moment) in enumerate(dates):
+            county, sub_county = rand.choice(PLACES)
+            first, last = self.name().split(' ')
+            complainants.append(Complainant(
+                first_name=first, last_name=last, id_number=f"C{self.run_id}{offset + n}",
+                phone_number=f"07{rand.randrange(10 ** 8):08d}", gender=rand.choice('MF'),
+                county=county, sub_county=sub_county, area_id=self.areas[county, sub_county],
+                statement=f"Reported an incident at {sub_county}.", created_at=moment, updated_at=moment,
+            ))
+        complainants = Complainant.objects.bulk_create(complainants)
+
+        # Case numbers are taken in one block per report day
+        numbers = {}
+        for day, _ in dates:
+            numbers[day] = numbers.get(day, 0) + 1
+        numbers = {day: iter(CaseNumberSequence.allocate(count, day=day)) for day, count in numbers.items()}
+
+        cases = []
+        for complainant, (day, moment) in zip(complainants, dates):
+            case_type = rand.choice(case_types)
+            status = rand.choices(statuses, weights)[0]
+            cases.append(Case(
+                case_number=next(numbers[day]), case_type=case_type, complainant=complainant,
+                incident_date=day - datetime.timedelta(days=rand.randrange(3)),
+                report_date=day, location=f"{complainant.sub_county}, {complainant.county}", area_id=complainant.area_id,
+                title=f"{dict(Case.CASE_TYPE_CHOICES)[case_type]} at {complainant.sub_county}",
+                description="Synthetic record generated for load testing.",
+                recorded_by=rand.choice(officers), status=status,
+                court_date=min(day + datetime.timedelta(days=30), self.today) if status == 'closed' else None,
+                created_at=moment, updated_at=moment,
+            ))
+        cases = Case.objects.bulk_create(cases)
+
+        # Every generated person belongs to exactly one case, so their case
+        # summary, ruling and bail status are known before they are inserted
+        ruling_types = [choice for choice, _ in SuspectCourtRuling.RULING_CHOICES]
+        suspects, witnesses, rulings = [], [], []
+        for case in cases:
+            summary = [{'uuid': str(case.uuid), 'case_number': case.case_number, 'status': case.status}]
+            for _ in range(rand.randint(0, self.options['max_suspects'])):
+                suspect = Suspect(
+                    name=self.name(), gender=rand.choice('MF'), recorded_by=case.recorded_by,
+                    charges=case.get_case_type_display(), statement_date=case.report_date,
+                    case_summary=summary, updated_at=case.created_at,
+                )
+                if case.status in ('in_court', 'closed', 'dismissed'):
+                    ruling_type = rand.choice(ruling_types)
+                    suspect.bail_status = RULING_BAIL_STATUS.get(ruling_type, 'not_applicable')
+                    rulings.append((suspect, SuspectCourtRuling(
+                        case=case, ruling_type=ruling_type, ruling_text="Synthetic ruling.",
+                        recorded_by=case.recorded_by, recorded_at=case.created_at, updated_at=case.created_at,
+                    )))
+                suspects.append((case, suspect))
+            for _ in range(rand.randint(0, self.options['max_witnesses'])):
+                witnesses.append((case, Witness(
+                    name=self.name(), gender=rand.choice('MF'), recorded_by=case.recorded_by,
+                    statement="Saw the incident.", date_of_statement=case.report_date,
+                    case_summary=summary, created_at=case.created_at, updated_at=case.created_at,
+                )))
+        Suspect.objects.bulk_create([suspect for _, suspect in suspects])
+        Witness.objects.bulk_create([witness for _, witness in witnesses])
+
+        Case.suspects.through.objects.bulk_create([
+            Case.suspects.through(case_id=case.pk, suspect_id=suspect.pk) for case, suspect in suspects
+        ])
+        Case.witnesses.through.objects.bulk_create([
+            Case.witnesses.through(case_id=case.pk, witness_id=witness.pk) for case, witness in witnesses
+        ])
+
+        decisions = []
+        for case in cases:
+            decision_type = DECISION_FOR_STATUS.get(case.status)
+            if decision_type:
+                decided = min(case.created_at + datetime.timedelta(days=rand.randrange(1, 60)), self.now)
+                decisions.append(CourtDecision(
+                    case=case, recorded_by=case.recorded_by, decision_type=decision_type,
+                    decision_text="Synthetic court decision.", decision_date=decided, updated_at=decided,
+                ))
+        CourtDecision.objects.bulk_create(decisions)
+
+        for suspect, ruling in rulings:
+            ruling.suspect = suspect
+        SuspectCourtRuling.objects.bulk_create([ruling for _, ruling in rulings])
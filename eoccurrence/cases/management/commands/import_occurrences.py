@@ -0,0 +1,363 @@
+import copy
+import csv
+import json
+import os
+import time
+from collections import Counter
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from cases import gazetteer, search
+from cases.bulk import backdated, model_fields
+from cases.forms import CaseForm, ComplainantForm, SuspectForm, WitnessForm
+from cases.models import (
+    ArchivedCase, Case, CaseEvent, CaseNumberSequence, CaseStatisticsRollup, Complainant, HotspotCell, Suspect,
+    Witness,
+)
+from core import counts
+
+CASE_NUMBER_LENGTH = Case._meta.get_field('case_number').max_length
+
+
+class ImportComplainantForm(ComplainantForm):
+    # id_number uniqueness is checked for a whole batch in one query
+    def validate_unique(self):
+        pass
+
+
+class FormTemplate:
+    """
+    Builds a form once and binds copies of it to each record. A new ModelForm
+    deep-copies all of its fields and widgets, which dominates the cost of
+    validating millions of small records; the copies share the unchanged
+    field definitions and only get their own data, errors and instance.
+    """
+
+    def __init__(self, form_class):
+        self.form = form_class()
+
+    def bind(self, data):
+        form = copy.copy(self.form)
+        form.data = data
+        form.is_bound = True
+        form._errors = None
+        form._bound_fields_cache = {}
+        form.instance = form._meta.model()
+        return form
+
+
+def _error_dict(form):
+    return {field: [str(error) for error in errors] for field, errors in form.errors.items()}
+
+
+class MalformedRecord:
+    """Stands in for a record that could not be parsed, so it is rejected like any other."""
+
+    def __init__(self, error):
+        self.error = error
+
+
+def _shape_errors(record):
+    """Why ``record`` is not laid out as the importer expects, or None."""
+    if isinstance(record, MalformedRecord):
+        return {'record': [record.error]}
+    if not isinstance(record, dict):
+        return {'record': ["Expected a JSON object."]}
+    errors = {}
+    for section in ('complainant', 'case'):
+        if not isinstance(record.get(section) or {}, dict):
+            errors[section] = ["Expected a JSON object."]
+    for people in ('suspects', 'witnesses'):
+        value = record.get(people) or []
+        if not isinstance(value, list) or not all(isinstance(person, dict) for person in value):
+            errors[people] = ["Expected a list of JSON objects."]
+    return errors or None
+
+
+def read_csv(path):
+    """One case per row: complainant.<field> and case.<field> columns, suspects/witnesses as JSON lists."""
+    with open(path, newline='', encoding='utf-8') as source:
+        for row in csv.DictReader(source):
+            record = {'complainant': {}, 'case': {}}
+            for column, value in row.items():
+                section, _, field = (column or '').partition('.')
+                if section in ('complainant', 'case') and field:
+                    record[section][field] = value
+            try:
+                for people in ('suspects', 'witnesses'):
+                    record[people] = json.loads(row.get(people) or '[]')
+            except ValueError as error:
+                record = MalformedRecord(f"Invalid JSON in {people}: {error}")
+            yield record
+
+
+def read_ndjson(path):
+    """One JSON object per line: {"complainant": {...}, "case": {...}, "suspects": [...], "witnesses": [...]}."""
+    # Read as bytes so a line that is not valid UTF-8 is rejected on its own
+    with open(path, 'rb') as source:
+        for line in source:
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except ValueError as error:
+                    yield MalformedRecord(f"Invalid JSON: {error}")
+
+
+class Command(BaseCommand):
+    help = (
+        "Import legacy occurrence-book records from CSV or NDJSON in bulk. Records are "
+        "validated with the data-entry forms, inserted in batches with their case numbers "
+        "reserved in blocks, and the position of the last committed batch is kept in a "
+        "checkpoint file so an interrupted import resumes where it stopped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=['csv', 'ndjson'], help="Defaults to the file extension.")
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--recorded-by', help="Username the imported records are attributed to.")
+        parser.add_argument('--checkpoint', help="Defaults to <path>.checkpoint.")
+        parser.add_argument('--errors', help="Rejected records are written here; defaults to <path>.errors.ndjson.")
+        parser.add_argument('--restart', action='store_true', help="Ignore an existing checkpoint.")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or ('csv' if path.lower().endswith('.csv') else 'ndjson')
+        self.checkpoint_path = options['checkpoint'] or f"{path}.checkpoint"
+        errors_path = options['errors'] or f"{path}.errors.ndjson"
+
+        self.recorded_by = None
+        if options['recorded_by']:
+            try:
+                self.recorded_by = User.objects.get(username=options['recorded_by'])
+            except User.DoesNotExist:
+                raise CommandError(f"No user named {options['recorded_by']!r}.")
+
+        self.forms = {
+            'complainant': FormTemplate(ImportComplainantForm),
+            'case': FormTemplate(CaseForm),
+            'suspects': FormTemplate(SuspectForm),
+            'witnesses': FormTemplate(WitnessForm),
+        }
+
+        done = 0 if options['restart'] else self.read_checkpoint()
+        if done:
+            self.stdout.write(f"Resuming after record {done}.")
+
+        records = read_csv(path) if fmt == 'csv' else read_ndjson(path)
+        started = time.monotonic()
+        imported = rejected = 0
+        batch = []
+
+        with open(errors_path, 'a', encoding='utf-8') as self.errors:
+            for index, record in enumerate(records):
+                if index < done:
+                    continue
+                batch.append((index, record))
+                if len(batch) == options['batch_size']:
+                    added, failed = self.import_batch(batch)
+                    imported, rejected = imported + added, rejected + failed
+                    self.write_checkpoint(index + 1)
+                    self.report(imported, rejected, started)
+                    batch = []
+
+            if batch:
+                added, failed = self.import_batch(batch)
+                imported, rejected = imported + added, rejected + failed
+                self.write_checkpoint(batch[-1][0] + 1)
+
+        for model in (Case, Complainant, Suspect, Witness):
+            counts.invalidate(model)
+
+        self.report(imported, rejected, started)
+        if rejected:
+            self.stdout.write(self.style.WARNING(f"{rejected} records rejected, see {errors_path}."))
+        self.stdout.write(self.style.SUCCESS(f"Imported {imported} cases."))
+
+    def report(self, imported, rejected, started):
+        elapsed = max(time.monotonic() - started, 1e-6)
+        self.stdout.write(
+            f"{imported} imported, {rejected} rejected, {(imported + rejected) / elapsed:,.0f} rows/s"
+        )
+
+    def read_checkpoint(self):
+        try:
+            with open(self.checkpoint_path) as checkpoint:
+                return json.load(checkpoint)['records']
+        except FileNotFoundError:
+            return 0
+
+    def write_checkpoint(self, records):
+        # Written after the batch commits, and replaced atomically
+        temporary = f"{self.checkpoint_path}.tmp"
+        with open(temporary, 'w') as checkpoint:
+            json.dump({'records': records}, checkpoint)
+        os.replace(temporary, self.checkpoint_path)
+
+    def reject(self, index, errors):
+        self.errors.write(json.dumps({'record': index, 'errors': errors}) + "\n")
+
+    def validate(self, index, record):
+        """The model instances for one record, or None after logging why it was rejected."""
+        malformed = _shape_errors(record)
+        if malformed:
+            self.reject(index, malformed)
+            return None
+
+        errors = {}
+        complainant_form = self.forms['complainant'].bind(record.get('complainant') or {})
+        case_data = record.get('case') or {}
+        case_form = self.forms['case'].bind(case_data)
+        people = []
+        for kind in ('suspects', 'witnesses'):
+            for position, data in enumerate(record.get(kind) or []):
+                form = self.forms[kind].bind(data)
+                people.append((kind, form))
+                if not form.is_valid():
+                    errors[f"{kind}[{position}]"] = _error_dict(form)
+
+        if not complainant_form.is_valid():
+            errors['complainant'] = _error_dict(complainant_form)
+        if not case_form.is_valid():
+            errors['case'] = _error_dict(case_form)
+
+        report_date = parse_date(case_data.get('report_date') or '') if case_data.get('report_date') else None
+        if case_data.get('report_date') and report_date is None:
+            errors['case.report_date'] = ["Enter a valid date."]
+        case_number = str(case_data.get('case_number') or '').strip()
+        if len(case_number) > CASE_NUMBER_LENGTH:
+            errors['case.case_number'] = [f"Ensure this value has at most {CASE_NUMBER_LENGTH} characters."]
+        if errors:
+            self.reject(index, errors)
+            return None
+
+        complainant = complainant_form.save(commit=False)
+        complainant.area_id = gazetteer.match(complainant.place())
+        case = case_form.save(commit=False)
+        case.area_id = gazetteer.match(case.location)
+        case.case_number = case_number
+        case.report_date = report_date or timezone.now().date()
+        case.recorded_by = self.recorded_by
+        if case.status == 'closed' and not case.court_date:
+            case.court_date = timezone.now().date()
+
+        suspects, witnesses = [], []
+        for kind, form in people:
+            person = form.save(commit=False)
+            person.recorded_by = self.recorded_by
+            if kind == 'suspects':
+                person.statement_date = case.report_date
+                suspects.append(person)
+            else:
+                person.date_of_statement = case.report_date
+                witnesses.append(person)
+        return complainant, case, suspects, witnesses
+
+    def drop_duplicates(self, rows, key, field, existing):
+        """Reject rows whose ``key`` is already taken, in the database or earlier in the batch."""
+        kept, seen = [], set(existing)
+        for row in rows:
+            value = key(row)
+            if value and value in seen:
+                self.reject(row[0], {field: ["Already exists."]})
+                continue
+            if value:
+                seen.add(value)
+            kept.append(row)
+        return kept
+
+    def import_batch(self, batch):
+        rows = []
+        for index, record in batch:
+            parsed = self.validate(index, record)
+            if parsed is not None:
+                rows.append((index, *parsed))
+
+        id_numbers = [row[1].id_number for row in rows if row[1].id_number]
+        rows = self.drop_duplicates(
+            rows, lambda row: row[1].id_number, 'complainant.id_number',
+            Complainant.objects.filter(id_number__in=id_numbers).values_list('id_number', flat=True),
+        )
+        case_numbers = [row[2].case_number for row in rows if row[2].case_number]
+        rows = self.drop_duplicates(
+            rows, lambda row: row[2].case_number, 'case.case_number',
+            # Archived cases keep their numbers too
+            Case.all_with_deleted.filter(case_number__in=case_numbers).order_by().values_list(
+                'case_number', flat=True,
+            ).union(ArchivedCase.objects.filter(case_number__in=case_numbers).order_by().values_list(
+                'case_number', flat=True,
+            )),
+        )
+        if not rows:
+            return 0, len(batch)
+
+        fields = model_fields(Case, 'report_date') + model_fields(Suspect, 'statement_date') \
+            + model_fields(Witness, 'date_of_statement')
+        with transaction.atomic(), backdated(*fields):
+            complainants = Complainant.objects.bulk_create([row[1] for row in rows])
+
+            # Explicit numbers in our own format move their day's sequence past
+            # them first, so later intakes cannot be handed the same number
+            explicit = {}
+            for row in rows:
+                parsed = CaseNumberSequence.parse(row[2].case_number)
+                if parsed:
+                    day, number = parsed
+                    explicit[day] = max(explicit.get(day, 0), number)
+            for day, number in explicit.items():
+                CaseNumberSequence.advance(day, number)
+
+            # Case numbers are reserved in one block per report day
+            needed = Counter(row[2].report_date for row in rows if not row[2].case_number)
+            numbers = {
+                day: iter(CaseNumberSequence.allocate(count, day=day)) for day, count in needed.items()
+            }
+            cases = []
+            for complainant, (_, _, case, _, _) in zip(complainants, rows):
+                case.complainant = complainant
+                if not case.case_number:
+                    case.case_number = next(numbers[case.report_date])
+                cases.append(case)
+            Case.objects.bulk_create(cases)
+
+            # Each imported person belongs to exactly one case, so their case
+            # summary is known up front
+            suspect_links, witness_links = [], []
+            for case, (_, _, _, suspects, witnesses) in zip(cases, rows):
+                summary = [{'uuid': str(case.uuid), 'case_number': case.case_number, 'status': case.status}]
+                for person in suspects + witnesses:
+                    person.case_summary = summary
+                suspect_links.extend((case, suspect) for suspect in suspects)
+                witness_links.extend((case, witness) for witness in witnesses)
+            Suspect.objects.bulk_create([suspect for _, suspect in suspect_links])
+            Witness.objects.bulk_create([witness for _, witness in witness_links])
+            Case.suspects.through.objects.bulk_create([
+                Case.suspects.through(case_id=case.pk, suspect_id=suspect.pk) for case, suspect in suspect_links
+            ])
+            Case.witnesses.through.objects.bulk_create([
+                Case.witnesses.through(case_id=case.pk, witness_id=witness.pk) for case, witness in witness_links
+            ])
+
+            # bulk_create skips save() and signals, so keep the derived tables in step here
+            totals = {}
+            for case, (_, _, _, suspects, witnesses) in zip(cases, rows):
+                cases_, suspects_, witnesses_ = totals.get(case.rollup_key(), (0, 0, 0))
+                totals[case.rollup_key()] = (cases_ + 1, suspects_ + len(suspects), witnesses_ + len(witnesses))
+            for key, (cases_, suspects_, witnesses_) in totals.items():
+                CaseStatisticsRollup.adjust(key, cases=cases_, suspects=suspects_, witnesses=witnesses_)
+            for key, cases_ in Counter(case.hotspot_key() for case in cases).items():
+                HotspotCell.adjust(key, cases_)
+            search.index_cases(cases)
+            CaseEvent.objects.bulk_create([
+                CaseEvent(
+                    case=case, kind='created', occurred_at=case.created_at, actor_id=case.recorded_by_id,
+                    summary="Case imported", data={'status': case.status},
+                )
+                for case in cases
+            ])
+
+        return len(rows), len(batch) - len(rows)
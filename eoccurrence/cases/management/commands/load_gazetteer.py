@@ -0,0 +1,36 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from cases import gazetteer
+
+
+class Command(BaseCommand):
+    help = (
+        "Add areas to the location gazetteer from a CSV file with county, sub_county and "
+        "optionally locality columns. Existing areas are kept; run backfill_locations "
+        "afterwards to match existing cases and complainants against the new entries."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['path'], newline='', encoding='utf-8-sig') as source:
+                rows = list(csv.DictReader(source))
+        except OSError as error:
+            raise CommandError(f"Cannot read {options['path']}: {error}")
+        if rows and 'county' not in rows[0]:
+            raise CommandError("The file needs a header row with county, sub_county and locality columns.")
+
+        areas = set()
+        with transaction.atomic():
+            for row in rows:
+                names = [(row.get(column) or '').strip() for column in ('county', 'sub_county', 'locality')]
+                # A locality needs its sub-county, which needs its county
+                names = names[:names.index('')] if '' in names else names
+                if names:
+                    areas.add(gazetteer.ensure(*names).pk)
+        self.stdout.write(self.style.SUCCESS(f"Loaded {len(rows)} rows naming {len(areas)} areas."))
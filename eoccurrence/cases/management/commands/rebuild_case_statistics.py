@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from cases.models import CaseStatisticsRollup, HotspotCell
+
+
+class Command(BaseCommand):
+    help = "Rebuild the case statistics rollup and hotspot grid tables from scratch."
+
+    def handle(self, *args, **options):
+        rows = CaseStatisticsRollup.rebuild()
+        cells = HotspotCell.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} statistics rows and {cells} hotspot cells."))
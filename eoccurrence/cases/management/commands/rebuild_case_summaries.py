@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from cases.models import Suspect, Witness, refresh_case_summaries
+
+
+class Command(BaseCommand):
+    help = "Rebuild the linked-case summaries shown in the suspect and witness lists."
+
+    def handle(self, *args, **options):
+        for model in (Suspect, Witness):
+            ids = list(model.objects.values_list('pk', flat=True))
+            for start in range(0, len(ids), 2000):
+                refresh_case_summaries(model, ids[start:start + 2000])
+            self.stdout.write(self.style.SUCCESS(
+                f"Rebuilt case summaries for {len(ids)} {model._meta.verbose_name_plural}."
+            ))
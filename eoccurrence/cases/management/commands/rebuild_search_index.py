@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from cases import search
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index for all cases."
+
+    def handle(self, *args, **options):
+        if not search.is_supported():
+            raise CommandError("Full-text search is only available on PostgreSQL and SQLite.")
+
+        total = search.rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {total} cases."))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from cases import archive
+from cases.models import ArchivedCase
+
+
+class Command(BaseCommand):
+    help = (
+        "Move archived cases back to the live tables, by case number, or every case archived "
+        "since a date with --archived-since. Each batch is moved in its own transaction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('case_numbers', nargs='*')
+        parser.add_argument('--archived-since', help="Restore every case archived on or after this date (YYYY-MM-DD).")
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        if not options['case_numbers'] and not options['archived_since']:
+            raise CommandError("Give the case numbers to restore, or --archived-since.")
+
+        cases = ArchivedCase.objects.all()
+        if options['case_numbers']:
+            cases = cases.filter(case_number__in=options['case_numbers'])
+        if options['archived_since']:
+            cases = cases.filter(archived_at__date__gte=options['archived_since'])
+
+        ids = list(cases.order_by('pk').values_list('pk', flat=True))
+        missing = len(options['case_numbers']) - len(ids) if options['case_numbers'] else 0
+        if missing > 0:
+            self.stderr.write(f"{missing} of the given case numbers are not archived.")
+
+        total = 0
+        size = options['batch_size']
+        for start in range(0, len(ids), size):
+            total += archive.restore_cases(ArchivedCase.objects.filter(pk__in=ids[start:start + size]))
+        self.stdout.write(self.style.SUCCESS(f"Restored {total} cases."))
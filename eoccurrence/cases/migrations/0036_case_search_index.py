@@ -0,0 +1,58 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            "CREATE TABLE cases_case_search ("
+            "case_id bigint PRIMARY KEY REFERENCES cases_case (id) ON DELETE CASCADE, "
+            "document tsvector NOT NULL)"
+        )
+        schema_editor.execute(
+            "CREATE INDEX cases_case_search_document_gin ON cases_case_search USING gin (document)"
+        )
+        schema_editor.execute(
+            "INSERT INTO cases_case_search (case_id, document) "
+            "SELECT c.id, "
+            "setweight(to_tsvector('simple', regexp_replace(c.case_number, '\\W+', ' ', 'g')), 'A') || "
+            "setweight(to_tsvector('simple', regexp_replace(c.title, '\\W+', ' ', 'g')), 'B') || "
+            "setweight(to_tsvector('simple', regexp_replace("
+            "coalesce(p.first_name, '') || ' ' || coalesce(p.last_name, ''), '\\W+', ' ', 'g')), 'B') || "
+            "setweight(to_tsvector('simple', regexp_replace(coalesce(c.location, ''), '\\W+', ' ', 'g')), 'C') || "
+            "setweight(to_tsvector('simple', regexp_replace(c.description, '\\W+', ' ', 'g')), 'D') "
+            "FROM cases_case c LEFT JOIN cases_complainant p ON p.id = c.complainant_id"
+        )
+
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE cases_case_fts USING fts5("
+            "case_number, title, description, location, complainant)"
+        )
+        schema_editor.execute(
+            "INSERT INTO cases_case_fts (rowid, case_number, title, description, location, complainant) "
+            "SELECT c.id, c.case_number, c.title, c.description, coalesce(c.location, ''), "
+            "coalesce(p.first_name, '') || ' ' || coalesce(p.last_name, '') "
+            "FROM cases_case c LEFT JOIN cases_complainant p ON p.id = c.complainant_id"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+
+    if vendor == 'postgresql':
+        schema_editor.execute("DROP TABLE IF EXISTS cases_case_search")
+    elif vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS cases_case_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cases', '0035_alter_case_deleted_by'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
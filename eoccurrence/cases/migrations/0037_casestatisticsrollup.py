@@ -0,0 +1,56 @@
+# Generated by Django 5.2.5 on 2026-10-18 06:50
+
+from django.db import migrations, models
+from django.db.models import Count, F
+from django.db.models.functions import TruncMonth
+
+
+def populate_rollup(apps, schema_editor):
+    Case = apps.get_model('cases', 'Case')
+    CaseStatisticsRollup = apps.get_model('cases', 'CaseStatisticsRollup')
+    buckets = {}
+
+    def bucket(row):
+        key = (row['status'], row['case_type'], row['month'])
+        if key not in buckets:
+            buckets[key] = CaseStatisticsRollup(status=key[0], case_type=key[1], report_month=key[2])
+        return buckets[key]
+
+    live_cases = Case.objects.filter(deleted=False)
+    for row in live_cases.values('status', 'case_type', month=TruncMonth('report_date')).annotate(n=Count('id')).order_by():
+        bucket(row).case_count = row['n']
+
+    for through, counter in ((Case.suspects.through, 'suspect_count'), (Case.witnesses.through, 'witness_count')):
+        links = through.objects.filter(case__deleted=False).values(
+            status=F('case__status'), case_type=F('case__case_type'), month=TruncMonth('case__report_date'),
+        ).annotate(n=Count('id')).order_by()
+        for row in links:
+            setattr(bucket(row), counter, row['n'])
+
+    CaseStatisticsRollup.objects.bulk_create(buckets.values())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cases', '0036_case_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CaseStatisticsRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('open', 'Open'), ('under_investigation', 'Under Investigation'), ('in_court', 'In Court'), ('closed', 'Closed'), ('dismissed', 'Dismissed'), ('transferred', 'Transferred')], max_length=30)),
+                ('case_type', models.CharField(choices=[('ASSAULT', 'Assault'), ('GBV', 'Gender-Based Violence'), ('HOMICIDE', 'Homicide / Murder'), ('MISSING_PERSON', 'Missing Person'), ('SUICIDE', 'Suicide / Attempted Suicide'), ('THEFT', 'Theft'), ('ROBBERY', 'Robbery'), ('BURGLARY', 'Burglary / Break-in'), ('ARSON', 'Arson'), ('FRAUD', 'Fraud'), ('CORRUPTION', 'Corruption / Bribery'), ('TRAFFIC', 'Traffic Offense'), ('PUBLIC_DISTURBANCE', 'Public Disturbance'), ('ILLEGAL_ASSEMBLY', 'Illegal Assembly / Protest'), ('DRUG_POSSESSION', 'Drug Possession / Trafficking'), ('ILLEGAL_WEAPONS', 'Illegal Possession of Firearms / Weapons'), ('DOMESTIC', 'Domestic Dispute'), ('CHILD_ABUSE', 'Child Abuse / Neglect'), ('LOST_PROPERTY', 'Lost Property'), ('RECOVERED_PROPERTY', 'Recovered Property'), ('OTHER', 'Other')], max_length=30)),
+                ('report_month', models.DateField()),
+                ('case_count', models.IntegerField(default=0)),
+                ('suspect_count', models.IntegerField(default=0)),
+                ('witness_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'unique_together': {('status', 'case_type', 'report_month')},
+            },
+        ),
+        migrations.RunPython(populate_rollup, migrations.RunPython.noop),
+    ]
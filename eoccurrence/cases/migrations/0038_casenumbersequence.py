@@ -0,0 +1,44 @@
+# Generated by Django 5.2.5 on 2026-10-18 06:51
+
+import datetime
+
+from django.db import migrations, models
+
+
+def seed_sequences(apps, schema_editor):
+    # Continue each day from the highest "YYYYMMDD-NNNN" number already issued
+    Case = apps.get_model('cases', 'Case')
+    CaseNumberSequence = apps.get_model('cases', 'CaseNumberSequence')
+    last_numbers = {}
+
+    for case_number in Case.objects.values_list('case_number', flat=True).iterator():
+        day, _, number = case_number.partition('-')
+        try:
+            day = datetime.datetime.strptime(day, '%Y%m%d').date()
+            number = int(number)
+        except ValueError:
+            continue
+        last_numbers[day] = max(number, last_numbers.get(day, 0))
+
+    CaseNumberSequence.objects.bulk_create(
+        CaseNumberSequence(day=day, last_number=number) for day, number in last_numbers.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cases', '0037_casestatisticsrollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CaseNumberSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(unique=True)),
+                ('last_number', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(seed_sequences, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 06:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cases', '0038_casenumbersequence'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='suspect',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.5 on 2026-10-18 06:58
+
+from django.db import migrations, models
+
+
+def populate_case_summaries(apps, schema_editor):
+    Case = apps.get_model('cases', 'Case')
+    for model_name, through in (('suspect', Case.suspects.through), ('witness', Case.witnesses.through)):
+        model = apps.get_model('cases', model_name)
+        summaries = {}
+        links = through.objects.order_by('-case__created_at', '-case_id').values_list(
+            f"{model_name}_id", 'case__uuid', 'case__case_number', 'case__status',
+        )
+        for pk, case_uuid, case_number, status in links.iterator(chunk_size=2000):
+            summaries.setdefault(pk, []).append(
+                {'uuid': str(case_uuid), 'case_number': case_number, 'status': status}
+            )
+        model.objects.bulk_update(
+            [model(pk=pk, case_summary=summary) for pk, summary in summaries.items()],
+            ['case_summary'],
+            batch_size=500,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cases', '0039_suspect_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='suspect',
+            name='case_summary',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.AddField(
+            model_name='witness',
+            name='case_summary',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.RunPython(populate_case_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.5 on 2026-10-18 07:07
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cases', '0040_case_summaries'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='case',
+            index=models.Index(fields=['-created_at', '-id'], name='case_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='case',
+            index=models.Index(condition=models.Q(('deleted', False)), fields=['-created_at', '-id'], name='case_live_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='case',
+            index=models.Index(fields=['status', '-created_at'], name='case_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='case',
+            index=models.Index(condition=models.Q(('deleted', False)), fields=['recorded_by', '-created_at'], name='case_recorder_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='case',
+            index=models.Index(condition=models.Q(('deleted', True)), fields=['-deleted_at'], name='case_deleted_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='courtdecision',
+            index=models.Index(fields=['-decision_date', '-id'], name='decision_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='courtdecision',
+            index=models.Index(fields=['decision_type', '-decision_date'], name='decision_type_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='suspect',
+            index=models.Index(fields=['-statement_date', '-id'], name='suspect_statement_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='witness',
+            index=models.Index(fields=['-date_of_statement', '-id'], name='witness_statement_idx'),
+        ),
+    ]
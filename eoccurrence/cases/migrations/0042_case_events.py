@@ -0,0 +1,33 @@
+# Generated by Django 5.2.5 on 2026-10-18 07:23
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cases', '0041_query_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CaseEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('created', 'Case Recorded'), ('updated', 'Details Edited'), ('status_changed', 'Status Changed'), ('suspect_added', 'Suspect Added'), ('witness_added', 'Witness Added'), ('decision', 'Court Decision'), ('ruling', 'Suspect Ruling'), ('deleted', 'Case Deleted'), ('restored', 'Case Restored')], max_length=20)),
+                ('occurred_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('summary', models.CharField(max_length=255)),
+                ('data', models.JSONField(blank=True, default=dict)),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='case_events', to=settings.AUTH_USER_MODEL)),
+                ('case', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='events', to='cases.case')),
+            ],
+            options={
+                'ordering': ['occurred_at', 'id'],
+                'indexes': [models.Index(fields=['case', 'occurred_at', 'id'], name='case_event_timeline_idx'), models.Index(fields=['-occurred_at', '-id'], name='case_event_feed_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-18 07:27
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cases', '0042_case_events'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='case',
+            name='case_status_created_idx',
+        ),
+        migrations.AddIndex(
+            model_name='case',
+            index=models.Index(condition=models.Q(('deleted', False)), fields=['status', '-created_at'], name='case_live_status_created_idx'),
+        ),
+    ]
@@ -0,0 +1,127 @@
+# Generated by Django 5.2.5 on 2026-10-18 07:33
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cases', '0043_live_case_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='caseevent',
+            name='kind',
+            field=models.CharField(choices=[('created', 'Case Recorded'), ('updated', 'Details Edited'), ('status_changed', 'Status Changed'), ('suspect_added', 'Suspect Added'), ('witness_added', 'Witness Added'), ('decision', 'Court Decision'), ('ruling', 'Suspect Ruling'), ('deleted', 'Case Deleted'), ('restored', 'Case Restored'), ('archived', 'Case Archived'), ('unarchived', 'Case Unarchived')], max_length=20),
+        ),
+        migrations.CreateModel(
+            name='ArchivedCase',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('uuid', models.UUIDField(editable=False, unique=True)),
+                ('case_number', models.CharField(max_length=50, unique=True)),
+                ('case_type', models.CharField(choices=[('ASSAULT', 'Assault'), ('GBV', 'Gender-Based Violence'), ('HOMICIDE', 'Homicide / Murder'), ('MISSING_PERSON', 'Missing Person'), ('SUICIDE', 'Suicide / Attempted Suicide'), ('THEFT', 'Theft'), ('ROBBERY', 'Robbery'), ('BURGLARY', 'Burglary / Break-in'), ('ARSON', 'Arson'), ('FRAUD', 'Fraud'), ('CORRUPTION', 'Corruption / Bribery'), ('TRAFFIC', 'Traffic Offense'), ('PUBLIC_DISTURBANCE', 'Public Disturbance'), ('ILLEGAL_ASSEMBLY', 'Illegal Assembly / Protest'), ('DRUG_POSSESSION', 'Drug Possession / Trafficking'), ('ILLEGAL_WEAPONS', 'Illegal Possession of Firearms / Weapons'), ('DOMESTIC', 'Domestic Dispute'), ('CHILD_ABUSE', 'Child Abuse / Neglect'), ('LOST_PROPERTY', 'Lost Property'), ('RECOVERED_PROPERTY', 'Recovered Property'), ('OTHER', 'Other')], max_length=30)),
+                ('incident_date', models.DateField(blank=True, null=True)),
+                ('report_date', models.DateField()),
+                ('location', models.CharField(blank=True, max_length=255, null=True)),
+                ('title', models.CharField(max_length=255)),
+                ('description', models.TextField(blank=True)),
+                ('status', models.CharField(choices=[('open', 'Open'), ('under_investigation', 'Under Investigation'), ('in_court', 'In Court'), ('closed', 'Closed'), ('dismissed', 'Dismissed'), ('transferred', 'Transferred')], max_length=30)),
+                ('court_date', models.DateField(blank=True, null=True)),
+                ('deleted', models.BooleanField(default=False)),
+                ('deleted_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('complainant', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_cases', to='cases.complainant')),
+                ('deleted_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('recorded_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedCaseSuspect',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('case', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='cases.archivedcase')),
+                ('suspect', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='cases.suspect')),
+            ],
+            options={
+                'unique_together': {('case', 'suspect')},
+            },
+        ),
+        migrations.AddField(
+            model_name='archivedcase',
+            name='suspects',
+            field=models.ManyToManyField(related_name='archived_cases', through='cases.ArchivedCaseSuspect', to='cases.suspect'),
+        ),
+        migrations.CreateModel(
+            name='ArchivedCaseWitness',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('case', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='cases.archivedcase')),
+                ('witness', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='cases.witness')),
+            ],
+            options={
+                'unique_together': {('case', 'witness')},
+            },
+        ),
+        migrations.AddField(
+            model_name='archivedcase',
+            name='witnesses',
+            field=models.ManyToManyField(related_name='archived_cases', through='cases.ArchivedCaseWitness', to='cases.witness'),
+        ),
+        migrations.CreateModel(
+            name='ArchivedCourtDecision',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('uuid', models.UUIDField(editable=False, unique=True)),
+                ('decision_type', models.CharField(choices=[('CLOSED', 'Case Closed'), ('DISMISSED', 'Case Dismissed'), ('ADJOURNED', 'Case Adjourned'), ('TRANSFERRED', 'Case Transferred'), ('OTHER', 'Other')], max_length=20)),
+                ('decision_text', models.TextField(blank=True, null=True)),
+                ('decision_date', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('case', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='court_decisions', to='cases.archivedcase')),
+                ('recorded_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-decision_date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedSuspectCourtRuling',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('uuid', models.UUIDField(editable=False, unique=True)),
+                ('ruling_type', models.CharField(choices=[('bail_granted', 'Bail Granted'), ('bail_denied', 'Bail Denied'), ('fined', 'Fined'), ('dismissed', 'Dismissed'), ('sentenced', 'Sentenced'), ('acquitted', 'Acquitted'), ('adjourned', 'Adjourned')], max_length=20)),
+                ('ruling_text', models.TextField()),
+                ('recorded_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('case', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rulings', to='cases.archivedcase')),
+                ('recorded_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('suspect', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_rulings', to='cases.suspect')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedCaseEvent',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('created', 'Case Recorded'), ('updated', 'Details Edited'), ('status_changed', 'Status Changed'), ('suspect_added', 'Suspect Added'), ('witness_added', 'Witness Added'), ('decision', 'Court Decision'), ('ruling', 'Suspect Ruling'), ('deleted', 'Case Deleted'), ('restored', 'Case Restored'), ('archived', 'Case Archived'), ('unarchived', 'Case Unarchived')], max_length=20)),
+                ('occurred_at', models.DateTimeField()),
+                ('summary', models.CharField(max_length=255)),
+                ('data', models.JSONField(blank=True, default=dict)),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('case', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='events', to='cases.archivedcase')),
+            ],
+            options={
+                'ordering': ['occurred_at', 'id'],
+                'indexes': [models.Index(fields=['case', 'occurred_at', 'id'], name='archived_event_timeline_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,88 @@
+# Generated by Django 5.2.5 on 2026-10-18 07:39
+
+import re
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+COUNTIES = [
+    'Mombasa', 'Kwale', 'Kilifi', 'Tana River', 'Lamu', 'Taita-Taveta', 'Garissa', 'Wajir', 'Mandera',
+    'Marsabit', 'Isiolo', 'Meru', 'Tharaka-Nithi', 'Embu', 'Kitui', 'Machakos', 'Makueni', 'Nyandarua',
+    'Nyeri', 'Kirinyaga', "Murang'a", 'Kiambu', 'Turkana', 'West Pokot', 'Samburu', 'Trans-Nzoia',
+    'Uasin Gishu', 'Elgeyo-Marakwet', 'Nandi', 'Baringo', 'Laikipia', 'Nakuru', 'Narok', 'Kajiado',
+    'Kericho', 'Bomet', 'Kakamega', 'Vihiga', 'Bungoma', 'Busia', 'Siaya', 'Kisumu', 'Homa Bay',
+    'Migori', 'Kisii', 'Nyamira', 'Nairobi',
+]
+
+
+def seed_counties(apps, schema_editor):
+    # The 47 counties; sub-counties and localities come from load_gazetteer.
+    # Keys as cases.gazetteer.normalise() builds them.
+    Area = apps.get_model('cases', 'Area')
+    Area.objects.bulk_create(
+        Area(name=name, level='county', key=' '.join(re.findall(r'[a-z0-9]+', name.lower().replace("'", ''))))
+        for name in COUNTIES
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cases', '0044_case_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Area',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('level', models.CharField(choices=[('county', 'County'), ('sub_county', 'Sub-county'), ('locality', 'Locality')], max_length=20)),
+                ('key', models.CharField(editable=False, max_length=100)),
+                ('parent', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='children', to='cases.area')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='archivedcase',
+            name='area',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='cases.area'),
+        ),
+        migrations.AddField(
+            model_name='case',
+            name='area',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='cases', to='cases.area'),
+        ),
+        migrations.AddField(
+            model_name='complainant',
+            name='area',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='complainants', to='cases.area'),
+        ),
+        migrations.CreateModel(
+            name='HotspotCell',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('level', models.CharField(choices=[('county', 'County'), ('sub_county', 'Sub-county'), ('locality', 'Locality')], max_length=20)),
+                ('case_type', models.CharField(choices=[('ASSAULT', 'Assault'), ('GBV', 'Gender-Based Violence'), ('HOMICIDE', 'Homicide / Murder'), ('MISSING_PERSON', 'Missing Person'), ('SUICIDE', 'Suicide / Attempted Suicide'), ('THEFT', 'Theft'), ('ROBBERY', 'Robbery'), ('BURGLARY', 'Burglary / Break-in'), ('ARSON', 'Arson'), ('FRAUD', 'Fraud'), ('CORRUPTION', 'Corruption / Bribery'), ('TRAFFIC', 'Traffic Offense'), ('PUBLIC_DISTURBANCE', 'Public Disturbance'), ('ILLEGAL_ASSEMBLY', 'Illegal Assembly / Protest'), ('DRUG_POSSESSION', 'Drug Possession / Trafficking'), ('ILLEGAL_WEAPONS', 'Illegal Possession of Firearms / Weapons'), ('DOMESTIC', 'Domestic Dispute'), ('CHILD_ABUSE', 'Child Abuse / Neglect'), ('LOST_PROPERTY', 'Lost Property'), ('RECOVERED_PROPERTY', 'Recovered Property'), ('OTHER', 'Other')], max_length=30)),
+                ('week', models.DateField()),
+                ('case_count', models.IntegerField(default=0)),
+                ('area', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hotspot_cells', to='cases.area')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='area',
+            constraint=models.UniqueConstraint(fields=('parent', 'key'), name='area_parent_key_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='area',
+            constraint=models.UniqueConstraint(condition=models.Q(('parent__isnull', True)), fields=('key',), name='area_top_key_uniq'),
+        ),
+        migrations.AddIndex(
+            model_name='hotspotcell',
+            index=models.Index(fields=['level', 'week'], name='hotspot_level_week_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='hotspotcell',
+            unique_together={('area', 'case_type', 'week')},
+        ),
+        migrations.RunPython(seed_counties, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 5.2.5 on 2026-10-18 07:44
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cases', '0045_location_gazetteer'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DuplicateCluster',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending Review'), ('same', 'Same Person'), ('different', 'Different People')], default='pending', max_length=20)),
+                ('score', models.FloatField()),
+                ('size', models.IntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('reviewed_at', models.DateTimeField(blank=True, null=True)),
+                ('reviewed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-score', 'id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DuplicateMember',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('complainant', 'Complainant'), ('suspect', 'Suspect'), ('witness', 'Witness')], max_length=20)),
+                ('person_id', models.IntegerField()),
+                ('cluster', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='members', to='cases.duplicatecluster')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DuplicatePair',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('first_kind', models.CharField(choices=[('complainant', 'Complainant'), ('suspect', 'Suspect'), ('witness', 'Witness')], max_length=20)),
+                ('first_id', models.IntegerField()),
+                ('second_kind', models.CharField(choices=[('complainant', 'Complainant'), ('suspect', 'Suspect'), ('witness', 'Witness')], max_length=20)),
+                ('second_id', models.IntegerField()),
+                ('score', models.FloatField()),
+                ('reasons', models.CharField(max_length=100)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['second_kind', 'second_id'], name='duplicate_pair_second_idx')],
+                'unique_together': {('first_kind', 'first_id', 'second_kind', 'second_id')},
+            },
+        ),
+        migrations.CreateModel(
+            name='PersonKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('complainant', 'Complainant'), ('suspect', 'Suspect'), ('witness', 'Witness')], max_length=20)),
+                ('person_id', models.IntegerField()),
+                ('key', models.CharField(max_length=64)),
+                ('indexed_at', models.DateTimeField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['key'], name='person_key_idx'), models.Index(fields=['kind', 'indexed_at'], name='person_key_indexed_idx')],
+                'unique_together': {('kind', 'person_id', 'key')},
+            },
+        ),
+        migrations.AddIndex(
+            model_name='duplicatecluster',
+            index=models.Index(fields=['status', '-score'], name='duplicate_cluster_status_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='duplicatemember',
+            unique_together={('kind', 'person_id')},
+        ),
+    ]
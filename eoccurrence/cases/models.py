@@ -1,5 +1,8 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, F, Q
+from django.db.models.functions import Coalesce, TruncMonth, TruncWeek
 from django.utils import timezone
+import datetime
 import uuid
 
 # Create your models here.
@@ -8,6 +11,14 @@ from django.contrib.auth import get_user_model
 
 User = get_user_model()
 
+
+class LiveCaseManager(models.Manager):
+    """Cases that have not been soft-deleted."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted=False)
+
+
 class Case(models.Model):
     STATUS_CHOICES = [
         ('open', 'Open'),
@@ -73,6 +84,8 @@ class Case(models.Model):
     incident_date = models.DateField(null=True, blank=True)  # Date of the incident
     report_date = models.DateField(auto_now_add=True)  # Date when the case was reported
     location = models.CharField(max_length=255, blank=True, null=True)
+    # The gazetteer entry matched from location when it is saved
+    area = models.ForeignKey('Area', on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name='cases')
 
     title = models.CharField(max_length=255)
     description = models.TextField(blank=True)
@@ -91,26 +104,190 @@ class Case(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
-    def save(self, *args, **kwargs):
-        if not self.case_number:
-            today = timezone.now().strftime('%Y%m%d')
-            last_case = Case.objects.filter(case_number__startswith=today).order_by('-case_number').first()
-            if last_case:
-                last_number = int(last_case.case_number[-4:]) + 1
-            else:
-                last_number = 1
-            self.case_number = f"{today}-{last_number:04d}"
-
+    # Live cases only, also behind related managers such as suspect.cases.
+    # Admin views that show deleted cases read all_with_deleted explicitly.
+    objects = LiveCaseManager()
+    all_with_deleted = models.Manager()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember which statistics bucket the row was loaded in, so save()
+        # can move it without reading the old values back
+        if {'status', 'case_type', 'report_date', 'deleted'} <= instance.__dict__.keys():
+            instance._loaded_rollup_key = instance.rollup_key()
+            instance._loaded_state = (instance.status, instance.deleted)
+        if {'case_number', 'status'} <= instance.__dict__.keys():
+            instance._loaded_summary = (instance.case_number, instance.status)
+        if {'area_id', 'case_type', 'incident_date', 'report_date', 'deleted'} <= instance.__dict__.keys():
+            instance._loaded_hotspot_key = instance.hotspot_key()
+        if 'location' in instance.__dict__:
+            instance._loaded_location = instance.location
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        # The reloaded values are what the next save() changes from
+        if fields is None:
+            self._loaded_rollup_key = self.rollup_key()
+            self._loaded_state = (self.status, self.deleted)
+            self._loaded_summary = (self.case_number, self.status)
+            self._loaded_hotspot_key = self.hotspot_key()
+            self._loaded_location = self.location
+
+    def rollup_key(self):
+        """The CaseStatisticsRollup bucket this case counts towards, None if it doesn't count."""
+        if self.deleted or not self.report_date:
+            return None
+        return (self.status, self.case_type, self.report_date.replace(day=1))
+
+    def hotspot_key(self):
+        """The HotspotCell (area_id, case_type, week) this case counts towards, None if it doesn't count."""
+        day = self.incident_date or self.report_date
+        if self.deleted or not self.area_id or not day:
+            return None
+        return (self.area_id, self.case_type, day - datetime.timedelta(days=day.weekday()))
+
+    def save(self, *args, actor=None, **kwargs):
+        from . import gazetteer  # gazetteer imports this module
+
+        # actor: the user making the change, for the case history
         if self.status == 'closed' and not self.court_date:
             self.court_date = timezone.now().date()
-        super().save(*args, **kwargs)
+
+        update_fields = kwargs.get('update_fields')
+        if getattr(self, '_loaded_location', None) != self.location or self._state.adding:
+            if update_fields is None or 'location' in update_fields:
+                self.area_id = gazetteer.match(self.location)
+                if update_fields is not None:
+                    kwargs['update_fields'] = {*update_fields, 'area'}
+
+        with transaction.atomic():
+            # Allocated inside the transaction so a failed insert gives the number back
+            if not self.case_number:
+                self.case_number = CaseNumberSequence.allocate()[0]
+
+            adding = self._state.adding
+            if adding:
+                old_key = old_state = old_hotspot = None
+            elif hasattr(self, '_loaded_rollup_key') and hasattr(self, '_loaded_hotspot_key'):
+                old_key, old_state, old_hotspot = self._loaded_rollup_key, self._loaded_state, self._loaded_hotspot_key
+            else:
+                old = Case(**Case.all_with_deleted.filter(pk=self.pk).values(
+                    'status', 'case_type', 'report_date', 'deleted', 'area_id', 'incident_date',
+                ).get())
+                old_key, old_state, old_hotspot = old.rollup_key(), (old.status, old.deleted), old.hotspot_key()
+
+            super().save(*args, **kwargs)
+            CaseEvent.record_save(self, old_state, actor)
+            self._loaded_state = (self.status, self.deleted)
+
+            new_key = self.rollup_key()
+            if old_key != new_key:
+                suspects = 0 if adding else self.suspects.count()
+                witnesses = 0 if adding else self.witnesses.count()
+                CaseStatisticsRollup.adjust(old_key, cases=-1, suspects=-suspects, witnesses=-witnesses)
+                CaseStatisticsRollup.adjust(new_key, cases=1, suspects=suspects, witnesses=witnesses)
+            self._loaded_rollup_key = new_key
+
+            new_hotspot = self.hotspot_key()
+            if old_hotspot != new_hotspot:
+                HotspotCell.adjust(old_hotspot, -1)
+                HotspotCell.adjust(new_hotspot, 1)
+            self._loaded_hotspot_key = new_hotspot
+            self._loaded_location = self.location
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Listings are paged on (-created_at, -id). Only the admin listing
+            # reads deleted cases; every other listing and filter column is
+            # indexed over live rows only.
+            models.Index(fields=['-created_at', '-id'], name='case_created_idx'),
+            models.Index(
+                fields=['-created_at', '-id'], name='case_live_created_idx', condition=Q(deleted=False),
+            ),
+            models.Index(
+                fields=['status', '-created_at'], name='case_live_status_created_idx', condition=Q(deleted=False),
+            ),
+            models.Index(
+                fields=['recorded_by', '-created_at'], name='case_recorder_created_idx',
+                condition=Q(deleted=False),
+            ),
+            models.Index(fields=['-deleted_at'], name='case_deleted_at_idx', condition=Q(deleted=True)),
+        ]
     
     def __str__(self):
         return f"{self.case_number} - {self.title}"
 
+class CaseNumberSequence(models.Model):
+    """
+    Last case number handed out for each day. Numbers are taken with a single
+    conditional UPDATE, whose row lock serialises concurrent intakes for the
+    same day until their transaction commits.
+    """
+    day = models.DateField(unique=True)
+    last_number = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.day:%Y%m%d}: {self.last_number}"
+
+    @staticmethod
+    def format(day, number):
+        return f"{day:%Y%m%d}-{number:04d}"
+
+    @staticmethod
+    def parse(case_number):
+        """The (day, number) of a case number in our own format, or None."""
+        prefix, _, number = case_number.partition('-')
+        if len(prefix) != 8 or not prefix.isdigit() or not number.isdigit():
+            return None
+        try:
+            return datetime.datetime.strptime(prefix, '%Y%m%d').date(), int(number)
+        except ValueError:
+            return None
+
+    @classmethod
+    def advance(cls, day, number):
+        """Make sure ``day`` never hands out ``number`` or anything below it, e.g. after an import."""
+        with transaction.atomic():
+            if cls.objects.filter(day=day, last_number__lt=number).update(last_number=number):
+                return
+            if cls.objects.filter(day=day).exists():
+                return
+            try:
+                with transaction.atomic():
+                    cls.objects.create(day=day, last_number=number)
+            except IntegrityError:
+                cls.objects.filter(day=day, last_number__lt=number).update(last_number=number)
+
+    @classmethod
+    def reserve(cls, count=1, day=None):
+        """Reserve ``count`` consecutive numbers for ``day`` and return the first one."""
+        day = day or timezone.now().date()
+
+        with transaction.atomic():
+            updated = cls.objects.filter(day=day).update(last_number=F('last_number') + count)
+            if not updated:
+                try:
+                    with transaction.atomic():
+                        cls.objects.create(day=day, last_number=count)
+                    return 1
+                except IntegrityError:
+                    # Another intake created today's row first
+                    cls.objects.filter(day=day).update(last_number=F('last_number') + count)
+
+            last_number = cls.objects.filter(day=day).values_list('last_number', flat=True).get()
+        return last_number - count + 1
+
+    @classmethod
+    def allocate(cls, count=1, day=None):
+        """Reserve a block of ``count`` case numbers, e.g. for a bulk import."""
+        day = day or timezone.now().date()
+        first = cls.reserve(count, day)
+        return [cls.format(day, number) for number in range(first, first + count)]
+
+
 class Complainant(models.Model):
     # Basic personal details
     uuid = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
@@ -134,6 +311,10 @@ class Complainant(models.Model):
     address = models.TextField(blank=True, null=True)
     county = models.CharField(max_length=100, blank=True, null=True)
     sub_county = models.CharField(max_length=100, blank=True, null=True)
+    # The gazetteer entry matched from sub_county and county when saved
+    area = models.ForeignKey(
+        'Area', on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name='complainants',
+    )
 
     # Statement
     statement = models.TextField(blank=True, null=True)
@@ -145,6 +326,20 @@ class Complainant(models.Model):
     def __str__(self):
         full_name = f"{self.first_name} {self.last_name}".strip()
         return f"{full_name} - {self.id_number or 'No ID'}"
+
+    def save(self, *args, **kwargs):
+        from . import gazetteer
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or {'county', 'sub_county'} & set(update_fields):
+            self.area_id = gazetteer.match(self.place())
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'area'}
+        super().save(*args, **kwargs)
+
+    def place(self):
+        """County and sub-county as one location string for the gazetteer."""
+        return ", ".join(part for part in (self.sub_county, self.county) if part)
     
 class Suspect(models.Model):
     BAIL_CHOICES = [
@@ -181,6 +376,16 @@ class Suspect(models.Model):
 
     charges = models.TextField(blank=True, null=True)
 
+    # [{uuid, case_number, status}] of linked cases, newest first; kept in sync by signals
+    case_summary = models.JSONField(default=list, blank=True, editable=False)
+
+    updated_at = models.DateTimeField(auto_now=True)      # Last update time
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-statement_date', '-id'], name='suspect_statement_idx'),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -204,6 +409,9 @@ class Witness(models.Model):
     recorded_by = models.ForeignKey(
         User, on_delete=models.SET_NULL, null=True, related_name='witnesses_recorded'
     )
+    # [{uuid, case_number, status}] of linked cases, newest first; kept in sync by signals
+    case_summary = models.JSONField(default=list, blank=True, editable=False)
+
     # Meta fields
     created_at = models.DateTimeField(auto_now_add=True)  # When record was first created
     updated_at = models.DateTimeField(auto_now=True)      # Last update time
@@ -213,6 +421,38 @@ class Witness(models.Model):
     
     class Meta:
         verbose_name_plural = "Witnesses"
+        indexes = [
+            models.Index(fields=['-date_of_statement', '-id'], name='witness_statement_idx'),
+        ]
+
+
+def refresh_case_summaries(model, ids):
+    """
+    Rebuild ``case_summary`` for the given suspects or witnesses from their
+    case links, with one read and one bulk update.
+    """
+    ids = set(ids)
+    if not ids:
+        return
+
+    person = model._meta.model_name
+    # Archived cases stay in the summary; their link table has the same columns
+    links = []
+    for through in (model.cases.through, model.archived_cases.through):
+        links += through.objects.filter(**{f"{person}_id__in": ids}).values_list(
+            'case__created_at', 'case_id', f"{person}_id", 'case__uuid', 'case__case_number', 'case__status',
+        )
+    links.sort(reverse=True)
+
+    summaries = {pk: [] for pk in ids}
+    for _, _, pk, case_uuid, case_number, status in links:
+        summaries[pk].append({'uuid': str(case_uuid), 'case_number': case_number, 'status': status})
+
+    model.objects.bulk_update(
+        [model(pk=pk, case_summary=summary) for pk, summary in summaries.items()],
+        ['case_summary'],
+        batch_size=500,
+    )
 
 class CourtDecision(models.Model):
     DECISION_CHOICES = [
@@ -234,24 +474,39 @@ class CourtDecision(models.Model):
 
     class Meta:
         ordering = ['-decision_date']
+        indexes = [
+            models.Index(fields=['-decision_date', '-id'], name='decision_date_idx'),
+            models.Index(fields=['decision_type', '-decision_date'], name='decision_type_date_idx'),
+        ]
 
     def __str__(self):
         return f"{self.get_decision_type_display()} - Case {self.case.case_number}"
     
-    def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-
-        if self.decision_type == 'CLOSED':
-            self.case.status = 'closed'
-            self.case.save()
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_decision_type = instance.__dict__.get('decision_type')
+        return instance
 
-        elif self.decision_type == 'DISMISSED':
-            self.case.status = 'dismissed'
-            self.case.save()
-
-        else:
-            self.case.status = 'in_court'
-            self.case.save()
+    def save(self, *args, **kwargs):
+        from .transitions import apply_court_decision  # transitions imports this module
+
+        # The decision and the case status (and its statistics) change together.
+        # Edits only move the case when they change what was decided.
+        with transaction.atomic():
+            adding = self._state.adding
+            previous = getattr(self, '_loaded_decision_type', None)
+            super().save(*args, **kwargs)
+            CaseEvent.record(
+                self.case, 'decision', actor_id=self.recorded_by_id,
+                summary=f"Court decision {'recorded' if adding else 'updated'}: {self.get_decision_type_display()}",
+                decision=str(self.uuid), decision_type=self.decision_type,
+            )
+            if adding or self.decision_type != previous:
+                apply_court_decision(
+                    self.case, self.decision_type, previous=previous, actor_id=self.recorded_by_id,
+                )
+        self._loaded_decision_type = self.decision_type
     
 class SuspectCourtRuling(models.Model):
     uuid = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
@@ -281,25 +536,488 @@ class SuspectCourtRuling(models.Model):
     def __str__(self):
         return f"{self.suspect.name} - {self.ruling_type} (Case #{self.case.case_number})"
     
-    # models.py
     def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)  # save ruling first
-
-        # Update suspect bail status based on ruling
-        if self.ruling_type == 'bail_granted':
-            self.suspect.bail_status = 'granted'
-        elif self.ruling_type == 'bail_denied':
-            self.suspect.bail_status = 'denied'
-        elif self.ruling_type == 'fined':
-            self.suspect.bail_status = 'not_applicable'
-        elif self.ruling_type == 'dismissed':
-            self.suspect.bail_status = 'not_applicable'
-        elif self.ruling_type == 'sentenced':
-            self.suspect.bail_status = 'not_applicable'
-        elif self.ruling_type == 'acquitted':
-            self.suspect.bail_status = 'not_applicable'
-        elif self.ruling_type == 'adjourned':
-            self.suspect.bail_status = 'not_applicable'
-
-        # if "Other", don't touch bail_status
-        self.suspect.save(update_fields=['bail_status'])
+        from .transitions import InvalidTransition, accepts_court_outcome, apply_ruling
+
+        if self._state.adding and not accepts_court_outcome(self.case):
+            raise InvalidTransition(f"Case {self.case.case_number} is not open or in court.")
+
+        # The ruling and the suspect's bail status change together; the
+        # suspect row is only written when its bail status actually changes
+        with transaction.atomic():
+            adding = self._state.adding
+            super().save(*args, **kwargs)
+            apply_ruling(self.suspect, self.ruling_type)
+            CaseEvent.record(
+                self.case, 'ruling', actor_id=self.recorded_by_id,
+                summary=f"Ruling {'recorded' if adding else 'updated'} for {self.suspect.name}: "
+                        f"{self.get_ruling_type_display()}",
+                ruling=str(self.uuid), suspect=str(self.suspect.uuid), ruling_type=self.ruling_type,
+            )
+
+
+class CaseEvent(models.Model):
+    """
+    Append-only history of a case, one row per change, written in the same
+    transaction as the change. A case's timeline, or the latest events
+    across all cases, is a single index range scan. Seed it for existing
+    cases with the backfill_case_events command.
+    """
+    KIND_CHOICES = [
+        ('created', 'Case Recorded'),
+        ('updated', 'Details Edited'),
+        ('status_changed', 'Status Changed'),
+        ('suspect_added', 'Suspect Added'),
+        ('witness_added', 'Witness Added'),
+        ('decision', 'Court Decision'),
+        ('ruling', 'Suspect Ruling'),
+        ('deleted', 'Case Deleted'),
+        ('restored', 'Case Restored'),
+        ('archived', 'Case Archived'),
+        ('unarchived', 'Case Unarchived'),
+    ]
+
+    # Indexed by case_event_timeline_idx, which leads with the case
+    case = models.ForeignKey(Case, on_delete=models.CASCADE, related_name='events', db_index=False)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    occurred_at = models.DateTimeField(default=timezone.now)
+    actor = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='case_events')
+    summary = models.CharField(max_length=255)
+    data = models.JSONField(default=dict, blank=True)  # e.g. {'from': 'open', 'to': 'closed'}
+
+    class Meta:
+        ordering = ['occurred_at', 'id']
+        indexes = [
+            models.Index(fields=['case', 'occurred_at', 'id'], name='case_event_timeline_idx'),
+            models.Index(fields=['-occurred_at', '-id'], name='case_event_feed_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.case_id} {self.occurred_at:%Y-%m-%d %H:%M} {self.summary}"
+
+    @classmethod
+    def record(cls, case, kind, summary, actor_id=None, **data):
+        return cls.objects.create(case=case, kind=kind, summary=summary, actor_id=actor_id, data=data)
+
+    @staticmethod
+    def status_changed(case_id, old_status, new_status, actor_id=None):
+        """An unsaved status change event, for single and bulk writers alike."""
+        labels = dict(Case.STATUS_CHOICES)
+        return CaseEvent(
+            case_id=case_id, kind='status_changed', actor_id=actor_id,
+            summary=f"Status changed from {labels.get(old_status, old_status)} to {labels.get(new_status, new_status)}",
+            data={'from': old_status, 'to': new_status},
+        )
+
+    @classmethod
+    def record_save(cls, case, old_state, actor=None):
+        """Events for what Case.save changed; old_state is (status, deleted) as loaded, None when adding."""
+        actor_id = actor.pk if actor else None
+        events = []
+        if old_state is None:
+            events.append(cls(
+                case=case, kind='created', actor_id=actor_id or case.recorded_by_id,
+                summary="Case recorded", data={'status': case.status},
+            ))
+        else:
+            status, deleted = old_state
+            if case.status != status:
+                events.append(cls.status_changed(case.pk, status, case.status, actor_id))
+            if case.deleted != deleted:
+                events.append(cls(
+                    case=case, kind='deleted' if case.deleted else 'restored',
+                    actor_id=actor_id or (case.deleted_by_id if case.deleted else None),
+                    summary="Case deleted" if case.deleted else "Case restored",
+                ))
+        cls.objects.bulk_create(events)
+
+
+class CaseStatisticsRollup(models.Model):
+    """
+    Pre-aggregated counters behind the statistics page, one row per
+    (status, case_type, report month) of live cases, archived ones included.
+    Kept up to date by Case.save, the suspect/witness m2m signals and case
+    deletion; rebuild with the rebuild_case_statistics command.
+    """
+    status = models.CharField(max_length=30, choices=Case.STATUS_CHOICES)
+    case_type = models.CharField(max_length=30, choices=Case.CASE_TYPE_CHOICES)
+    report_month = models.DateField()  # First day of the month the cases were reported
+
+    case_count = models.IntegerField(default=0)
+    suspect_count = models.IntegerField(default=0)  # Suspect links on these cases
+    witness_count = models.IntegerField(default=0)  # Witness links on these cases
+
+    class Meta:
+        unique_together = ("status", "case_type", "report_month")
+
+    def __str__(self):
+        return f"{self.report_month:%Y-%m} {self.case_type} {self.status}: {self.case_count}"
+
+    @classmethod
+    def rebuild(cls):
+        """Recompute every bucket from the case tables. Returns the number of rows written."""
+        month = TruncMonth('report_date')
+        buckets = {}
+
+        def bucket(row):
+            key = (row['status'], row['case_type'], row['month'])
+            if key not in buckets:
+                buckets[key] = cls(status=key[0], case_type=key[1], report_month=key[2])
+            return buckets[key]
+
+        # Archived cases still count; only the table they are read from differs
+        for model in (Case, ArchivedCase):
+            live_cases = model._base_manager.filter(deleted=False)
+            for row in live_cases.values('status', 'case_type', month=month).annotate(n=Count('id')).order_by():
+                bucket(row).case_count += row['n']
+
+            for field, counter in (('suspects', 'suspect_count'), ('witnesses', 'witness_count')):
+                through = getattr(model, field).through
+                links = through.objects.filter(case__deleted=False).values(
+                    status=F('case__status'), case_type=F('case__case_type'), month=TruncMonth('case__report_date'),
+                ).annotate(n=Count('id')).order_by()
+                for row in links:
+                    setattr(bucket(row), counter, getattr(bucket(row), counter) + row['n'])
+
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create(buckets.values())
+        return len(buckets)
+
+    @classmethod
+    def adjust(cls, key, cases=0, suspects=0, witnesses=0):
+        """Add the given deltas to the bucket for a Case.rollup_key()."""
+        if key is None or not (cases or suspects or witnesses):
+            return
+
+        status, case_type, report_month = key
+        with transaction.atomic():
+            row, _ = cls.objects.get_or_create(
+                status=status, case_type=case_type, report_month=report_month,
+            )
+            cls.objects.filter(pk=row.pk).update(
+                case_count=F('case_count') + cases,
+                suspect_count=F('suspect_count') + suspects,
+                witness_count=F('witness_count') + witnesses,
+            )
+
+
+
+class Area(models.Model):
+    """
+    An entry of the location gazetteer: a county, a sub-county within a
+    county, or a locality within a sub-county. Cases and complainants are
+    matched to the most specific area their free-text location names when
+    they are saved (see cases.gazetteer); load entries with load_gazetteer
+    and match existing records with backfill_locations.
+    """
+    LEVEL_CHOICES = [
+        ('county', 'County'),
+        ('sub_county', 'Sub-county'),
+        ('locality', 'Locality'),
+    ]
+
+    name = models.CharField(max_length=100)
+    level = models.CharField(max_length=20, choices=LEVEL_CHOICES)
+    parent = models.ForeignKey('self', on_delete=models.CASCADE, null=True, blank=True, related_name='children')
+    # The name as the matcher compares it, e.g. "taita taveta" for "Taita-Taveta"
+    key = models.CharField(max_length=100, editable=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['parent', 'key'], name='area_parent_key_uniq'),
+            models.UniqueConstraint(fields=['key'], condition=Q(parent__isnull=True), name='area_top_key_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.get_level_display()})"
+
+    def save(self, *args, **kwargs):
+        from .gazetteer import normalise
+
+        self.key = normalise(self.name)
+        super().save(*args, **kwargs)
+
+
+class HotspotCell(models.Model):
+    """
+    Pre-aggregated case counts behind the hotspot map, one row per (area,
+    case_type, week) at every level of the gazetteer: a case matched to a
+    locality counts in the locality, its sub-county and its county. The week
+    is the Monday of the incident date, or of the report date when the
+    incident date is unknown. Deleted cases drop out; archived cases stay
+    counted. Kept up to date by Case.save and case deletion like
+    CaseStatisticsRollup.
+    """
+    area = models.ForeignKey(Area, on_delete=models.CASCADE, related_name='hotspot_cells')
+    level = models.CharField(max_length=20, choices=Area.LEVEL_CHOICES)  # The area's, so a level is read without a join
+    case_type = models.CharField(max_length=30, choices=Case.CASE_TYPE_CHOICES)
+    week = models.DateField()
+    case_count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ("area", "case_type", "week")
+        indexes = [
+            models.Index(fields=['level', 'week'], name='hotspot_level_week_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.week} {self.case_type} area {self.area_id}: {self.case_count}"
+
+    @classmethod
+    def adjust(cls, key, cases):
+        """Add ``cases`` to the cells of a Case.hotspot_key() and of every area above it."""
+        from . import gazetteer
+
+        if key is None or not cases:
+            return
+
+        area_id, case_type, week = key
+        with transaction.atomic():
+            for area_id, level in gazetteer.current().lineage(area_id):
+                cell = cls.objects.filter(area_id=area_id, case_type=case_type, week=week)
+                if cell.update(case_count=F('case_count') + cases):
+                    continue
+                try:
+                    with transaction.atomic():
+                        cls.objects.create(area_id=area_id, level=level, case_type=case_type, week=week,
+                                           case_count=cases)
+                except IntegrityError:
+                    # Another writer created the cell first
+                    cell.update(case_count=F('case_count') + cases)
+
+    @classmethod
+    def rebuild(cls):
+        """Recompute every cell from the case tables. Returns the number of rows written."""
+        from . import gazetteer
+
+        places = gazetteer.current()
+        week = TruncWeek(Coalesce('incident_date', 'report_date'))
+        counts = {}
+        for model in (Case, ArchivedCase):
+            rows = model._base_manager.filter(deleted=False, area__isnull=False).values(
+                'area_id', 'case_type', week=week,
+            ).annotate(n=Count('id')).order_by().values_list('area_id', 'case_type', 'week', 'n')
+            for area_id, case_type, day, n in rows:
+                for area_id, level in places.lineage(area_id):
+                    key = (area_id, level, case_type, day)
+                    counts[key] = counts.get(key, 0) + n
+
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create([
+                cls(area_id=area_id, level=level, case_type=case_type, week=day, case_count=n)
+                for (area_id, level, case_type, day), n in counts.items()
+            ], batch_size=1000)
+        return len(counts)
+
+class PersonKey(models.Model):
+    """
+    A blocking key of a complainant, suspect or witness: a normalised ID
+    number, phone number or phonetic name (see cases.dedupe). Duplicate
+    detection only compares people who share a key.
+    """
+    KIND_CHOICES = [
+        ('complainant', 'Complainant'),
+        ('suspect', 'Suspect'),
+        ('witness', 'Witness'),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    person_id = models.IntegerField()
+    key = models.CharField(max_length=64)
+    # Start of the find_duplicates run that wrote the row; people updated since are keyed again
+    indexed_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ("kind", "person_id", "key")
+        indexes = [
+            models.Index(fields=['key'], name='person_key_idx'),
+            models.Index(fields=['kind', 'indexed_at'], name='person_key_indexed_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.person_id}: {self.key}"
+
+
+class DuplicatePair(models.Model):
+    """Two people scored as likely the same, the first ordered before the second by (kind, id)."""
+    first_kind = models.CharField(max_length=20, choices=PersonKey.KIND_CHOICES)
+    first_id = models.IntegerField()
+    second_kind = models.CharField(max_length=20, choices=PersonKey.KIND_CHOICES)
+    second_id = models.IntegerField()
+    score = models.FloatField()
+    # What matched, e.g. "id, name"
+    reasons = models.CharField(max_length=100)
+
+    class Meta:
+        unique_together = ("first_kind", "first_id", "second_kind", "second_id")
+        indexes = [
+            models.Index(fields=['second_kind', 'second_id'], name='duplicate_pair_second_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.first_kind} {self.first_id} ~ {self.second_kind} {self.second_id} ({self.score})"
+
+
+class DuplicateCluster(models.Model):
+    """
+    A group of records that find_duplicates believes are one person, for
+    review. A cluster keeps its status while its members stay the same; when
+    later records join or leave it, it is replaced by a new pending one.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending Review'),
+        ('same', 'Same Person'),
+        ('different', 'Different People'),
+    ]
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    score = models.FloatField()  # Of the best scoring pair
+    size = models.IntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    reviewed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    reviewed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-score', 'id']
+        indexes = [
+            models.Index(fields=['status', '-score'], name='duplicate_cluster_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"Cluster {self.pk} of {self.size} ({self.get_status_display()})"
+
+
+class DuplicateMember(models.Model):
+    cluster = models.ForeignKey(DuplicateCluster, on_delete=models.CASCADE, related_name='members')
+    kind = models.CharField(max_length=20, choices=PersonKey.KIND_CHOICES)
+    person_id = models.IntegerField()
+
+    class Meta:
+        unique_together = ("kind", "person_id")  # A person is in one cluster at most
+
+    def __str__(self):
+        return f"{self.kind} {self.person_id}"
+
+    def person(self):
+        model = {'complainant': Complainant, 'suspect': Suspect, 'witness': Witness}[self.kind]
+        return model.objects.filter(pk=self.person_id).first()
+
+# Cold storage for cases in a final status, moved out of the tables above by
+# the archive_cases command and back by restore_cases (see cases.archive).
+# Rows keep their ids, and the link tables use the same column names as the
+# live ones, so the columns of either side map onto the other.
+
+class ArchivedCase(models.Model):
+    """
+    A case moved out of the live tables. Listings and search never read
+    these; case details, witness, suspect and complainant pages and the PDF
+    report fall back to them by uuid. Read-only until restored.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    uuid = models.UUIDField(unique=True, editable=False)
+    case_number = models.CharField(max_length=50, unique=True)
+    case_type = models.CharField(max_length=30, choices=Case.CASE_TYPE_CHOICES)
+    complainant = models.ForeignKey(
+        Complainant, on_delete=models.SET_NULL, null=True, related_name='archived_cases'
+    )
+    suspects = models.ManyToManyField(Suspect, through='ArchivedCaseSuspect', related_name='archived_cases')
+    witnesses = models.ManyToManyField(Witness, through='ArchivedCaseWitness', related_name='archived_cases')
+    incident_date = models.DateField(null=True, blank=True)
+    report_date = models.DateField()
+    location = models.CharField(max_length=255, blank=True, null=True)
+    area = models.ForeignKey('Area', on_delete=models.SET_NULL, null=True, related_name='+')
+
+    title = models.CharField(max_length=255)
+    description = models.TextField(blank=True)
+
+    recorded_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='+')
+
+    status = models.CharField(max_length=30, choices=Case.STATUS_CHOICES)
+    court_date = models.DateField(null=True, blank=True)
+
+    deleted = models.BooleanField(default=False)
+    deleted_at = models.DateTimeField(null=True, blank=True)
+    deleted_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='+')
+
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.case_number} - {self.title} (archived)"
+
+
+class ArchivedCaseSuspect(models.Model):
+    case = models.ForeignKey(ArchivedCase, on_delete=models.CASCADE)
+    suspect = models.ForeignKey(Suspect, on_delete=models.CASCADE)
+
+    class Meta:
+        unique_together = ("case", "suspect")
+
+
+class ArchivedCaseWitness(models.Model):
+    case = models.ForeignKey(ArchivedCase, on_delete=models.CASCADE)
+    witness = models.ForeignKey(Witness, on_delete=models.CASCADE)
+
+    class Meta:
+        unique_together = ("case", "witness")
+
+
+class ArchivedCourtDecision(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    uuid = models.UUIDField(unique=True, editable=False)
+    case = models.ForeignKey(ArchivedCase, on_delete=models.CASCADE, related_name='court_decisions')
+    recorded_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='+')
+
+    decision_type = models.CharField(max_length=20, choices=CourtDecision.DECISION_CHOICES)
+    decision_text = models.TextField(blank=True, null=True)
+    decision_date = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['-decision_date']
+
+    def __str__(self):
+        return f"{self.get_decision_type_display()} - Case {self.case.case_number} (archived)"
+
+
+class ArchivedSuspectCourtRuling(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    uuid = models.UUIDField(unique=True, editable=False)
+    suspect = models.ForeignKey(Suspect, related_name='archived_rulings', on_delete=models.CASCADE)
+    case = models.ForeignKey(ArchivedCase, related_name='rulings', on_delete=models.CASCADE)
+
+    ruling_type = models.CharField(max_length=20, choices=SuspectCourtRuling.RULING_CHOICES)
+    ruling_text = models.TextField()
+
+    recorded_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    recorded_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.suspect.name} - {self.ruling_type} (Case #{self.case.case_number}, archived)"
+
+
+class ArchivedCaseEvent(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    # Indexed by archived_event_timeline_idx, which leads with the case
+    case = models.ForeignKey(ArchivedCase, on_delete=models.CASCADE, related_name='events', db_index=False)
+    kind = models.CharField(max_length=20, choices=CaseEvent.KIND_CHOICES)
+    occurred_at = models.DateTimeField()
+    actor = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    summary = models.CharField(max_length=255)
+    data = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        ordering = ['occurred_at', 'id']
+        indexes = [
+            models.Index(fields=['case', 'occurred_at', 'id'], name='archived_event_timeline_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.case_id} {self.occurred_at:%Y-%m-%d %H:%M} {self.summary}"
@@ -0,0 +1,257 @@
+import hashlib
+import logging
+import threading
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.template.loader import render_to_string
+
+from .graph import CaseGraph
+from .models import Suspect, Witness
+
+logger = logging.getLogger(__name__)
+
+# Bump when cases/case_pdf.html changes so previously cached reports are not served
+TEMPLATE_VERSION = 1
+
+RENDER_WORKERS = getattr(settings, 'CASE_PDF_RENDER_WORKERS', 2)
+# Bulk exports a single user may run at the same time
+EXPORTS_PER_USER = getattr(settings, 'CASE_PDF_EXPORTS_PER_USER', 1)
+# Export slots are claimed in the cache every worker process shares, and
+# expire after this long if a worker dies before releasing one
+EXPORT_SLOT_CACHE = getattr(settings, 'CASE_PDF_EXPORT_SLOT_CACHE', 'shared')
+EXPORT_SLOT_TIMEOUT = 60 * 60
+# Renders a single bulk export keeps in flight at once
+EXPORT_CONCURRENCY = getattr(settings, 'CASE_PDF_EXPORT_CONCURRENCY', RENDER_WORKERS)
+STORAGE_PREFIX = 'case_pdfs'
+# How long a failed render is remembered for the client polling for it
+FAILURE_TIMEOUT = 10 * 60
+
+_executor = None
+_pending = {}
+_lock = threading.Lock()
+
+
+def _render_pdf(html, base_url):
+    # Runs in a worker process
+    from weasyprint import HTML
+    return HTML(string=html, base_url=base_url).write_pdf()
+
+
+def _get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=RENDER_WORKERS)
+        return _executor
+
+
+def _aggregate(related, group_by, aggregate):
+    return Subquery(
+        related.order_by().values(group_by).annotate(value=aggregate).values('value')[:1]
+    )
+
+
+def case_pdf_version(case):
+    """
+    Version of a case report, derived from the case, its complainant and the
+    last change and number of its witnesses, suspects and court decisions.
+    Any edit that shows up in the PDF gives a new version. Works for
+    archived cases too, which keep the version they had when live.
+    """
+    model = type(case)
+    # 'cases' for a Case, 'archived_cases' for an ArchivedCase
+    linked = model.witnesses.field.related_query_name()
+    witnesses = Witness.objects.filter(**{linked: OuterRef('pk')})
+    suspects = Suspect.objects.filter(**{linked: OuterRef('pk')})
+    decisions = model.court_decisions.rel.related_model.objects.filter(case=OuterRef('pk'))
+
+    parts = model._base_manager.filter(pk=case.pk).annotate(
+        witnesses_updated=_aggregate(witnesses, linked, Max('updated_at')),
+        witness_count=_aggregate(witnesses, linked, Count('id')),
+        suspects_updated=_aggregate(suspects, linked, Max('updated_at')),
+        suspect_count=_aggregate(suspects, linked, Count('id')),
+        decisions_updated=_aggregate(decisions, 'case', Max('updated_at')),
+        decision_count=_aggregate(decisions, 'case', Count('id')),
+    ).values_list(
+        'updated_at', 'complainant__updated_at',
+        'witnesses_updated', 'witness_count',
+        'suspects_updated', 'suspect_count',
+        'decisions_updated', 'decision_count',
+    ).get()
+
+    fingerprint = f"{TEMPLATE_VERSION}:{case.uuid}:" + ":".join(str(part) for part in parts)
+    return hashlib.sha256(fingerprint.encode()).hexdigest()[:32]
+
+
+def storage_name(case, version):
+    return f"{STORAGE_PREFIX}/{case.uuid}/{version}.pdf"
+
+
+def cached_pdf(case, version):
+    """The rendered report for this version, or None if it hasn't been rendered yet."""
+    name = storage_name(case, version)
+    if not default_storage.exists(name):
+        return None
+    with default_storage.open(name, 'rb') as pdf_file:
+        return pdf_file.read()
+
+
+def _failure_key(name):
+    return f"case_pdf_failed:{name}"
+
+
+def _store(name, future):
+    try:
+        pdf_bytes = future.result()
+        if not default_storage.exists(name):
+            default_storage.save(name, ContentFile(pdf_bytes))
+    except Exception:
+        logger.exception("Rendering %s failed", name)
+        # In the cache so the next poll sees it, whichever process serves it
+        cache.set(_failure_key(name), True, FAILURE_TIMEOUT)
+    finally:
+        with _lock:
+            _pending.pop(name, None)
+
+
+def take_failure(case, version):
+    """
+    True if the last render of this version failed. The failure is reported
+    once; the next request queues a new render.
+    """
+    key = _failure_key(storage_name(case, version))
+    if cache.get(key):
+        cache.delete(key)
+        return True
+    return False
+
+
+def render_async(case, version, base_url):
+    """
+    Queue the case report for rendering in the worker pool. Returns the
+    future, shared with any render of the same version already in flight.
+    The case should come with its CaseGraph relations already loaded.
+    """
+    name = storage_name(case, version)
+    with _lock:
+        future = _pending.get(name)
+    if future is not None:
+        return future
+
+    html = render_to_string('cases/case_pdf.html', {'case': case})
+    executor = _get_executor()
+    # Checked again and submitted under one lock, so concurrent requests for
+    # the same version share a single render
+    with _lock:
+        future = _pending.get(name)
+        if future is not None:
+            return future
+        future = executor.submit(_render_pdf, html, base_url)
+        _pending[name] = future
+    # Outside the lock: the callback runs at once if the render already finished
+    future.add_done_callback(lambda done: _store(name, done))
+    return future
+
+
+def acquire_export_slot(user):
+    """Claim one of the user's concurrent bulk export slots. Returns the slot, or None if all are taken."""
+    slots = caches[EXPORT_SLOT_CACHE]
+    for number in range(EXPORTS_PER_USER):
+        slot = f"case_pdf_exports:{user.pk}:{number}"
+        # add() only succeeds for the one request that creates the entry
+        if slots.add(slot, True, EXPORT_SLOT_TIMEOUT):
+            return slot
+    return None
+
+
+def release_export_slot(slot):
+    caches[EXPORT_SLOT_CACHE].delete(slot)
+
+
+class ExportStream:
+    """
+    The chunks of a bulk export, holding an export slot until Django closes
+    the response, which it also does when the client goes away mid-stream.
+    """
+
+    def __init__(self, chunks, slot):
+        self.chunks = chunks
+        self.slot = slot
+
+    def __iter__(self):
+        return iter(self.chunks)
+
+    def close(self):
+        try:
+            self.chunks.close()
+        finally:
+            release_export_slot(self.slot)
+
+
+class _ZipStream:
+    """Write-only, unseekable sink for ZipFile; drained after every entry."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def iter_reports_zip(cases, base_url, concurrency=None):
+    """
+    Yield a ZIP archive of the case reports chunk by chunk, adding each PDF as
+    soon as it is available. Cached versions are used as they are; the rest
+    are rendered in the worker pool with at most ``concurrency`` in flight,
+    so only those renders and the current entry are held in memory.
+    """
+    concurrency = concurrency or EXPORT_CONCURRENCY
+    stream = _ZipStream()
+    archive = zipfile.ZipFile(stream, mode='w', compression=zipfile.ZIP_STORED)
+    in_flight = {}
+
+    def add(case, pdf_bytes):
+        archive.writestr(f"case_report_{case.case_number}.pdf", pdf_bytes)
+        return stream.drain()
+
+    def collect():
+        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+        for future in done:
+            case = in_flight.pop(future)
+            try:
+                yield add(case, future.result())
+            except Exception:
+                logger.exception("Skipping case %s in bulk export", case.case_number)
+
+    for case in cases:
+        version = case_pdf_version(case)
+        cached = cached_pdf(case, version)
+        if cached is not None:
+            yield add(case, cached)
+            continue
+
+        while len(in_flight) >= concurrency:
+            yield from collect()
+        CaseGraph.prefetch([case])
+        in_flight[render_async(case, version, base_url)] = case
+
+    while in_flight:
+        yield from collect()
+
+    archive.close()
+    yield stream.drain()
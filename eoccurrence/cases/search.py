@@ -0,0 +1,190 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+
+from .models import Case
+
+User = get_user_model()
+
+# The index lives outside the ORM: a tsvector table with a GIN index on
+# Postgres and an FTS5 virtual table on SQLite. Both are keyed by case id and
+# created by migration 0036_case_search_index.
+PG_TABLE = 'cases_case_search'
+SQLITE_TABLE = 'cases_case_fts'
+
+# Field weights, most significant first: case number, title, complainant,
+# location, description.
+PG_DOCUMENT = (
+    "setweight(to_tsvector('simple', %s), 'A') || "
+    "setweight(to_tsvector('simple', %s), 'B') || "
+    "setweight(to_tsvector('simple', %s), 'B') || "
+    "setweight(to_tsvector('simple', %s), 'C') || "
+    "setweight(to_tsvector('simple', %s), 'D')"
+)
+SQLITE_RANK = f"bm25({SQLITE_TABLE}, 10.0, 5.0, 1.0, 2.0, 5.0)"
+
+
+def is_supported():
+    return connection.vendor in ('postgresql', 'sqlite')
+
+
+def _words(text):
+    # Split on anything that is not a word character so "20250101-0001" is
+    # indexed and queried as the same two tokens on both backends.
+    return re.findall(r'\w+', text or '')
+
+
+def _normalise(text):
+    return ' '.join(_words(text))
+
+
+def _document(case):
+    complainant = case.complainant
+    if complainant:
+        complainant_name = f"{complainant.first_name} {complainant.last_name or ''}"
+    else:
+        complainant_name = ''
+
+    return [
+        _normalise(case.case_number),
+        _normalise(case.title),
+        _normalise(case.description),
+        _normalise(case.location),
+        _normalise(complainant_name),
+    ]
+
+
+def index_case(case):
+    """Add or refresh a single case in the search index."""
+    index_cases([case])
+
+
+def index_cases(cases):
+    """Add or refresh many cases with one statement per step, e.g. after a bulk import."""
+    if not is_supported():
+        return
+
+    rows = [[case.pk, *_document(case)] for case in cases]
+    if not rows:
+        return
+
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.executemany(
+                f"INSERT INTO {PG_TABLE} (case_id, document) VALUES (%s, {PG_DOCUMENT}) "
+                "ON CONFLICT (case_id) DO UPDATE SET document = EXCLUDED.document",
+                [[pk, case_number, title, complainant, location, description]
+                 for pk, case_number, title, description, location, complainant in rows],
+            )
+        else:
+            cursor.executemany(f"DELETE FROM {SQLITE_TABLE} WHERE rowid = %s", [[row[0]] for row in rows])
+            cursor.executemany(
+                f"INSERT INTO {SQLITE_TABLE} "
+                "(rowid, case_number, title, description, location, complainant) "
+                "VALUES (%s, %s, %s, %s, %s, %s)",
+                rows,
+            )
+
+
+def remove_case(case_id):
+    remove_cases([case_id])
+
+
+def remove_cases(case_ids):
+    if not is_supported() or not case_ids:
+        return
+
+    table = PG_TABLE if connection.vendor == 'postgresql' else SQLITE_TABLE
+    column = 'case_id' if connection.vendor == 'postgresql' else 'rowid'
+    with connection.cursor() as cursor:
+        cursor.executemany(f"DELETE FROM {table} WHERE {column} = %s", [[case_id] for case_id in case_ids])
+
+
+def rebuild_index():
+    """Drop every entry and index all cases again. Returns the number indexed."""
+    if not is_supported():
+        return 0
+
+    table = PG_TABLE if connection.vendor == 'postgresql' else SQLITE_TABLE
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {table}")
+
+    total = 0
+    batch = []
+    # Deleted cases stay indexed so a restored case is searchable again
+    for case in Case.all_with_deleted.select_related('complainant').iterator(chunk_size=2000):
+        batch.append(case)
+        if len(batch) == 2000:
+            index_cases(batch)
+            total += len(batch)
+            batch = []
+    index_cases(batch)
+    return total + len(batch)
+
+
+def _match_query(query):
+    words = _words(query)
+    if not words:
+        return None
+    if connection.vendor == 'postgresql':
+        return ' & '.join(f"{word}:*" for word in words)
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def search(query, status=None, recorded_by=None, limit=20):
+    """
+    Ranked full-text search over live cases.
+
+    The status and recorded_by filters are applied in the same statement as
+    the index lookup, and the total number of matches is returned alongside
+    the page through a window count. Returns ``(cases, total)``.
+    """
+    match = _match_query(query)
+    if match is None:
+        return [], 0
+
+    case_table = connection.ops.quote_name(Case._meta.db_table)
+    user_table = connection.ops.quote_name(User._meta.db_table)
+
+    if connection.vendor == 'postgresql':
+        sql = (
+            "SELECT c.id, ts_rank(s.document, q) AS score, COUNT(*) OVER () "
+            f"FROM {PG_TABLE} s "
+            f"JOIN {case_table} c ON c.id = s.case_id, "
+            "to_tsquery('simple', %s) q "
+            "WHERE s.document @@ q AND NOT c.deleted"
+        )
+        order_by = " ORDER BY score DESC, c.id DESC"
+    else:
+        sql = (
+            "SELECT c.id, m.score, COUNT(*) OVER () "
+            f"FROM (SELECT rowid, {SQLITE_RANK} AS score FROM {SQLITE_TABLE} "
+            f"WHERE {SQLITE_TABLE} MATCH %s) m "
+            f"JOIN {case_table} c ON c.id = m.rowid "
+            "WHERE NOT c.deleted"
+        )
+        # bm25() is negative, the best match is the smallest value.
+        order_by = " ORDER BY m.score, c.id DESC"
+
+    params = [match]
+    if status:
+        sql += " AND c.status = %s"
+        params.append(status)
+    if recorded_by:
+        sql += f" AND c.recorded_by_id IN (SELECT id FROM {user_table} WHERE username = %s)"
+        params.append(recorded_by)
+
+    sql += order_by + " LIMIT %s"
+    params.append(limit)
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+    if not rows:
+        return [], 0
+
+    ids = [row[0] for row in rows]
+    cases = Case.objects.select_related('complainant').in_bulk(ids)
+    return [cases[case_id] for case_id in ids if case_id in cases], rows[0][2]
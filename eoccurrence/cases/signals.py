@@ -0,0 +1,173 @@
+from collections import Counter
+
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from core import counts
+
+from . import dedupe, search
+from .models import Area, Case, CaseStatisticsRollup, Complainant, HotspotCell, Suspect, Witness, refresh_case_summaries
+
+
+@receiver(post_save, sender=Case)
+def index_saved_case(sender, instance, **kwargs):
+    search.index_case(instance)
+    counts.invalidate(Case)
+
+
+@receiver(post_delete, sender=Case)
+def unindex_deleted_case(sender, instance, **kwargs):
+    search.remove_case(instance.pk)
+    counts.invalidate(Case)
+
+
+@receiver(post_save, sender=Complainant)
+def reindex_complainant_cases(sender, instance, created, **kwargs):
+    # The complainant's name is part of every one of their cases' documents,
+    # and case listings filter on it
+    if created:
+        return
+    counts.invalidate(Case)
+    for case in Case.all_with_deleted.filter(complainant=instance):
+        case.complainant = instance
+        search.index_case(case)
+
+
+@receiver(pre_delete, sender=Case)
+def remove_case_from_statistics(sender, instance, **kwargs):
+    # Link rows go with the case in a cascade that sends no m2m signals
+    CaseStatisticsRollup.adjust(
+        instance.rollup_key(),
+        cases=-1,
+        suspects=-instance.suspects.count(),
+        witnesses=-instance.witnesses.count(),
+    )
+    HotspotCell.adjust(instance.hotspot_key(), -1)
+
+
+@receiver(post_save, sender=Suspect)
+@receiver(post_save, sender=Witness)
+@receiver(post_delete, sender=Suspect)
+@receiver(post_delete, sender=Witness)
+def recount_people(sender, created=True, **kwargs):
+    # The statistics page totals people from core.counts
+    if created:
+        counts.invalidate(sender)
+
+
+@receiver(post_delete, sender=Complainant)
+@receiver(post_delete, sender=Suspect)
+@receiver(post_delete, sender=Witness)
+def forget_deleted_person(sender, instance, **kwargs):
+    # Duplicate detection refers to people by kind and id, without foreign keys
+    dedupe.forget(sender._meta.model_name, instance.pk)
+
+
+@receiver(post_save, sender=Area)
+@receiver(post_delete, sender=Area)
+def reload_gazetteer(sender, **kwargs):
+    # Each process reloads its in-memory gazetteer on the next match
+    counts.invalidate(Area)
+
+
+def _update_link_statistics(counter, through, related_field, instance, action, reverse, pk_set):
+    # Count the links each case gains or loses. Removals are counted before
+    # they happen so only links that actually exist are subtracted.
+    if action == 'post_add':
+        sign = 1
+        case_ids = [instance.pk] * len(pk_set) if not reverse else list(pk_set)
+    elif action in ('pre_remove', 'pre_clear'):
+        sign = -1
+        if not reverse:
+            links = through.objects.filter(case_id=instance.pk)
+            if action == 'pre_remove':
+                links = links.filter(**{f"{related_field}_id__in": pk_set})
+            case_ids = [instance.pk] * links.count()
+        else:
+            links = through.objects.filter(**{f"{related_field}_id": instance.pk})
+            if action == 'pre_remove':
+                links = links.filter(case_id__in=pk_set)
+            case_ids = list(links.values_list('case_id', flat=True))
+    else:
+        return
+
+    if not case_ids:
+        return
+
+    if not reverse:
+        keys = Counter({instance.rollup_key(): len(case_ids)})
+    else:
+        cases = Case.all_with_deleted.filter(pk__in=case_ids).only('status', 'case_type', 'report_date', 'deleted')
+        key_by_id = {case.pk: case.rollup_key() for case in cases}
+        keys = Counter(key_by_id[case_id] for case_id in case_ids)
+
+    for key, links in keys.items():
+        CaseStatisticsRollup.adjust(key, **{counter: sign * links})
+
+
+@receiver(m2m_changed, sender=Case.suspects.through)
+def update_suspect_statistics(sender, instance, action, reverse, pk_set, **kwargs):
+    _update_link_statistics('suspects', sender, 'suspect', instance, action, reverse, pk_set)
+
+
+@receiver(m2m_changed, sender=Case.witnesses.through)
+def update_witness_statistics(sender, instance, action, reverse, pk_set, **kwargs):
+    _update_link_statistics('witnesses', sender, 'witness', instance, action, reverse, pk_set)
+
+
+# Suspect and witness lists render each person's linked case numbers and
+# statuses from their case_summary instead of querying every row's cases.
+
+@receiver(post_save, sender=Case)
+def refresh_summaries_of_saved_case(sender, instance, created, **kwargs):
+    current = (instance.case_number, instance.status)
+    if created or getattr(instance, '_loaded_summary', None) == current:
+        instance._loaded_summary = current
+        return
+    instance._loaded_summary = current
+    refresh_case_summaries(Suspect, instance.suspects.values_list('pk', flat=True))
+    refresh_case_summaries(Witness, instance.witnesses.values_list('pk', flat=True))
+
+
+@receiver(pre_delete, sender=Case)
+def remember_people_of_deleted_case(sender, instance, **kwargs):
+    # The links are cascaded away without m2m signals
+    instance._linked_people = (
+        list(instance.suspects.values_list('pk', flat=True)),
+        list(instance.witnesses.values_list('pk', flat=True)),
+    )
+
+
+@receiver(post_delete, sender=Case)
+def refresh_summaries_of_deleted_case(sender, instance, **kwargs):
+    suspects, witnesses = getattr(instance, '_linked_people', ((), ()))
+    refresh_case_summaries(Suspect, suspects)
+    refresh_case_summaries(Witness, witnesses)
+
+
+def _update_case_summaries(model, instance, action, reverse, pk_set):
+    cleared = f"_cleared_{model._meta.model_name}_ids"
+    if action == 'pre_clear' and not reverse:
+        # Nobody is left to look up by post_clear, so note who loses the case now
+        setattr(instance, cleared, list(getattr(instance, model.cases.field.name).values_list('pk', flat=True)))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if reverse:
+        ids = [instance.pk]
+    elif action == 'post_clear':
+        ids = instance.__dict__.pop(cleared, [])
+    else:
+        ids = pk_set
+    refresh_case_summaries(model, ids)
+
+
+@receiver(m2m_changed, sender=Case.suspects.through)
+def update_suspect_case_summaries(sender, instance, action, reverse, pk_set, **kwargs):
+    _update_case_summaries(Suspect, instance, action, reverse, pk_set)
+
+
+@receiver(m2m_changed, sender=Case.witnesses.through)
+def update_witness_case_summaries(sender, instance, action, reverse, pk_set, **kwargs):
+    _update_case_summaries(Witness, instance, action, reverse, pk_set)
@@ -1,3 +1,1153 @@
-from django.test import TestCase
+import csv
+import datetime
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.cache.backends.db import DatabaseCache
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Sum
+from django.test import TestCase, TransactionTestCase, override_settings, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import Userprofile
+from core import counts
+
+from . import dedupe, gazetteer, pdf, search, transitions
+from .graph import CaseGraph
+from .models import (
+    Area, ArchivedCase, ArchivedCourtDecision, ArchivedSuspectCourtRuling, Case, CaseEvent, CaseNumberSequence,
+    CaseStatisticsRollup, Complainant, CourtDecision, DuplicateCluster, HotspotCell, Suspect, SuspectCourtRuling,
+    Witness,
+)
+
+
+class CaseNumberSequenceTests(TestCase):
+    def test_numbers_are_sequential_per_day(self):
+        day = datetime.date(2025, 1, 31)
+
+        self.assertEqual(CaseNumberSequence.allocate(day=day), ["20250131-0001"])
+        self.assertEqual(CaseNumberSequence.allocate(day=day), ["20250131-0002"])
+        self.assertEqual(CaseNumberSequence.allocate(day=datetime.date(2025, 2, 1)), ["20250201-0001"])
+
+    def test_block_reservation_is_contiguous(self):
+        day = datetime.date(2025, 1, 31)
+        CaseNumberSequence.allocate(day=day)
+
+        block = CaseNumberSequence.allocate(3, day=day)
+
+        self.assertEqual(block, ["20250131-0002", "20250131-0003", "20250131-0004"])
+        self.assertEqual(CaseNumberSequence.allocate(day=day), ["20250131-0005"])
+
+    def test_advance_skips_numbers_taken_elsewhere(self):
+        day = datetime.date(2025, 1, 31)
+        CaseNumberSequence.advance(day, 7)
+        CaseNumberSequence.advance(day, 3)
+
+        self.assertEqual(CaseNumberSequence.allocate(day=day), ["20250131-0008"])
+        self.assertEqual(CaseNumberSequence.parse("20250131-0008"), (day, 8))
+        self.assertIsNone(CaseNumberSequence.parse("OB/12/2025"))
+        self.assertIsNone(CaseNumberSequence.parse("20251331-0001"))
+
+    def test_case_save_assigns_number(self):
+        first = Case.objects.create(title="First")
+        second = Case.objects.create(title="Second")
+
+        self.assertTrue(first.case_number.endswith("-0001"))
+        self.assertTrue(second.case_number.endswith("-0002"))
+
+
+# SQLite's shared in-memory test database cannot take concurrent writers, so
+# these only run on backends with row locking (PostgreSQL).
+@skipUnlessDBFeature("has_select_for_update")
+class CaseNumberConcurrencyTests(TransactionTestCase):
+    threads = 8
+    per_thread = 25
+
+    def _hammer(self, work):
+        errors = []
+        barrier = threading.Barrier(self.threads)
+
+        def run():
+            try:
+                barrier.wait()
+                for _ in range(self.per_thread):
+                    work()
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=run) for _ in range(self.threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        return errors
+
+    def test_concurrent_allocations_are_unique(self):
+        day = datetime.date(2025, 1, 31)
+        numbers = []
+        lock = threading.Lock()
+
+        def work():
+            block = CaseNumberSequence.allocate(2, day=day)
+            with lock:
+                numbers.extend(block)
+
+        self.assertEqual(self._hammer(work), [])
+
+        total = self.threads * self.per_thread * 2
+        self.assertEqual(len(set(numbers)), total)
+        self.assertEqual(sorted(numbers), [f"20250131-{n:04d}" for n in range(1, total + 1)])
+
+    def test_concurrent_case_creation(self):
+        errors = self._hammer(lambda: Case.objects.create(title="Concurrent intake"))
+
+        self.assertEqual(errors, [])
+        self.assertEqual(
+            Case.objects.values("case_number").distinct().count(),
+            self.threads * self.per_thread,
+        )
+
+
+# Counts the queries of whole requests, which a heartbeat flush falling due would add to
+@override_settings(ACTIVITY_FLUSH_INTERVAL=None)
+class CaseGraphTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = []
+        for n in range(3):
+            user = User.objects.create_user(f"officer{n}", password="pw")
+            Userprofile.objects.create(user=user, id_number=f"ID{n}", user_role="admin")
+            cls.users.append(user)
+
+        cls.small = cls.make_case(1)
+        cls.large = cls.make_case(6)
+
+    @classmethod
+    def make_case(cls, size):
+        complainant = Complainant.objects.create(first_name="Jane", last_name="Doe")
+        case = Case.objects.create(title="Burglary", complainant=complainant, recorded_by=cls.users[0])
+        for n in range(size):
+            user = cls.users[n % len(cls.users)]
+            case.witnesses.add(Witness.objects.create(name=f"Witness {n}", recorded_by=user))
+            suspect = Suspect.objects.create(name=f"Suspect {n}", recorded_by=user)
+            case.suspects.add(suspect)
+            SuspectCourtRuling.objects.create(
+                suspect=suspect, case=case, ruling_type="bail_granted", ruling_text="Bail", recorded_by=user,
+            )
+            CourtDecision.objects.create(case=case, decision_type="ADJOURNED", recorded_by=user)
+        return case
+
+    def walk(self, graph):
+        case = graph.case
+        seen = [case.complainant.first_name, case.recorded_by.profile.uuid, case.deleted_by]
+        for witness in graph.witnesses:
+            seen.append(witness.recorded_by.profile.uuid)
+        for suspect in graph.suspects:
+            seen.append(suspect.recorded_by.profile.uuid)
+            for ruling in suspect.rulings.all():
+                seen.extend([ruling.case.case_number, ruling.recorded_by.profile.uuid])
+        for decision in graph.court_decisions:
+            seen.append(decision.recorded_by.profile.uuid)
+        seen.extend([case.witnesses.count(), case.suspects.exists()])
+        return seen
+
+    def test_graph_loads_in_fixed_number_of_queries(self):
+        for case in (self.small, self.large):
+            # case, witnesses, suspects, rulings, court decisions
+            with self.assertNumQueries(5):
+                self.walk(CaseGraph.get(uuid=case.uuid))
+
+    def test_prefetch_loads_existing_cases_in_bulk(self):
+        cases = list(Case.objects.filter(pk__in=[self.small.pk, self.large.pk]))
+        # complainants, case users and their profiles, then one query per relation
+        with self.assertNumQueries(7):
+            graphs = CaseGraph.prefetch(cases)
+        with self.assertNumQueries(0):
+            for graph in graphs:
+                self.walk(graph)
+
+    def test_case_pages_do_not_grow_with_case_size(self):
+        self.client.force_login(self.users[0])
+
+        def queries(case):
+            suspect = case.suspects.first()
+            witness = case.witnesses.first()
+            urls = [
+                reverse("cases:case_details", args=[case.uuid]),
+                reverse("cases:suspect_page", args=[case.uuid, suspect.uuid]),
+                reverse("cases:witness_page", args=[case.uuid, witness.uuid]),
+                reverse("cases:court_case_final", args=[case.uuid]),
+            ]
+            counts = []
+            for url in urls:
+                with CaptureQueriesContext(connection) as context:
+                    response = self.client.get(url)
+                self.assertEqual(response.status_code, 200, url)
+                counts.append(len(context))
+            return counts
+
+        self.assertEqual(queries(self.small), queries(self.large))
+
+
+@override_settings(ACTIVITY_FLUSH_INTERVAL=None)
+class CaseSummaryTests(TestCase):
+    def summary(self, person):
+        person.refresh_from_db()
+        return [(case["case_number"], case["status"]) for case in person.case_summary]
+
+    def test_summaries_follow_links_and_case_changes(self):
+        first = Case.objects.create(title="First")
+        second = Case.objects.create(title="Second")
+        suspect = Suspect.objects.create(name="Suspect")
+        witness = Witness.objects.create(name="Witness")
+
+        first.suspects.add(suspect)
+        second.suspects.add(suspect)
+        first.witnesses.add(witness)
+        self.assertEqual(
+            self.summary(suspect),
+            [(second.case_number, "open"), (first.case_number, "open")],
+        )
+        self.assertEqual(self.summary(witness), [(first.case_number, "open")])
+
+        first.status = "in_court"
+        first.save()
+        self.assertEqual(self.summary(suspect)[1], (first.case_number, "in_court"))
+        self.assertEqual(self.summary(witness), [(first.case_number, "in_court")])
+
+        suspect.cases.remove(second)
+        self.assertEqual(self.summary(suspect), [(first.case_number, "in_court")])
+
+        first.witnesses.clear()
+        self.assertEqual(self.summary(witness), [])
+
+        first.delete()
+        self.assertEqual(self.summary(suspect), [])
+
+    def test_suspect_list_renders_from_one_query_per_page(self):
+        user = User.objects.create_user("officer", password="pw")
+        Userprofile.objects.create(user=user, id_number="ID1", user_role="police")
+        self.client.force_login(user)
+
+        def queries():
+            with CaptureQueriesContext(connection) as context:
+                self.client.get(reverse("cases:suspect_list"))
+            return len(context)
+
+        case = Case.objects.create(title="Case")
+        case.suspects.add(Suspect.objects.create(name="Only suspect"))
+        baseline = queries()
+
+        for n in range(5):
+            suspect = Suspect.objects.create(name=f"Suspect {n}")
+            suspect.cases.add(case, Case.objects.create(title=f"Case {n}"))
+        self.assertEqual(queries(), baseline)
+
+
+@override_settings(ACTIVITY_FLUSH_INTERVAL=None)
+class CaseListingCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("officer", password="pw")
+        Userprofile.objects.create(user=self.user, id_number="ID1", user_role="police")
+        self.client.force_login(self.user)
+        self.cases = [Case.objects.create(title=f"Theft {n}") for n in range(3)]
+
+    def get(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse("cases:view_cases"))
+        self.assertEqual(response.status_code, 200)
+        case_reads = [
+            query for query in context.captured_queries
+            if query["sql"].startswith('SELECT "cases_case"."id"')
+        ]
+        return response.content.decode(), case_reads
+
+    def test_repeat_listing_renders_from_cache(self):
+        first, reads = self.get()
+        self.assertEqual(len(reads), 1)
+        repeat, reads = self.get()
+        self.assertEqual(reads, [])
+        self.assertEqual(repeat, first)
+
+    def test_case_write_retires_cached_listing(self):
+        self.get()
+        case = self.cases[0]
+        case.title = "Robbery at the market"
+        case.save()
+        content, reads = self.get()
+        self.assertEqual(len(reads), 1)
+        self.assertIn("Robbery at the market", content)
+        self.assertNotIn("Theft 0", content)
+
+    def test_write_from_another_process_retires_cached_listing(self):
+        self.get()
+        # A management command in its own process: its own local cache, the same shared one
+        Case.objects.filter(pk=self.cases[0].pk).update(
+            title="Imported robbery", updated_at=self.cases[0].updated_at + datetime.timedelta(seconds=1),
+        )
+        DatabaseCache("shared_cache", {}).incr(counts._generation_key(Case))
+
+        content, reads = self.get()
+        self.assertEqual(len(reads), 1)
+        self.assertIn("Imported robbery", content)
+
+
+class CaseTransitionTests(TestCase):
+    def setUp(self):
+        self.case = Case.objects.create(title="Assault")
+        self.suspect = Suspect.objects.create(name="Suspect")
+        self.case.suspects.add(self.suspect)
+
+    def rollup(self, status):
+        return CaseStatisticsRollup.objects.filter(status=status).values_list(
+            "case_count", "suspect_count"
+        ).first()
+
+    def test_decision_updates_only_the_status_columns(self):
+        with CaptureQueriesContext(connection) as context:
+            CourtDecision.objects.create(case=self.case, decision_type="CLOSED")
+        case_writes = [query["sql"] for query in context.captured_queries
+                       if query["sql"].startswith('UPDATE "cases_case"')]
+        self.assertEqual(len(case_writes), 1)
+        self.assertNotIn('"title"', case_writes[0])
+
+        self.case.refresh_from_db()
+        self.assertEqual(self.case.status, "closed")
+        self.assertIsNotNone(self.case.court_date)
+        self.assertEqual(self.rollup("closed"), (1, 1))
+        self.assertEqual(self.rollup("open"), (0, 0))
+        self.suspect.refresh_from_db()
+        self.assertEqual(self.suspect.case_summary[0]["status"], "closed")
+
+    def test_closed_case_rejects_decisions_and_rulings(self):
+        CourtDecision.objects.create(case=self.case, decision_type="DISMISSED")
+        with self.assertRaises(transitions.InvalidTransition):
+            CourtDecision.objects.create(case=self.case, decision_type="CLOSED")
+        with self.assertRaises(transitions.InvalidTransition):
+            SuspectCourtRuling.objects.create(
+                suspect=self.suspect, case=self.case, ruling_type="fined", ruling_text="Fined",
+            )
+        self.assertEqual(self.case.court_decisions.count(), 1)
+
+    def test_editing_a_decision_corrects_the_status(self):
+        decision = CourtDecision.objects.create(case=self.case, decision_type="CLOSED")
+        decision = CourtDecision.objects.get(pk=decision.pk)
+        decision.decision_type = "DISMISSED"
+        decision.save()
+        self.case.refresh_from_db()
+        self.assertEqual(self.case.status, "dismissed")
+
+    def test_unchanged_bail_status_is_not_written(self):
+        def suspect_writes(*ruling_types):
+            with CaptureQueriesContext(connection) as context:
+                for ruling_type in ruling_types:
+                    SuspectCourtRuling.objects.create(
+                        suspect=self.suspect, case=self.case, ruling_type=ruling_type, ruling_text="Ruling",
+                    )
+            return [query for query in context.captured_queries
+                    if query["sql"].startswith('UPDATE "cases_suspect"')]
+
+        self.assertEqual(len(suspect_writes("bail_granted", "bail_denied")), 2)
+        self.suspect.refresh_from_db()
+        self.assertEqual(self.suspect.bail_status, "denied")
+        # Both leave the suspect not_applicable, so only the first writes it
+        self.assertEqual(len(suspect_writes("fined", "sentenced")), 1)
+
+    def test_bulk_transition_moves_allowed_cases_in_one_update(self):
+        others = [Case.objects.create(title=f"Theft {n}") for n in range(3)]
+        Case.objects.filter(pk=others[0].pk).update(status="under_investigation")
+        with CaptureQueriesContext(connection) as context:
+            moved = transitions.transition_cases(Case.objects.all(), "dismissed")
+        self.assertEqual(moved, 3)
+        case_writes = [query for query in context.captured_queries
+                       if query["sql"].startswith('UPDATE "cases_case"')]
+        self.assertEqual(len(case_writes), 1)
+        self.assertEqual(Case.objects.filter(status="dismissed").count(), 3)
+        self.assertEqual(self.rollup("dismissed"), (3, 1))
+
+
+@override_settings(ACTIVITY_FLUSH_INTERVAL=None)
+class CaseEventTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("admin", password="pw")
+        Userprofile.objects.create(user=self.user, id_number="ID1", user_role="admin")
+        self.client.force_login(self.user)
+        self.case = Case.objects.create(
+            title="Burglary", recorded_by=self.user, complainant=Complainant.objects.create(first_name="Jane"),
+        )
+
+    def kinds(self, case=None):
+        return list((case or self.case).events.values_list("kind", flat=True))
+
+    def test_mutations_are_recorded_in_order(self):
+        response = self.client.post(reverse("cases:edit_case", args=[self.case.uuid]), {
+            "case_type": "OTHER", "title": "Burglary at the depot", "status": "under_investigation",
+        })
+        self.assertEqual(response.status_code, 302)
+        self.client.post(reverse("cases:suspect_entry", args=[self.case.uuid]), {"name": "Suspect", "gender": "M"})
+        self.case.refresh_from_db()
+        self.case.status = "open"
+        self.case.save(actor=self.user)
+        CourtDecision.objects.create(case=self.case, decision_type="CLOSED", recorded_by=self.user)
+        self.client.get(reverse("cases:delete_case", args=[self.case.uuid]))
+
+        self.assertEqual(self.kinds(), [
+            "created", "status_changed", "updated", "suspect_added", "status_changed",
+            "decision", "status_changed", "deleted",
+        ])
+        events = list(self.case.events.all())
+        self.assertEqual(events[1].data, {"from": "open", "to": "under_investigation"})
+        self.assertEqual(events[2].data, {"fields": ["title"]})
+        self.assertEqual(events[-2].summary, "Status changed from Open to Closed")
+        self.assertTrue(all(event.actor_id == self.user.pk for event in events))
+
+    def test_timeline_renders_from_one_query(self):
+        for n in range(3):
+            CaseEvent.record(self.case, "updated", f"Edit {n}", actor_id=self.user.pk)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse("cases:case_details", args=[self.case.uuid]))
+        self.assertContains(response, "Edit 2")
+        event_reads = [query for query in context.captured_queries if '"cases_caseevent"' in query["sql"]]
+        self.assertEqual(len(event_reads), 1)
+
+    def test_backfill_seeds_cases_without_history(self):
+        suspect = Suspect.objects.create(name="Suspect")
+        self.case.suspects.add(suspect)
+        CourtDecision.objects.create(case=self.case, decision_type="ADJOURNED", recorded_by=self.user)
+        CaseEvent.objects.all().delete()
+
+        call_command("backfill_case_events", stdout=open("/dev/null", "w"))
+        self.assertEqual(self.kinds(), ["created", "suspect_added", "decision"])
+        call_command("backfill_case_events", stdout=open("/dev/null", "w"))
+        self.assertEqual(self.case.events.count(), 3)
+
+
+class SoftDeleteManagerTests(TestCase):
+    def setUp(self):
+        self.users = {}
+        for role in ("police", "admin"):
+            self.users[role] = User.objects.create_user(role, password="pw")
+            Userprofile.objects.create(user=self.users[role], id_number=role, user_role=role)
+
+        complainant = Complainant.objects.create(first_name="Jane")
+        self.live = Case.objects.create(title="Live theft", complainant=complainant, recorded_by=self.users["police"])
+        self.gone = Case.objects.create(title="Deleted theft", complainant=complainant, recorded_by=self.users["police"])
+        self.suspect = Suspect.objects.create(name="Suspect")
+        self.suspect.cases.add(self.live, self.gone)
+        self.gone.deleted, self.gone.deleted_by = True, self.users["admin"]
+        self.gone.save()
+
+    def login(self, role):
+        self.client.force_login(self.users[role])
+
+    def test_default_manager_hides_deleted_cases(self):
+        self.assertEqual(list(Case.objects.all()), [self.live])
+        self.assertEqual(Case.all_with_deleted.count(), 2)
+        self.assertEqual(list(self.suspect.cases.all()), [self.live])
+        # Forward relations still reach a deleted case
+        event = self.gone.events.last()
+        self.assertEqual(CaseEvent.objects.get(pk=event.pk).case, self.gone)
+
+    def test_listing_and_details_follow_role(self):
+        self.login("police")
+        self.assertNotContains(self.client.get(reverse("cases:view_cases")), "Deleted theft")
+        self.assertEqual(self.client.get(reverse("cases:case_pdf", args=[self.gone.uuid])).status_code, 404)
+
+        self.login("admin")
+        self.assertContains(self.client.get(reverse("cases:view_cases")), "Deleted theft")
+        self.assertContains(self.client.get(reverse("cases:case_details", args=[self.gone.uuid])), "Deleted theft")
+
+
+class CaseArchiveTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("admin", password="pw")
+        Userprofile.objects.create(user=self.user, id_number="ID1", user_role="admin")
+        self.client.force_login(self.user)
+
+        self.case = Case.objects.create(
+            title="Burglary at the depot", recorded_by=self.user,
+            complainant=Complainant.objects.create(first_name="Jane"),
+        )
+        self.suspect = Suspect.objects.create(name="Suspect", recorded_by=self.user)
+        self.witness = Witness.objects.create(name="Witness", recorded_by=self.user)
+        self.case.suspects.add(self.suspect)
+        self.case.witnesses.add(self.witness)
+        SuspectCourtRuling.objects.create(
+            suspect=self.suspect, case=self.case, ruling_type="sentenced", ruling_text="Two years", recorded_by=self.user,
+        )
+        CourtDecision.objects.create(case=self.case, decision_type="CLOSED", recorded_by=self.user)
+        self.age(self.case, days=400)
+
+    def age(self, case, days):
+        Case.all_with_deleted.filter(pk=case.pk).update(
+            updated_at=datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=days),
+        )
+
+    def archive(self):
+        call_command("archive_cases", stdout=open("/dev/null", "w"))
+
+    def rollup(self):
+        # rebuild() leaves out the empty buckets adjust() leaves behind
+        return list(CaseStatisticsRollup.objects.filter(case_count__gt=0).order_by("status").values_list(
+            "status", "case_count", "suspect_count", "witness_count",
+        ))
+
+    def test_round_trip_keeps_the_case_graph(self):
+        rollup, summary = self.rollup(), Suspect.objects.get(pk=self.suspect.pk).case_summary
+        created_at = Case.objects.get(pk=self.case.pk).created_at
+
+        self.archive()
+        self.assertFalse(Case.all_with_deleted.exists())
+        self.assertFalse(CourtDecision.objects.exists() or SuspectCourtRuling.objects.exists())
+        archived = ArchivedCase.objects.get(pk=self.case.pk)
+        self.assertEqual(list(archived.suspects.all()), [self.suspect])
+        self.assertEqual(list(archived.witnesses.all()), [self.witness])
+        self.assertEqual(ArchivedCourtDecision.objects.get().case, archived)
+        self.assertEqual(ArchivedSuspectCourtRuling.objects.get().suspect, self.suspect)
+        # Archived cases still count, and stay on their people's summaries
+        self.assertEqual(self.rollup(), rollup)
+        CaseStatisticsRollup.rebuild()
+        self.assertEqual(self.rollup(), rollup)
+        self.assertEqual(Suspect.objects.get(pk=self.suspect.pk).case_summary, summary)
+
+        call_command("restore_cases", self.case.case_number, stdout=open("/dev/null", "w"))
+        self.assertFalse(ArchivedCase.objects.exists())
+        case = Case.objects.get(pk=self.case.pk)
+        self.assertEqual((case.uuid, case.status, case.created_at), (self.case.uuid, "closed", created_at))
+        self.assertEqual(list(case.suspects.all()), [self.suspect])
+        self.assertEqual(case.court_decisions.count(), 1)
+        self.assertEqual(case.rulings.count(), 1)
+        self.assertEqual(list(case.events.values_list("kind", flat=True))[-2:], ["archived", "unarchived"])
+        self.assertEqual(self.rollup(), rollup)
+        self.assertEqual(search.search("depot")[1], 1)
+
+    def test_listings_skip_archive_but_details_fall_back(self):
+        version = pdf.case_pdf_version(self.case)
+        self.archive()
+
+        self.assertNotContains(self.client.get(reverse("cases:view_cases")), "Burglary at the depot")
+        self.assertEqual(search.search("depot"), ([], 0))
+
+        response = self.client.get(reverse("cases:case_details", args=[self.case.uuid]))
+        self.assertContains(response, "Burglary at the depot")
+        self.assertContains(response, "read-only until it is restored")
+        self.assertNotContains(response, reverse("cases:edit_case", args=[self.case.uuid]))
+        response = self.client.get(reverse("cases:suspect_page", args=[self.case.uuid, self.suspect.uuid]))
+        self.assertContains(response, "Two years")
+        self.assertEqual(pdf.case_pdf_version(ArchivedCase.objects.get()), version)
+
+    def test_only_old_cases_in_a_final_status_are_archived(self):
+        recent = Case.objects.create(title="Recent", status="closed")
+        still_open = Case.objects.create(title="Open")
+        self.age(still_open, days=400)
+
+        self.archive()
+        self.assertEqual(list(ArchivedCase.objects.values_list("pk", flat=True)), [self.case.pk])
+        self.assertEqual(set(Case.objects.values_list("pk", flat=True)), {recent.pk, still_open.pk})
+
+
+class GazetteerTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.westlands = gazetteer.ensure("Nairobi", "Westlands")
+        self.kisumu_central = gazetteer.ensure("Kisumu", "Central")
+        self.nyeri_central = gazetteer.ensure("Nyeri", "Central")
+        self.county = {name: Area.objects.get(parent=None, name=name) for name in ("Nairobi", "Kisumu")}
+
+    def cells(self):
+        return {
+            (area, week.isoformat()): count
+            for area, week, count in HotspotCell.objects.filter(case_count__gt=0).values_list(
+                "area__name", "week", "case_count",
+            )
+        }
+
+    def test_matching(self):
+        self.assertEqual(gazetteer.match("Westlands, Nairobi"), self.westlands.pk)
+        self.assertEqual(gazetteer.match("near Westlnds police post"), self.westlands.pk)
+        self.assertEqual(gazetteer.match("Central, Kisumu"), self.kisumu_central.pk)
+        self.assertEqual(gazetteer.match("Nairobi CBD"), self.county["Nairobi"].pk)
+        self.assertEqual(gazetteer.match("Murang'a County"), Area.objects.get(name="Murang'a").pk)
+        # Two sub-counties named Central and no county to tell them apart
+        self.assertIsNone(gazetteer.match("Central"))
+        self.assertIsNone(gazetteer.match("somewhere else"))
+
+    def test_areas_loaded_by_another_process_are_matched(self):
+        self.assertEqual(gazetteer.match("Kilimani, Nairobi"), self.county["Nairobi"].pk)
+
+        # load_gazetteer in its own process: new rows and a bumped shared generation
+        Area.objects.bulk_create([
+            Area(name="Kilimani", key="kilimani", level="sub_county", parent=self.county["Nairobi"]),
+        ])
+        DatabaseCache("shared_cache", {}).incr(counts._generation_key(Area))
+
+        kilimani = Area.objects.get(key="kilimani")
+        self.assertEqual(gazetteer.match("Kilimani, Nairobi"), kilimani.pk)
+        case = Case.objects.create(title="Theft", location="Kilimani, Nairobi", incident_date=datetime.date(2025, 3, 5))
+        self.assertEqual(case.area_id, kilimani.pk)
+        self.assertEqual(
+            self.cells(), {("Kilimani", "2025-03-03"): 1, ("Nairobi", "2025-03-03"): 1},
+        )
+
+    def test_complainant_area_follows_place_fields(self):
+        complainant = Complainant.objects.create(first_name="Jane", county="Nairobi", sub_county="Westlands")
+        self.assertEqual(complainant.area_id, self.westlands.pk)
+
+        complainant.statement = "Updated"
+        with CaptureQueriesContext(connection) as queries:
+            complainant.save(update_fields=["statement"])
+        update = next(query["sql"] for query in queries if query["sql"].startswith('UPDATE "cases_complainant"'))
+        self.assertNotIn('"area_id"', update)
+
+        complainant.county, complainant.sub_county = "Kisumu", "Central"
+        complainant.save(update_fields=["county", "sub_county"])
+        complainant.refresh_from_db()
+        self.assertEqual(complainant.area_id, self.kisumu_central.pk)
+
+    def test_grid_follows_case_writes(self):
+        case = Case.objects.create(
+            title="Break-in", case_type="BURGLARY", location="Westlands, Nairobi",
+            incident_date=datetime.date(2026, 10, 14),
+        )
+        self.assertEqual(case.area, self.westlands)
+        self.assertEqual(self.cells(), {("Westlands", "2026-10-12"): 1, ("Nairobi", "2026-10-12"): 1})
+
+        case.location = "Kisumu Central, Kisumu"
+        case.save()
+        self.assertEqual(self.cells(), {("Central", "2026-10-12"): 1, ("Kisumu", "2026-10-12"): 1})
+        incremental = self.cells()
+        HotspotCell.rebuild()
+        self.assertEqual(self.cells(), incremental)
+
+        case.deleted = True
+        case.save()
+        self.assertEqual(self.cells(), {})
+
+    def test_hotspot_endpoint(self):
+        user = User.objects.create_user("officer", password="pw")
+        Userprofile.objects.create(user=user, id_number="ID1", user_role="police")
+        self.client.force_login(user)
+        for case_type in ("BURGLARY", "BURGLARY", "THEFT"):
+            Case.objects.create(
+                title="Case", case_type=case_type, location="Westlands", incident_date=datetime.date(2026, 10, 14),
+            )
+
+        response = self.client.get(reverse("cases:hotspots"), {
+            "level": "sub_county", "case_type": "BURGLARY", "weeks": 2, "until": "2026-10-18",
+        })
+        self.assertEqual(response.json(), {
+            "level": "sub_county",
+            "weeks": ["2026-10-05", "2026-10-12"],
+            "areas": {str(self.westlands.pk): "Westlands"},
+            "cells": [[self.westlands.pk, "BURGLARY", "2026-10-12", 2]],
+        })
+        self.assertEqual(self.client.get(reverse("cases:hotspots"), {"level": "planet"}).status_code, 400)
+
+    def test_backfill_matches_existing_records(self):
+        case = Case.objects.create(title="Theft", location="Kilimani", incident_date=datetime.date(2026, 10, 14))
+        complainant = Complainant.objects.create(first_name="Jane", county="Nairobi", sub_county="Kilimani")
+        self.assertIsNone(case.area)
+        kilimani = gazetteer.ensure("Nairobi", "Kilimani")
+
+        call_command("backfill_locations", stdout=open("/dev/null", "w"))
+        self.assertEqual(Case.objects.get(pk=case.pk).area, kilimani)
+        self.assertEqual(Complainant.objects.get(pk=complainant.pk).area, kilimani)
+        self.assertEqual(self.cells(), {("Kilimani", "2026-10-12"): 1, ("Nairobi", "2026-10-12"): 1})
+
+
+class DuplicateDetectionTests(TestCase):
+    def members(self):
+        return [
+            (cluster.status, sorted((member.kind, member.person_id) for member in cluster.members.all()))
+            for cluster in DuplicateCluster.objects.order_by('pk')
+        ]
+
+    def test_normalisation(self):
+        self.assertEqual(dedupe.normalise_id(" 0012-3456 78"), "12345678")
+        self.assertIsNone(dedupe.normalise_id("0000"))
+        self.assertEqual(dedupe.phones("+254 712 345678 / 0722-111222"), {"712345678", "722111222"})
+        self.assertEqual(dedupe.soundex("Robert"), dedupe.soundex("Rupert"))
+        self.assertEqual(dedupe.soundex("Ashcraft"), "A261")
+
+    def test_clusters_are_refreshed_incrementally(self):
+        complainant = Complainant.objects.create(
+            first_name="John", last_name="Otieno", id_number="12345678", phone_number="0712345678",
+        )
+        suspect = Suspect.objects.create(name="Otieno John", national_id="12-345-678")
+        witness = Witness.objects.create(name="Jon Otieno", contact_info="+254 712 345678")
+        Suspect.objects.create(name="Mary Wanjiku", national_id="87654321")
+        people = [("complainant", complainant.pk), ("suspect", suspect.pk), ("witness", witness.pk)]
+
+        result = dedupe.refresh(workers=1)
+        self.assertEqual((result['people'], result['clusters']), (4, 1))
+        self.assertEqual(self.members(), [("pending", people)])
+
+        # A reviewed cluster stays as it is while its members do not change
+        DuplicateCluster.objects.update(status='different')
+        self.assertEqual(dedupe.refresh(workers=1)['people'], 0)
+        dedupe.refresh(full=True, workers=1)
+        self.assertEqual(self.members(), [("different", people)])
+
+        # Only the new record is keyed, and the grown cluster is reviewed again
+        late = Witness.objects.create(name="John Otieno", national_id="0012345678")
+        result = dedupe.refresh(workers=1)
+        self.assertEqual((result['people'], result['clusters']), (1, 1))
+        self.assertEqual(self.members(), [("pending", sorted(people + [("witness", late.pk)]))])
+
+        late.delete()
+        self.assertEqual(self.members(), [("pending", people)])
+
+
+class SearchIndexTests(TestCase):
+    def setUp(self):
+        if not search.is_supported():
+            self.skipTest("No full-text index on this database")
+        self.complainant = Complainant.objects.create(first_name="Wanjiru", last_name="Kamau")
+        self.case = Case.objects.create(
+            title="Stolen motorbike", description="Taken from the market", location="Githurai",
+            complainant=self.complainant,
+        )
+
+    def found(self, query, **filters):
+        cases, total = search.search(query, **filters)
+        return [case.pk for case in cases], total
+
+    def test_index_follows_case_writes(self):
+        self.assertEqual(self.found("motorbike"), ([self.case.pk], 1))
+        self.assertEqual(self.found("wanjiru githurai"), ([self.case.pk], 1))
+        self.assertEqual(self.found(self.case.case_number), ([self.case.pk], 1))
+        self.assertEqual(self.found("motorbike", status="closed"), ([], 0))
+
+        self.case.title = "Stolen bicycle"
+        self.case.save()
+        self.assertEqual(self.found("motorbike"), ([], 0))
+        self.assertEqual(self.found("bicyc"), ([self.case.pk], 1))
+
+        # Renaming the complainant reindexes their cases
+        self.complainant.first_name = "Njeri"
+        self.complainant.save()
+        self.assertEqual(self.found("wanjiru"), ([], 0))
+        self.assertEqual(self.found("njeri"), ([self.case.pk], 1))
+
+    def test_deleted_cases_are_not_found(self):
+        self.case.deleted = True
+        self.case.save()
+        self.assertEqual(self.found("motorbike"), ([], 0))
+        self.case.deleted = False
+        self.case.save()
+        self.assertEqual(self.found("motorbike"), ([self.case.pk], 1))
+
+        Case.all_with_deleted.filter(pk=self.case.pk).get().delete()
+        self.assertEqual(self.found("motorbike"), ([], 0))
+
+    def test_search_page_falls_back_to_orm_filters(self):
+        other = Case.objects.create(title="Lost phone", location="Githurai")
+        with mock.patch.object(search, "search") as indexed, mock.patch.object(search, "is_supported", return_value=False):
+            response = self.client.get(reverse("cases:search_cases"), {"query": "githurai"})
+        indexed.assert_not_called()
+        self.assertEqual({case.pk for case in response.context["cases"]}, {self.case.pk, other.pk})
+        self.assertEqual(response.context["total_results"], 2)
+
+
+class StatisticsRollupTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.case = Case.objects.create(title="Assault", case_type="ASSAULT", report_date=datetime.date(2025, 3, 4))
+        self.other = Case.objects.create(title="Theft", case_type="THEFT", report_date=datetime.date(2025, 4, 1))
+        self.suspects = [Suspect.objects.create(name=f"Suspect {n}") for n in range(3)]
+        self.witness = Witness.objects.create(name="Witness")
+
+    def buckets(self):
+        return sorted(CaseStatisticsRollup.objects.exclude(
+            case_count=0, suspect_count=0, witness_count=0,
+        ).values_list("status", "case_type", "report_month", "case_count", "suspect_count", "witness_count"))
+
+    def assertMatchesRebuild(self):
+        incremental = self.buckets()
+        CaseStatisticsRollup.rebuild()
+        self.assertEqual(incremental, self.buckets())
+
+    def test_rollup_follows_every_write(self):
+        self.case.suspects.add(*self.suspects)
+        self.suspects[0].cases.add(self.other)
+        self.witness.cases.add(self.case, self.other)
+        self.assertMatchesRebuild()
+
+        self.case.status, self.case.case_type = "closed", "THEFT"
+        self.case.save()
+        self.assertMatchesRebuild()
+
+        self.case.suspects.remove(self.suspects[1])
+        self.suspects[2].cases.clear()
+        self.assertMatchesRebuild()
+
+        self.other.witnesses.clear()
+        self.other.deleted = True
+        self.other.save()
+        self.assertMatchesRebuild()
+
+        self.other.deleted = False
+        self.other.save()
+        self.assertMatchesRebuild()
+
+        self.case.delete()
+        self.assertMatchesRebuild()
+
+    def test_statistics_page_counts_people_once(self):
+        user = User.objects.create_user("officer", password="pw")
+        Userprofile.objects.create(user=user, id_number="ID1", user_role="police")
+        self.client.force_login(user)
+        self.suspects[0].cases.add(self.case, self.other)
+
+        response = self.client.get(reverse("cases:statistics"))
+        self.assertEqual(response.context["number_of_cases"], 2)
+        self.assertEqual(response.context["number_of_suspects"], 3)
+        self.assertEqual(response.context["number_of_witnesses"], 1)
+
+        Witness.objects.create(name="Second witness")
+        self.suspects[2].delete()
+        response = self.client.get(reverse("cases:statistics"))
+        self.assertEqual(response.context["number_of_suspects"], 2)
+        self.assertEqual(response.context["number_of_witnesses"], 2)
+
+
+class CasePdfTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        settings_override = override_settings(MEDIA_ROOT=media)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        # Renders run on a thread here instead of a worker process
+        executor = ThreadPoolExecutor(max_workers=2)
+        self.addCleanup(executor.shutdown)
+        for patcher in (
+            mock.patch.object(pdf, "_executor", executor),
+            mock.patch.object(pdf, "_render_pdf", side_effect=self.render),
+        ):
+            self.renderer = patcher.start()
+            self.addCleanup(patcher.stop)
+        self.gate = threading.Event()
+        self.gate.set()
+        self.failing = False
+
+        user = User.objects.create_user("admin", password="pw")
+        Userprofile.objects.create(user=user, id_number="ID1", user_role="admin")
+        self.client.force_login(user)
+        self.case = Case.objects.create(title="Robbery", complainant=Complainant.objects.create(first_name="Jane"))
+        self.url = reverse("cases:case_pdf", args=[self.case.uuid])
+
+    def render(self, html, base_url):
+        self.gate.wait(5)
+        if self.failing:
+            raise RuntimeError("renderer crashed")
+        return b"%PDF-1.4 test"
+
+    def settle(self):
+        deadline = time.monotonic() + 5
+        while pdf._pending and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(pdf._pending, {})
+
+    def test_report_is_rendered_once_then_served_from_cache(self):
+        self.gate.clear()
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, 202)
+        self.assertEqual(first["Retry-After"], "3")
+        self.assertEqual(self.client.get(self.url).status_code, 202)
+        self.gate.set()
+        self.settle()
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response), b"%PDF-1.4 test")
+        self.assertEqual(self.renderer.call_count, 1)
+
+        cached = self.client.get(self.url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(cached.status_code, 304)
+
+        # An edit gives a new version, which is rendered again
+        self.case.title = "Armed robbery"
+        self.case.save()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 202)
+        self.settle()
+        self.assertEqual(self.renderer.call_count, 2)
+
+    def test_concurrent_requests_share_one_render(self):
+        self.gate.clear()
+        version = pdf.case_pdf_version(self.case)
+        futures = []
+
+        def slow_template(*args, **kwargs):
+            time.sleep(0.05)
+            return "<html></html>"
+
+        with mock.patch.object(pdf, "render_to_string", side_effect=slow_template):
+            threads = [
+                threading.Thread(target=lambda: futures.append(pdf.render_async(self.case, version, "http://testserver/")))
+                for _ in range(4)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.gate.set()
+        self.settle()
+
+        self.assertEqual(len({id(future) for future in futures}), 1)
+        self.assertEqual(self.renderer.call_count, 1)
+
+    def test_failed_render_is_reported_then_retried(self):
+        self.failing = True
+        with self.assertLogs("cases.pdf", "ERROR"):
+            self.assertEqual(self.client.get(self.url).status_code, 202)
+            self.settle()
+
+        self.assertEqual(self.client.get(self.url).status_code, 500)
+        # Reported once; the next poll queues a new render
+        self.failing = False
+        self.assertEqual(self.client.get(self.url).status_code, 202)
+        self.settle()
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+
+class ReportExportTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("admin", password="pw")
+        Userprofile.objects.create(user=self.user, id_number="ID1", user_role="admin")
+        self.client.force_login(self.user)
+        Case.objects.create(title="Robbery")
+
+    def export(self):
+        return self.client.post(reverse("cases:export_reports"), {"scope": "all"})
+
+    def test_one_export_at_a_time_until_closed(self):
+        running = self.export()
+        self.assertEqual(running.status_code, 200)
+        self.assertEqual(running["Content-Type"], "application/zip")
+
+        refused = self.export()
+        self.assertRedirects(refused, reverse("cases:reports") + "?q=", fetch_redirect_response=False)
+
+        # Closed without a byte read, as when the client goes away
+        running.close()
+        second = self.export()
+        self.assertEqual(second.status_code, 200)
+        second.close()
+
+    def test_slot_is_shared_between_processes(self):
+        # An export running in another worker process
+        DatabaseCache("shared_cache", {}).add(f"case_pdf_exports:{self.user.pk}:0", True)
+        refused = self.export()
+        self.assertEqual(refused.status_code, 302)
+
+        with mock.patch.object(pdf, "EXPORTS_PER_USER", 2):
+            running = self.export()
+        self.assertEqual(running.status_code, 200)
+        running.close()
+        self.assertIsNone(DatabaseCache("shared_cache", {}).get(f"case_pdf_exports:{self.user.pk}:1"))
+
+
+class GenerateDatasetTests(TestCase):
+    def test_small_dataset(self):
+        call_command(
+            "generate_dataset", cases=30, batch_size=12, officers=2, seed=1, years=1, stdout=open("/dev/null", "w"),
+        )
+        self.assertEqual(Case.objects.count(), 30)
+        self.assertEqual(Complainant.objects.count(), 30)
+        self.assertEqual(len(set(Case.objects.values_list("case_number", flat=True))), 30)
+        self.assertFalse(Case.objects.filter(area__isnull=True).exists())
+
+        # Derived tables are rebuilt after the bulk inserts
+        self.assertEqual(
+            CaseStatisticsRollup.objects.aggregate(total=Sum("case_count"))["total"], 30,
+        )
+        self.assertEqual(
+            HotspotCell.objects.filter(level="county").aggregate(total=Sum("case_count"))["total"], 30,
+        )
+        if search.is_supported():
+            case = Case.objects.first()
+            self.assertIn(case, search.search(case.case_number)[0])
+
+    def test_nothing_is_dated_in_the_future(self):
+        call_command("generate_dataset", cases=40, officers=1, seed=2, years=1, stdout=open(os.devnull, "w"))
+        now = timezone.now()
+        self.assertTrue(CourtDecision.objects.exists())
+        self.assertFalse(CourtDecision.objects.filter(decision_date__gt=now).exists())
+        self.assertFalse(Case.objects.filter(created_at__gt=now).exists())
+        self.assertFalse(Case.objects.filter(court_date__gt=now.date()).exists())
+
+
+class ImportOccurrencesTests(TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, "records.ndjson")
+
+    def record(self, title, case_number="", **case):
+        return {
+            "complainant": {"first_name": title, "id_number": case.pop("id_number", "")},
+            "case": {"title": title, "case_type": "THEFT", "status": "open", "report_date": "2025-03-01",
+                     "case_number": case_number, **case},
+            "suspects": [{"name": f"{title} suspect"}],
+            "witnesses": [],
+        }
+
+    def run_import(self, records, **options):
+        with open(self.path, "w") as records_file:
+            records_file.writelines(json.dumps(record) + "\n" for record in records)
+        call_command("import_occurrences", self.path, batch_size=2, stdout=open(os.devnull, "w"), **options)
+
+    def rejected(self):
+        with open(f"{self.path}.errors.ndjson") as errors:
+            return {entry["record"]: entry["errors"] for entry in map(json.loads, errors)}
+
+    def test_invalid_and_duplicate_records_are_rejected(self):
+        Complainant.objects.create(first_name="Existing", id_number="111")
+        self.run_import([
+            self.record("Good", id_number="222"),
+            self.record(""),
+            self.record("Bad date", report_date="yesterday"),
+            self.record("Taken id", id_number="111"),
+            self.record("Repeated id", id_number="222"),
+        ])
+
+        self.assertEqual(list(Case.objects.values_list("title", flat=True)), ["Good"])
+        rejected = self.rejected()
+        self.assertEqual(set(rejected), {1, 2, 3, 4})
+        self.assertIn("case", rejected[1])
+        self.assertIn("case.report_date", rejected[2])
+        self.assertEqual(rejected[3], {"complainant.id_number": ["Already exists."]})
+        self.assertEqual(rejected[4], {"complainant.id_number": ["Already exists."]})
+        self.assertEqual(Case.objects.get().suspects.count(), 1)
+
+    def test_malformed_records_are_rejected_one_at_a_time(self):
+        with open(self.path, "wb") as records_file:
+            records_file.write(b"\n".join([
+                json.dumps(self.record("First")).encode(),
+                b'{"case": {"title": "Cut off"',
+                b"[1, 2]",
+                json.dumps({**self.record("Bad people"), "suspects": ["name"]}).encode(),
+                b'{"case": {"title": "Latin-1 \xe9"}}',
+                json.dumps(self.record("Long number", case_number="X" * 51)).encode(),
+                json.dumps(self.record("Last")).encode(),
+            ]) + b"\n")
+        call_command("import_occurrences", self.path, batch_size=2, stdout=open(os.devnull, "w"))
+
+        self.assertEqual(sorted(Case.objects.values_list("title", flat=True)), ["First", "Last"])
+        rejected = self.rejected()
+        self.assertEqual(set(rejected), {1, 2, 3, 4, 5})
+        self.assertIn("record", rejected[1])
+        self.assertEqual(rejected[2], {"record": ["Expected a JSON object."]})
+        self.assertEqual(rejected[3], {"suspects": ["Expected a list of JSON objects."]})
+        self.assertIn("record", rejected[4])
+        self.assertEqual(list(rejected[5]), ["case.case_number"])
+        with open(f"{self.path}.checkpoint") as checkpoint:
+            self.assertEqual(json.load(checkpoint), {"records": 7})
+
+    def test_checkpoint_resumes_after_last_batch(self):
+        records = [self.record(f"Case {n}") for n in range(5)]
+        with open(f"{self.path}.checkpoint", "w") as checkpoint:
+            json.dump({"records": 2}, checkpoint)
+
+        self.run_import(records)
+        self.assertEqual(
+            sorted(Case.objects.values_list("title", flat=True)), ["Case 2", "Case 3", "Case 4"],
+        )
+        with open(f"{self.path}.checkpoint") as checkpoint:
+            self.assertEqual(json.load(checkpoint), {"records": 5})
+
+        # A finished import has nothing left to do, unless restarted
+        self.run_import(records)
+        self.assertEqual(Case.objects.count(), 3)
+        self.run_import(records, restart=True)
+        self.assertEqual(Case.objects.count(), 8)
+
+    def test_explicit_numbers_move_the_sequence(self):
+        self.run_import([
+            self.record("Allocated"),
+            self.record("Explicit", case_number="20250301-0005"),
+            self.record("Legacy", case_number="OB/77/2025"),
+            self.record("Repeated", case_number="20250301-0005"),
+            self.record("Allocated too"),
+        ])
+
+        numbers = dict(Case.objects.values_list("title", "case_number"))
+        self.assertEqual(numbers, {
+            "Allocated": "20250301-0006",
+            "Explicit": "20250301-0005",
+            "Legacy": "OB/77/2025",
+            "Allocated too": "20250301-0007",
+        })
+        self.assertEqual(self.rejected(), {3: {"case.case_number": ["Already exists."]}})
+        self.assertEqual(CaseNumberSequence.allocate(day=datetime.date(2025, 3, 1)), ["20250301-0008"])
+
+
+class CaseExportTests(TestCase):
+    def setUp(self):
+        self.users = {}
+        for role in ("police", "court", "admin"):
+            self.users[role] = User.objects.create_user(role)
+            Userprofile.objects.create(user=self.users[role], id_number=role, user_role=role)
+
+        complainant = Complainant.objects.create(
+            first_name="Jane", last_name="Doe", id_number="12345678", phone_number="0700000000",
+        )
+        self.case = Case.objects.create(title="Stolen bicycle", complainant=complainant, case_type="THEFT")
+        self.case.suspects.add(Suspect.objects.create(name="Suspect"))
+        self.gone = Case.objects.create(title="Deleted theft", complainant=complainant, deleted=True)
+
+    def export(self, role, **params):
+        self.client.force_login(self.users[role])
+        response = self.client.get(reverse("cases:export_cases"), params)
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content).decode()
+
+    def test_csv_content(self):
+        rows = list(csv.DictReader(io.StringIO(self.export("court", format="csv"))))
+
+        self.assertEqual(len(rows), 1)
+        row = rows[0]
+        self.assertEqual(row["case_number"], self.case.case_number)
+        self.assertEqual(row["title"], "Stolen bicycle")
+        self.assertEqual(row["complainant_id_number"], "12345678")
+        self.assertEqual(row["complainant_phone_number"], "0700000000")
+        self.assertEqual(row["suspect_count"], "1")
+
+    def test_personal_columns_follow_role(self):
+        police = list(csv.DictReader(io.StringIO(self.export("police"))))
+        self.assertNotIn("complainant_id_number", police[0])
+        self.assertNotIn("complainant_phone_number", police[0])
+        self.assertEqual(police[0]["complainant_first_name"], "Jane")
+
+        line = json.loads(self.export("police", format="ndjson").splitlines()[0])
+        self.assertNotIn("complainant_id_number", line)
+        self.assertNotIn("complainant_phone_number", line)
+
+    def test_deleted_cases_only_for_admins(self):
+        self.assertEqual(len(self.export("admin", format="ndjson").splitlines()), 2)
+        self.assertEqual(len(self.export("admin", format="ndjson", deleted="0").splitlines()), 1)
+        self.assertEqual(len(self.export("court", format="ndjson").splitlines()), 1)
+
+    def test_requires_login(self):
+        response = self.client.get(reverse("cases:export_cases"))
+        self.assertEqual(response.status_code, 302)
 
-# Create your tests here.
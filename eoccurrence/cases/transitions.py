@@ -0,0 +1,177 @@
+"""
+Case status and suspect bail status changes that follow court outcomes.
+
+Court decisions move a case between statuses and suspect rulings set a
+suspect's bail status. Both are applied with a single conditional UPDATE of
+the changed columns instead of a full save(), inside the caller's
+transaction, and keep the statistics rollup, counts, listing caches,
+suspect/witness case summaries and case history in step the way Case.save
+and its signals would.
+"""
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from core import counts
+
+from .models import Case, CaseEvent, CaseStatisticsRollup, Suspect, Witness, refresh_case_summaries
+
+# Statuses a court decision can move a case to, from each status that accepts one
+CASE_TRANSITIONS = {
+    'open': {'in_court', 'closed', 'dismissed'},
+    'in_court': {'in_court', 'closed', 'dismissed'},
+}
+
+# The case status each CourtDecision.decision_type leads to
+DECISION_STATUS = {
+    'CLOSED': 'closed',
+    'DISMISSED': 'dismissed',
+    'ADJOURNED': 'in_court',
+    'TRANSFERRED': 'in_court',
+    'OTHER': 'in_court',
+}
+
+# The bail status each SuspectCourtRuling.ruling_type leaves the suspect with
+RULING_BAIL_STATUS = {'bail_granted': 'granted', 'bail_denied': 'denied'}
+
+
+class InvalidTransition(Exception):
+    pass
+
+
+def accepts_court_outcome(case):
+    """Whether court decisions and suspect rulings may be recorded against the case."""
+    return case.status in CASE_TRANSITIONS
+
+
+def _sources(status):
+    return [source for source, targets in CASE_TRANSITIONS.items() if status in targets]
+
+
+def _changes(status):
+    changes = {'status': status, 'updated_at': timezone.now()}
+    if status == 'closed':
+        changes['court_date'] = Coalesce('court_date', Value(timezone.now().date()))
+    return changes
+
+
+def _moved(cases, status):
+    """
+    Side effects of moving ``cases`` ([(pk, rollup key before)]) to ``status``
+    behind the Case signals' back. The search document has no status in it,
+    so the index is left alone.
+    """
+    ids = [pk for pk, _ in cases]
+    links = {}
+    for through, field in ((Case.suspects.through, 'suspect'), (Case.witnesses.through, 'witness')):
+        rows = through.objects.filter(case_id__in=ids).values_list('case_id').annotate(n=Count('id')).order_by()
+        links[field] = dict(rows)
+
+    buckets = Counter()
+    for pk, key in cases:
+        if key is None:
+            continue
+        moved = Counter({'cases': 1, 'suspects': links['suspect'].get(pk, 0),
+                         'witnesses': links['witness'].get(pk, 0)})
+        for counter, n in moved.items():
+            buckets[key, counter] -= n
+            buckets[(status, *key[1:]), counter] += n
+
+    for key in {key for key, _ in buckets}:
+        CaseStatisticsRollup.adjust(key, **{
+            counter: buckets[key, counter] for counter in ('cases', 'suspects', 'witnesses')
+        })
+
+    refresh_case_summaries(
+        Suspect, Case.suspects.through.objects.filter(case_id__in=ids).values_list('suspect_id', flat=True),
+    )
+    refresh_case_summaries(
+        Witness, Case.witnesses.through.objects.filter(case_id__in=ids).values_list('witness_id', flat=True),
+    )
+    counts.invalidate(Case)
+
+
+def transition_case(case, status, also_from=(), actor_id=None):
+    """
+    Move ``case`` to ``status`` if its current status allows it, updating
+    the instance to match. ``also_from`` adds source statuses, for correcting
+    the decision that led to the current one. Raises InvalidTransition when
+    the move is not allowed or the case changed status since it was loaded.
+    Returns whether a row was written.
+    """
+    if case.status not in _sources(status) and case.status not in also_from:
+        raise InvalidTransition(
+            f"Case {case.case_number} is {case.get_status_display().lower()} and cannot become {status}."
+        )
+    if case.status == status:
+        return False
+
+    changes = _changes(status)
+    old_key = case.rollup_key()
+    with transaction.atomic():
+        if not Case.all_with_deleted.filter(pk=case.pk, status=case.status).update(**changes):
+            raise InvalidTransition(f"Case {case.case_number} changed while the court outcome was recorded.")
+        _moved([(case.pk, old_key)], status)
+        CaseEvent.status_changed(case.pk, case.status, status, actor_id).save()
+
+    case.status = status
+    case.updated_at = changes['updated_at']
+    if status == 'closed' and not case.court_date:
+        case.court_date = changes['updated_at'].date()
+    # What Case.save and the summary signal compare against on the next save
+    case._loaded_rollup_key = case.rollup_key()
+    case._loaded_summary = (case.case_number, case.status)
+    return True
+
+
+def transition_cases(queryset, status, actor_id=None):
+    """
+    Move every case in ``queryset`` whose status allows it to ``status``,
+    with one UPDATE for all of them. Cases that cannot make the move are left
+    as they are. Returns the number of cases moved.
+    """
+    if not _sources(status):
+        raise InvalidTransition(f"No case can be moved to {status}.")
+    sources = [source for source in _sources(status) if source != status]
+
+    with transaction.atomic():
+        rows = list(queryset.filter(status__in=sources).select_for_update().values_list(
+            'pk', 'status', 'case_type', 'report_date', 'deleted',
+        ))
+        if not rows:
+            return 0
+        cases = [
+            (pk, Case(status=old, case_type=case_type, report_date=report_date, deleted=deleted).rollup_key())
+            for pk, old, case_type, report_date, deleted in rows
+        ]
+        Case.all_with_deleted.filter(pk__in=[pk for pk, _ in cases]).update(**_changes(status))
+        _moved(cases, status)
+        CaseEvent.objects.bulk_create([
+            CaseEvent.status_changed(pk, old, status, actor_id) for pk, old, *_ in rows
+        ], batch_size=1000)
+    return len(cases)
+
+
+def apply_court_decision(case, decision_type, previous=None, actor_id=None):
+    """
+    Move the case to the status ``decision_type`` leads to. ``previous`` is
+    the decision's type before an edit; the status it led to is then
+    accepted as a starting point too.
+    """
+    also_from = [DECISION_STATUS[previous]] if previous in DECISION_STATUS else []
+    return transition_case(case, DECISION_STATUS.get(decision_type, 'in_court'), also_from, actor_id)
+
+
+def apply_ruling(suspect, ruling_type):
+    """Set the bail status a ruling leaves the suspect with. Returns whether a row was written."""
+    bail_status = RULING_BAIL_STATUS.get(ruling_type, 'not_applicable')
+    if suspect.bail_status == bail_status:
+        return False
+
+    updated_at = timezone.now()
+    Suspect.objects.filter(pk=suspect.pk).update(bail_status=bail_status, updated_at=updated_at)
+    suspect.bail_status, suspect.updated_at = bail_status, updated_at
+    return True
@@ -21,8 +21,11 @@ urlpatterns = [
     path("suspects/", views.suspect_list, name="suspect_list"),
     path("witnesses/", views.witness_list, name="witness_list"),
     path("statistics/", views.statistics, name="statistics"),
+    path("statistics/hotspots/", views.hotspots, name="hotspots"),
     path('case/<uuid:uuid>/pdf/', views.case_pdf_view, name='case_pdf'),
     path('reports/', views.reports, name='reports'),
+    path('reports/export/', views.export_reports, name='export_reports'),
+    path('export/', views.export_cases, name='export_cases'),
     path('case/<uuid:case_uuid>/delete/', views.delete_case, name='delete_case'),
     path("court-rulings/", views.court_rulings_list, name="court_rulings_list"),
     path("court-rulings/<uuid:uuid>/", views.court_ruling_detail, name="court_ruling_detail"),
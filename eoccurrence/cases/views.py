@@ -1,26 +1,41 @@
 from django.shortcuts import render, redirect
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
 
 from django.shortcuts import get_object_or_404
 from django.contrib import messages
+from django.db import transaction
 from django.db.models import Q
 from django.db.models.functions import Concat
-from django.db.models import CharField, Value
-from django.core.paginator import Paginator
+from django.db.models import CharField, Value, Sum
 import datetime
+import uuid as uuid_lib
 from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
 
-from django.http import HttpResponse
-from django.template.loader import render_to_string
-from weasyprint import HTML
+from django.http import HttpResponse, HttpResponseNotModified, JsonResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.dateparse import parse_date
+from django.utils.http import urlencode
+from django.views.decorators.http import require_POST
 
 from .forms import ComplainantForm, CaseForm, WitnessForm,  SuspectForm, CourtDecisionForm, SuspectCourtRulingForm, CaseForm
-from .models import Complainant, Case, Suspect, Witness, CourtDecision, SuspectCourtRuling
+from .models import Area, ArchivedCase, Complainant, Case, CaseEvent, HotspotCell, Suspect, Witness, CourtDecision, SuspectCourtRuling, CaseStatisticsRollup
+from . import export, pdf, search, transitions
+from .listing import listing_cache_context
+from .filters import report_cases, search_filter, visible_archived_cases, visible_cases
+from .graph import RELATED, CaseGraph
 
 from accounts.decorators import login_required_with_message
+from core import counts
+from core.pagination import CursorPaginator
 
 from accounts.models import Userprofile
 
+PDF_RETRY_AFTER = 3  # Seconds between polls while a report is rendering
+EXPORT_MAX_CASES = getattr(settings, 'CASE_PDF_EXPORT_MAX_CASES', 100)  # Reports per bulk export
+HOTSPOT_MAX_WEEKS = 104  # Longest range the hotspot map asks for at once
+
 @login_required_with_message
 def complainant_entry(request):
     if request.method == 'POST':
@@ -43,7 +58,7 @@ def case_entry(request, uuid):
             case = form.save(commit=False)
             case.complainant = complainant
             case.recorded_by = request.user
-            case.save()
+            case.save(actor=request.user)
 
             name = complainant.first_name
             if complainant.last_name:
@@ -61,29 +76,27 @@ def case_entry(request, uuid):
     })
 
 def view_cases(request):
-    if request.user.is_authenticated and request.user.profile.user_role == 'admin':
-        qs = Case.objects.all().filter().order_by('-created_at')
-    else:
-        qs = Case.objects.all().filter(deleted=False).order_by('-created_at')
-
-    total_results = qs.count()
+    qs = visible_cases(request.principal).order_by('-created_at')
 
-    # Limit to 20 for performance
-    cases = qs[:20]
+    total_results = counts.count(qs)
 
-    # Let user know if results are capped
-    if total_results > 20:
-        messages.info(request, f"Showing only 20 of {total_results} cases. Please use search to refine results.")
+    # Keyset pagination, 20 per page. The page is only fetched when the
+    # cached listing fragment misses.
+    paginator = CursorPaginator(qs, 20, ordering=('-created_at', '-id'))
+    cursor = request.GET.get('cursor')
+    page_obj = SimpleLazyObject(lambda: paginator.get_page(cursor))
 
     return render(request, 'cases/view_cases.html', {
-        'cases': cases,
+        'cases': page_obj,
+        'page_obj': page_obj,
+        'paginated': True,
         'total_results': total_results,  # pass count to template
+        **listing_cache_context(request),
     })
 
 @login_required_with_message
 def edit_case(request, uuid):
-    user = request.user
-    case = get_object_or_404(Case, uuid=uuid)
+    case = get_object_or_404(Case.all_with_deleted, uuid=uuid)
     if case.deleted:
         messages.error(request, "This case has been deleted.")
         return redirect('cases:view_cases')
@@ -92,9 +105,18 @@ def edit_case(request, uuid):
     complainant = case.complainant
 
     if request.method == 'POST':
-        form = CaseForm(request.POST, instance=case, user=user)
+        form = CaseForm(request.POST, instance=case, principal=request.principal)
         if form.is_valid():
-            form.save()
+            # The edit and its history entries commit together
+            with transaction.atomic():
+                form.save(commit=False).save(actor=request.user)
+                # Status changes are recorded by Case.save
+                edited = [name for name in form.changed_data if name != 'status']
+                if edited:
+                    CaseEvent.record(
+                        case, 'updated', f"Edited {', '.join(edited).replace('_', ' ')}",
+                        actor_id=request.user.pk, fields=edited,
+                    )
             messages.success(request, f"Case {case.case_number} updated successfully.")
             return redirect('cases:case_details', uuid=case.uuid)
     else:
@@ -109,20 +131,17 @@ def edit_case(request, uuid):
 
 @login_required_with_message
 def case_details(request, uuid):
-    case = get_object_or_404(Case, uuid=uuid)
-    if case.deleted and not request.user.profile.user_role == 'admin':
+    graph = CaseGraph.get_or_404(parts=RELATED + ('events',), include_archived=True, uuid=uuid)
+    case = graph.case
+    if case.deleted and not request.principal.can_view_deleted:
         messages.error(request, f"Access denied. You do not have permission to view this case.")
         return redirect('cases:view_cases')
-    
-    witnesses = case.witnesses.all()
-    suspects = case.suspects.all()
-    court_decisions = case.court_decisions.all().order_by('decision_date')
-    
+
     return render(request, "cases/case_details.html", {
         "case": case,
-        "witnesses": witnesses,
-        "suspects": suspects,
-        "court_decisions": court_decisions
+        "archived": graph.archived,
+        "court_decisions": graph.court_decisions,
+        "timeline": graph.events,
     })
 
     
@@ -131,37 +150,27 @@ def search_cases(request):
     status = request.GET.get('status', '')
     recorded_by = request.GET.get('recorded_by', '')
 
-    cases = Case.objects.all().filter(deleted=False)
-
     result_name = "cases"
 
     if status:
-        cases = cases.filter(status=status)
         result_name = f"cases with status '{status}'"
 
     if recorded_by:
-        cases = cases.filter(recorded_by__username=recorded_by)
         result_name = f"cases recorded by '{recorded_by}"
 
     if query:
-        cases = cases.filter(
-            Q(case_number__icontains=query) |
-            Q(title__icontains=query) |
-            Q(description__icontains=query) |
-            Q(location__icontains=query) |
-            Q(complainant__first_name__icontains=query) |
-            Q(complainant__last_name__icontains=query)
-        )
         result_name = f"cases matching '{query}'"
 
-    total_results = cases.count()
-    cases = cases[:20]
-    messages.info(request, f"Found {total_results} {result_name}.")
-        
-    
-    
+    if query and search.is_supported():
+        # Ranked lookup through the full-text index, filters applied in the same query
+        cases, total_results = search.search(query, status=status, recorded_by=recorded_by, limit=20)
+    else:
+        cases = search_filter(Case.objects.all(), query, status, recorded_by)
 
-    total_results = cases.count()
+        total_results = counts.count(cases)
+        cases = cases[:20]
+
+    messages.info(request, f"Found {total_results} {result_name}.")
 
     return render(request, 'cases/search_cases.html', {
         'cases': cases,
@@ -169,6 +178,7 @@ def search_cases(request):
         'status': status,
         'recorded_by': recorded_by,
         'total_results': total_results,
+        **listing_cache_context(request),
     })
 
 @login_required_with_message
@@ -180,10 +190,15 @@ def witness_entry(request, uuid):
         if form.is_valid():
             witness = form.save(commit=False)
             witness.recorded_by = request.user
-            witness.save()
-            # Link witness to the case
-            case.witnesses.add(witness)
-            case.save()
+            with transaction.atomic():
+                witness.save()
+                # Link witness to the case
+                case.witnesses.add(witness)
+                case.save(actor=request.user)
+                CaseEvent.record(
+                    case, 'witness_added', f"Witness {witness.name} added",
+                    actor_id=request.user.pk, witness=str(witness.uuid),
+                )
 
             messages.success(request, "Witness statement added successfully.")
 
@@ -202,10 +217,15 @@ def suspect_entry(request, uuid):
         if form.is_valid():
             suspect = form.save(commit=False)
             suspect.recorded_by = request.user
-            suspect.save()
-            # Link suspect to the case
-            case.suspects.add(suspect)
-            case.save()
+            with transaction.atomic():
+                suspect.save()
+                # Link suspect to the case
+                case.suspects.add(suspect)
+                case.save(actor=request.user)
+                CaseEvent.record(
+                    case, 'suspect_added', f"Suspect {suspect.name} added",
+                    actor_id=request.user.pk, suspect=str(suspect.uuid),
+                )
 
             messages.success(request, "Suspect added successfully.")
 
@@ -217,15 +237,14 @@ def suspect_entry(request, uuid):
 
 @login_required_with_message
 def court_case_final(request, uuid):
-    case = get_object_or_404(Case, uuid=uuid)
-    user = request.user
+    case = CaseGraph.get_or_404(parts=(), uuid=uuid).case
     form_title = f"Court Decision for Case #{case.case_number}"
 
-    if user.is_authenticated and user.profile.user_role not in ['admin', 'court']:
+    if not request.principal.can_record_rulings:
         messages.error(request, "You do not have permission to record a court decision.")
         return redirect('cases:case_details', uuid=case.uuid)
 
-    if case.status not in ['pending', 'open', 'in_court']:
+    if not transitions.accepts_court_outcome(case):
         messages.error(request, "Court decision can only be recorded for in_court or open cases.")
         return redirect('cases:case_details', uuid=case.uuid)
     
@@ -233,11 +252,15 @@ def court_case_final(request, uuid):
     if request.method == 'POST':
         form = CourtDecisionForm(request.POST)
         if form.is_valid():
-            # Save court decision
+            # Save court decision; the case moves to the status it leads to
             decision = form.save(commit=False)
             decision.case = case
             decision.recorded_by = request.user
-            decision.save()
+            try:
+                decision.save()
+            except transitions.InvalidTransition as error:
+                messages.error(request, str(error))
+                return redirect('cases:case_details', uuid=case.uuid)
 
             messages.success(request, "Court decision recorded successfully.")
             return redirect('cases:case_details', uuid=case.uuid)
@@ -252,19 +275,25 @@ def court_case_final(request, uuid):
 
 @login_required_with_message
 def suspect_page(request, case_uuid, suspect_uuid):
-    case = get_object_or_404(Case, uuid=case_uuid)
-    suspect = get_object_or_404(Suspect, uuid=suspect_uuid, cases=case)
+    graph = CaseGraph.get_or_404(parts=("suspects",), include_archived=True, uuid=case_uuid)
+    case = graph.case
+    suspect = graph.suspect(suspect_uuid)
 
-    rulings = suspect.rulings.select_related("case").order_by("recorded_at")
+    # Prefetched in recorded_at order
+    rulings = suspect.archived_rulings.all() if graph.archived else suspect.rulings.all()
     return render(request, "cases/suspect_page.html", {
         "case": case,
         "suspect": suspect,
-        "rulings": rulings
+        "rulings": rulings,
+        "archived": graph.archived,
     })
 
 @login_required_with_message
 def complainant_page(request, case_uuid, complainant_uuid):
-    case = get_object_or_404(Case, uuid=case_uuid)
+    case = (
+        Case.all_with_deleted.filter(uuid=case_uuid).first()
+        or get_object_or_404(ArchivedCase, uuid=case_uuid)
+    )
     complainant = get_object_or_404(Complainant, uuid=complainant_uuid)
 
     return render(request, "cases/complainant_page.html", {
@@ -274,17 +303,16 @@ def complainant_page(request, case_uuid, complainant_uuid):
 
 @login_required_with_message
 def suspect_court_ruling_entry(request, uuid):
-    user = request.user
     suspect = get_object_or_404(Suspect, uuid=uuid)
     form_title = f"New Court Ruling for Suspect { suspect.name }"
     case = suspect.cases.first()  # Assuming suspect is linked to at least one case
 
-    if user.is_authenticated and user.profile.user_role not in ['admin', 'court']:
+    if not request.principal.can_record_rulings:
         messages.error(request, "You do not have permission to record a court decision.")
         return redirect("cases:suspect_page", case_uuid=case.uuid, suspect_uuid=suspect.uuid)
 
 
-    if case.status not in ['pending', 'open', 'in_court']:
+    if not transitions.accepts_court_outcome(case):
         messages.error(request, "Court ruling can only be recorded for in_court or open cases.")
         return redirect("cases:suspect_page", case_uuid=case.uuid, suspect_uuid=suspect.uuid)
     
@@ -295,7 +323,11 @@ def suspect_court_ruling_entry(request, uuid):
             ruling.suspect = suspect
             ruling.case = case
             ruling.recorded_by = request.user
-            ruling.save()
+            try:
+                ruling.save()
+            except transitions.InvalidTransition as error:
+                messages.error(request, str(error))
+                return redirect("cases:suspect_page", case_uuid=case.uuid, suspect_uuid=suspect.uuid)
 
             messages.success(request, "Court ruling added successfully.")
 
@@ -313,7 +345,7 @@ def suspect_court_ruling_entry(request, uuid):
 
 @login_required_with_message
 def edit_suspect_court_ruling(request, suspect_uuid, ruling_uuid):
-    case = get_object_or_404(Case, suspects__uuid=suspect_uuid)
+    case = get_object_or_404(Case.all_with_deleted, suspects__uuid=suspect_uuid)
     form_title = f"Edit Court Ruling for Suspect {{ suspect.name }}"
     suspect = get_object_or_404(Suspect, uuid=suspect_uuid)
     ruling = get_object_or_404(SuspectCourtRuling, uuid=ruling_uuid, suspect=suspect)
@@ -336,8 +368,9 @@ def edit_suspect_court_ruling(request, suspect_uuid, ruling_uuid):
 
 @login_required_with_message
 def witness_page(request, case_uuid, witness_uuid):
-    case = get_object_or_404(Case, uuid=case_uuid)
-    witness = get_object_or_404(Witness, uuid=witness_uuid)
+    graph = CaseGraph.get_or_404(parts=("witnesses",), include_archived=True, uuid=case_uuid)
+    case = graph.case
+    witness = graph.witness(witness_uuid)
 
     return render(request, "cases/witness_page.html", {
         "case": case,
@@ -346,98 +379,209 @@ def witness_page(request, case_uuid, witness_uuid):
 
 @login_required_with_message
 def suspect_list(request):
-    suspects = Suspect.objects.all().order_by("-statement_date")  # newest first
-    paginator = Paginator(suspects, 10)  # 10 per page
+    suspects = Suspect.objects.all()
+    paginator = CursorPaginator(suspects, 10, ordering=("-statement_date", "-id"))  # newest first, 10 per page
 
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
+    page_obj = paginator.get_page(request.GET.get("cursor"))
 
     return render(request, "cases/suspect_list.html", {"page_obj": page_obj})
 
 @login_required_with_message
 def witness_list(request):
-    witnesses = Witness.objects.all().order_by("-date_of_statement")
-    paginator = Paginator(witnesses, 10)
+    witnesses = Witness.objects.all()
+    paginator = CursorPaginator(witnesses, 10, ordering=("-date_of_statement", "-id"))
 
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
+    page_obj = paginator.get_page(request.GET.get("cursor"))
 
     return render(request, "cases/witness_list.html", {
         "page_obj": page_obj})
 
 @login_required_with_message
 def statistics(request):
-    cases = Case.objects.all().filter(deleted=False)
-    suspects = Suspect.objects.all()
-    witnesses = Witness.objects.all()
+    # One grouped read of the rollup table instead of a COUNT per figure
+    by_status = {
+        row["status"]: row
+        for row in CaseStatisticsRollup.objects.values("status").annotate(
+            cases=Sum("case_count"),
+        ).order_by()
+    }
 
-    open_cases = Case.objects.filter(status="open", deleted=False)
-    closed_cases = Case.objects.filter(status="closed", deleted=False)
-    dismissed_cases = Case.objects.filter(status="dismissed", deleted=False)
-    under_investigation = Case.objects.filter(status="under_investigation", deleted=False)
-    in_court = Case.objects.all().filter(status="in_court", deleted=False)
-    
+    def cases_with_status(status):
+        return by_status.get(status, {}).get("cases", 0)
 
     return render(request, "cases/statistics.html", {
-        "number_of_cases": cases.count(),
-        "number_of_suspects": suspects.count(),
-        "number_of_witnesses": witnesses.count(),
-        "number_of_open_cases": open_cases.count(),
-        "number_of_closed_cases": closed_cases.count(),
-        "number_of_dismissed_cases": dismissed_cases.count(),
-        "number_of_under_investigation": under_investigation.count(),
-        "number_of_in_court": in_court.count()
+        "number_of_cases": sum(row["cases"] for row in by_status.values()),
+        # People, not case links: someone on two cases counts once
+        "number_of_suspects": counts.count(Suspect.objects.all()),
+        "number_of_witnesses": counts.count(Witness.objects.all()),
+        "number_of_open_cases": cases_with_status("open"),
+        "number_of_closed_cases": cases_with_status("closed"),
+        "number_of_dismissed_cases": cases_with_status("dismissed"),
+        "number_of_under_investigation": cases_with_status("under_investigation"),
+        "number_of_in_court": cases_with_status("in_court")
+    })
+
+@login_required_with_message
+def hotspots(request):
+    """
+    Case counts per area, case type and week for the hotspot map, read from
+    the precomputed HotspotCell grid. Parameters: level (county, sub_county
+    or locality; default county), parent (an area id, to drill into its
+    children), case_type (repeatable), weeks (default 12) and until
+    (YYYY-MM-DD, default today), the last week shown.
+    """
+    level = request.GET.get('level', 'county')
+    if level not in dict(Area.LEVEL_CHOICES):
+        return JsonResponse({'error': f"Unknown level {level!r}."}, status=400)
+    try:
+        weeks = min(max(int(request.GET.get('weeks', 12)), 1), HOTSPOT_MAX_WEEKS)
+        parent = int(request.GET['parent']) if request.GET.get('parent') else None
+        until = parse_date(request.GET['until']) if request.GET.get('until') else timezone.localdate()
+    except ValueError:
+        until = None
+    if until is None:
+        return JsonResponse({'error': "weeks and parent must be numbers and until a YYYY-MM-DD date."}, status=400)
+
+    last = until - datetime.timedelta(days=until.weekday())
+    first = last - datetime.timedelta(weeks=weeks - 1)
+    cells = HotspotCell.objects.filter(level=level, week__range=(first, last), case_count__gt=0)
+    if parent:
+        cells = cells.filter(area__parent_id=parent)
+    if request.GET.getlist('case_type'):
+        cells = cells.filter(case_type__in=request.GET.getlist('case_type'))
+
+    areas, rows = {}, []
+    for area_id, name, case_type, week, count in cells.order_by('week').values_list(
+        'area_id', 'area__name', 'case_type', 'week', 'case_count',
+    ):
+        areas[area_id] = name
+        rows.append([area_id, case_type, week.isoformat(), count])
+    return JsonResponse({
+        'level': level,
+        'weeks': [(first + datetime.timedelta(weeks=n)).isoformat() for n in range(weeks)],
+        'areas': areas,
+        'cells': rows,
     })
 
 @login_required_with_message
 def case_pdf_view(request, uuid):
     from datetime import datetime
-    case = get_object_or_404(Case, uuid=uuid)
-    html_content = render_to_string('cases/case_pdf.html', {'case': case})
-    pdf_file = HTML(string=html_content, base_url=request.build_absolute_uri()).write_pdf()
-    
+    # Archived cases are looked up when no live case matches
+    case = (
+        visible_cases(request.principal).filter(uuid=uuid).first()
+        or get_object_or_404(visible_archived_cases(request.principal), uuid=uuid)
+    )
+
+    # Reports are cached per version and rendered outside the request
+    version = pdf.case_pdf_version(case)
+    etag = f'"{version}"'
+    if request.headers.get('If-None-Match') == etag:
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
+
+    pdf_file = pdf.cached_pdf(case, version)
+    if pdf_file is None and pdf.take_failure(case, version):
+        response = render(request, 'cases/case_pdf_pending.html', {'case': case, 'failed': True}, status=500)
+        response['Cache-Control'] = 'no-store'
+        return response
+    if pdf_file is None:
+        CaseGraph.prefetch([case])
+        pdf.render_async(case, version, request.build_absolute_uri())
+        response = render(request, 'cases/case_pdf_pending.html', {
+            'case': case,
+            'retry_after': PDF_RETRY_AFTER,
+        }, status=202)
+        response['Retry-After'] = str(PDF_RETRY_AFTER)
+        response['Location'] = request.get_full_path()
+        response['Cache-Control'] = 'no-store'
+        return response
+
     response = HttpResponse(pdf_file, content_type='application/pdf')
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     response['Content-Disposition'] = f'filename=case_report_{case.case_number}_{timestamp}.pdf'
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
     return response
 
 @login_required_with_message
 def reports(request):
     search_query = request.GET.get('q', '')
-    if request.user.profile.user_role == 'admin':
-        cases = Case.objects.all().filter().order_by('-created_at')
-    else:
-        cases = Case.objects.all().filter(deleted=False).order_by('-created_at')
-
-    # Search by case number, title, or complainant name
-    if search_query:
-        cases = cases.filter(
-            case_number__icontains=search_query
-        ) | cases.filter(
-            title__icontains=search_query
-        ) | cases.filter(
-            complainant__first_name__icontains=search_query
-        ) | cases.filter(
-            complainant__last_name__icontains=search_query
-        )
+    cases = report_cases(request.principal, search_query)
 
-    paginator = Paginator(cases, 10)  # 10 per page
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    paginator = CursorPaginator(cases, 10, ordering=('-created_at', '-id'))  # 10 per page
+    page_obj = paginator.get_page(request.GET.get('cursor'))
 
     context = {
         'cases': page_obj,
+        'total_cases': counts.count(cases),
         'search_query': search_query,
+        'export_max_cases': EXPORT_MAX_CASES,
     }
     return render(request, 'cases/reports.html', context)
 
+@login_required_with_message
+def export_cases(request):
+    # Same filters as the reports and search pages, streamed in full
+    fmt = request.GET.get('format', 'csv')
+    if fmt not in export.FORMATS:
+        fmt = 'csv'
+
+    cases = report_cases(request.principal, request.GET.get('q', ''))
+    cases = search_filter(
+        cases,
+        request.GET.get('query', '').strip(),
+        request.GET.get('status', ''),
+        request.GET.get('recorded_by', ''),
+    )
+    if request.GET.get('deleted') == '0':
+        cases = cases.filter(deleted=False)
+
+    # Complainant contact details stay with the roles that may view reports
+    rows = export.iter_export(cases, fmt, personal=request.principal.can_view_reports)
+    response = StreamingHttpResponse(rows, content_type=export.FORMATS[fmt])
+    timestamp = timezone.now().strftime("%Y%m%d_%H%M%S")
+    response['Content-Disposition'] = f'attachment; filename=cases_{timestamp}.{fmt}'
+    return response
+
+@login_required_with_message
+@require_POST
+def export_reports(request):
+    search_query = request.POST.get('q', '')
+    cases = report_cases(request.principal, search_query)
+
+    if request.POST.get('scope') != 'all':
+        selected = []
+        for value in request.POST.getlist('case'):
+            try:
+                selected.append(uuid_lib.UUID(value))
+            except ValueError:
+                pass
+        cases = cases.filter(uuid__in=selected)
+
+    cases = list(cases[:EXPORT_MAX_CASES])
+    if not cases:
+        messages.error(request, "Select at least one case to export.")
+        return redirect(f"{reverse('cases:reports')}?{urlencode({'q': search_query})}")
+
+    slot = pdf.acquire_export_slot(request.user)
+    if slot is None:
+        messages.error(request, "You already have a report export running. Please wait for it to finish.")
+        return redirect(f"{reverse('cases:reports')}?{urlencode({'q': search_query})}")
+
+    chunks = pdf.iter_reports_zip(cases, request.build_absolute_uri('/'))
+    response = StreamingHttpResponse(pdf.ExportStream(chunks, slot), content_type='application/zip')
+    timestamp = timezone.now().strftime("%Y%m%d_%H%M%S")
+    response['Content-Disposition'] = f'attachment; filename=case_reports_{timestamp}.zip'
+    return response
+
 @login_required_with_message
 def delete_case(request, case_uuid):
     case = get_object_or_404(Case, uuid=case_uuid)
     case.deleted = True
     case.deleted_at = timezone.now()
     case.deleted_by = request.user
-    case.save()
+    case.save(actor=request.user)
 
     messages.success(request, f"Case {case.case_number} deleted successfully.")
     return redirect("cases:view_cases")
@@ -480,9 +624,8 @@ def court_rulings_list(request):
             pass
 
     # Pagination
-    paginator = Paginator(decisions, 12)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
+    paginator = CursorPaginator(decisions, 12, ordering=("-decision_date", "-id"))
+    page_obj = paginator.get_page(request.GET.get("cursor"))
 
     context = {
         "page_obj": page_obj,
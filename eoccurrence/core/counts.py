@@ -0,0 +1,87 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.db import connections
+
+# Above this many rows a planner estimate is good enough for "Total: N" labels
+ESTIMATE_THRESHOLD = getattr(settings, 'COUNT_ESTIMATE_THRESHOLD', 100000)
+# Exact counts are cached per filter until the next write, or at most this long
+CACHE_TIMEOUT = getattr(settings, 'COUNT_CACHE_TIMEOUT', 60 * 60)
+# Generations are bumped by management commands as well as by the web
+# workers, so they live in a cache every process shares
+GENERATION_CACHE = getattr(settings, 'COUNT_GENERATION_CACHE', 'shared')
+
+
+def _generation_key(model):
+    return f"counts:generation:{model._meta.label_lower}"
+
+
+def generation(model):
+    """Current write generation of a model's table, used to version cache keys."""
+    return caches[GENERATION_CACHE].get_or_set(_generation_key(model), 1, None)
+
+
+def invalidate(model):
+    """Bump the model's generation so every cached count for it goes stale."""
+    generations, key = caches[GENERATION_CACHE], _generation_key(model)
+    try:
+        generations.incr(key)
+    except ValueError:
+        generations.set(key, 1, None)
+
+
+def estimate(queryset):
+    """
+    Planner row estimate for a queryset, or None when the backend has none.
+
+    An unfiltered table is read from pg_class.reltuples, anything else from
+    the row estimate of the top EXPLAIN node.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+
+    queryset = queryset.order_by()
+    if not queryset.query.where and not queryset.query.distinct:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        # reltuples is -1 until the table has been vacuumed or analyzed
+        if row and row[0] >= 0:
+            return row[0]
+        return None
+
+    plan = json.loads(queryset.explain(format='json'))
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def _cache_key(queryset):
+    sql, params = queryset.order_by().query.sql_with_params()
+    digest = hashlib.md5(f"{queryset.db}:{sql}:{params!r}".encode()).hexdigest()
+    return f"counts:{queryset.model._meta.label_lower}:{generation(queryset.model)}:{digest}"
+
+
+def count(queryset, exact=False):
+    """
+    Row count for a queryset.
+
+    Large results return the planner estimate unless ``exact`` is set. Exact
+    counts are cached per normalized filter and dropped by invalidate() on
+    the next write to the model.
+    """
+    if not exact:
+        approximate = estimate(queryset)
+        if approximate is not None and approximate >= ESTIMATE_THRESHOLD:
+            return approximate
+
+    key = _cache_key(queryset)
+    total = cache.get(key)
+    if total is None:
+        total = queryset.count()
+        cache.set(key, total, CACHE_TIMEOUT)
+    return total
@@ -0,0 +1,219 @@
+import json
+import logging
+import math
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, get_resolver, reverse
+
+from accounts.models import Userprofile
+from cases.models import CourtDecision, SuspectCourtRuling
+from core.models import SupportRequest
+
+NAMESPACES = ('cases', 'core', 'accounts')
+
+# Views that change data, end the session, write PDFs into MEDIA_ROOT or
+# stream whole tables are not benchmarked
+SKIP = {
+    'cases:delete_case', 'cases:export_reports', 'accounts:logout', 'cases:case_pdf', 'cases:export_cases',
+}
+
+# What each uuid in a route refers to. Routes with a single ``uuid`` that
+# are not listed here take a case.
+UUID_SOURCES = {
+    'cases:case_entry': {'uuid': 'complainant'},
+    'cases:suspect_court_ruling_entry': {'uuid': 'suspect'},
+    'cases:court_ruling_detail': {'uuid': 'decision'},
+    'cases:edit_suspect_court_ruling': {'suspect_uuid': 'suspect', 'ruling_uuid': 'ruling'},
+    'core:support_request_detail': {'uuid': 'support_request'},
+    'accounts:profile_view': {'uuid': 'profile'},
+    'accounts:edit_profile': {'uuid': 'profile'},
+}
+
+
+# Statements counted as writes, e.g. session rows saved on a read-only page
+WRITE_VERBS = ('INSERT', 'UPDATE', 'DELETE')
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of an unsorted list."""
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+class Command(BaseCommand):
+    help = (
+        "Request every GET view in the cases, core and accounts URLconfs with the test "
+        "client and write p50/p95/p99 latency, query counts and write statements to JSON. "
+        "With --baseline, fail when a view got slower or issues more queries or writes "
+        "than the stored run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument('--username', help="User to log in as; defaults to a superuser with an admin profile.")
+        parser.add_argument('--output', default='benchmarks.json')
+        parser.add_argument('--baseline', help="Earlier --output file to compare against.")
+        parser.add_argument(
+            '--tolerance', type=float, default=20.0,
+            help="Allowed p95 slowdown against the baseline, in percent.",
+        )
+        parser.add_argument('--only', nargs='*', default=[], help="URL names to run, e.g. cases:case_details.")
+
+    def handle(self, *args, **options):
+        # Every request would otherwise log its own SQL line
+        logging.getLogger('core.sql').setLevel(logging.WARNING)
+
+        samples = self.samples()
+        user, created = self.user(options['username'])
+        try:
+            client = Client()
+            client.force_login(user)
+            results = self.run(client, samples, options)
+        finally:
+            # An account made for the run is not kept
+            if created:
+                user.delete()
+
+        with open(options['output'], 'w') as output:
+            json.dump(results, output, indent=2, sort_keys=True)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {len(results)} results to {options['output']}."))
+
+        failed = sorted(name for name, result in results.items() if result['status'] != 200)
+        if failed:
+            self.stderr.write(self.style.WARNING(
+                f"{len(failed)} views did not return 200, so their timings are not of the page: {', '.join(failed)}"
+            ))
+
+        if options['baseline']:
+            self.compare(results, options['baseline'], options['tolerance'])
+
+    def run(self, client, samples, options):
+        results = {}
+        for name, kwargs in self.routes(samples):
+            if options['only'] and name not in options['only']:
+                continue
+            url = reverse(name, kwargs=kwargs)
+            results[name] = self.measure(client, url, options['iterations'], options['warmup'])
+            result = results[name]
+            self.stdout.write(
+                f"{name:45} {result['status']} p50={result['p50_ms']:8.1f}ms "
+                f"p95={result['p95_ms']:8.1f}ms p99={result['p99_ms']:8.1f}ms queries={result['queries']} "
+                f"writes={result['writes']}"
+            )
+        return results
+
+    def user(self, username):
+        """The user to log in as, and whether it was created for this run."""
+        if username:
+            try:
+                return User.objects.get(username=username), False
+            except User.DoesNotExist:
+                raise CommandError(f"No user named {username!r}.")
+        # The admin dashboard is only shown to superusers
+        user = User.objects.filter(profile__user_role='admin', is_superuser=True, is_active=True).first()
+        if user is not None:
+            return user, False
+        if User.objects.filter(username='benchmark_admin').exists():
+            raise CommandError("benchmark_admin is left from an earlier run; delete it or pass --username.")
+        user = User.objects.create_user('benchmark_admin', is_staff=True, is_superuser=True)
+        Userprofile.objects.create(user=user, id_number='BENCHMARK', user_role='admin')
+        return user, True
+
+    def samples(self):
+        ruling = SuspectCourtRuling.objects.select_related('case__complainant', 'suspect').filter(
+            case__deleted=False, case__complainant__isnull=False,
+        ).first()
+        if ruling is None:
+            raise CommandError("No case with a suspect ruling to benchmark against; run generate_dataset first.")
+        case = ruling.case
+        profile = Userprofile.objects.first()
+        return {
+            'case': case,
+            'complainant': case.complainant,
+            'suspect': ruling.suspect,
+            'ruling': ruling,
+            'witness': case.witnesses.first(),
+            'decision': CourtDecision.objects.first(),
+            'support_request': SupportRequest.objects.first(),
+            'profile': profile,
+        }
+
+    def routes(self, samples):
+        resolver = get_resolver()
+        for namespace in NAMESPACES:
+            patterns = resolver.namespace_dict[namespace][1].url_patterns
+            for pattern in patterns:
+                if isinstance(pattern, URLResolver) or not pattern.name:
+                    continue
+                name = f"{namespace}:{pattern.name}"
+                if name in SKIP:
+                    continue
+                kwargs = {}
+                for param in pattern.pattern.converters:
+                    source = UUID_SOURCES.get(name, {}).get(param) or (
+                        'case' if param == 'uuid' else param.removesuffix('_uuid')
+                    )
+                    sample = samples.get(source)
+                    if sample is None:
+                        break
+                    kwargs[param] = sample.uuid
+                else:
+                    yield name, kwargs
+
+    def measure(self, client, url, iterations, warmup):
+        for _ in range(warmup):
+            client.get(url)
+
+        timings, queries, writes, status = [], [], 0, None
+        for _ in range(iterations):
+            with CaptureQueriesContext(connection) as context:
+                start = time.perf_counter()
+                response = client.get(url)
+                timings.append((time.perf_counter() - start) * 1000)
+            queries.append(len(context))
+            writes += sum(
+                query['sql'].lstrip().upper().startswith(WRITE_VERBS) for query in context.captured_queries
+            )
+            status = response.status_code
+
+        return {
+            'path': url,
+            'status': status,
+            'p50_ms': round(percentile(timings, 50), 2),
+            'p95_ms': round(percentile(timings, 95), 2),
+            'p99_ms': round(percentile(timings, 99), 2),
+            'queries': max(queries),
+            # Summed over the iterations, so writes skipped on most requests still show
+            'writes': writes,
+        }
+
+    def compare(self, results, baseline_path, tolerance):
+        with open(baseline_path) as baseline_file:
+            baseline = json.load(baseline_file)
+
+        regressions = []
+        for name, result in sorted(results.items()):
+            before = baseline.get(name)
+            if before is None:
+                continue
+            if result['status'] != before.get('status', result['status']):
+                regressions.append(f"{name}: status {before['status']} -> {result['status']}")
+            if result['queries'] > before['queries']:
+                regressions.append(f"{name}: {before['queries']} -> {result['queries']} queries")
+            if result['writes'] > before.get('writes', result['writes']):
+                regressions.append(f"{name}: {before['writes']} -> {result['writes']} writes")
+            if result['p95_ms'] > before['p95_ms'] * (1 + tolerance / 100):
+                regressions.append(f"{name}: p95 {before['p95_ms']}ms -> {result['p95_ms']}ms")
+
+        if regressions:
+            for regression in regressions:
+                self.stderr.write(regression)
+            raise CommandError(f"{len(regressions)} regressions against {baseline_path}.")
+        self.stdout.write(self.style.SUCCESS(f"No regressions against {baseline_path}."))
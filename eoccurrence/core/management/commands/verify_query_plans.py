@@ -0,0 +1,187 @@
+import json
+import logging
+import re
+from urllib.parse import urlencode
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.urls import reverse
+
+from accounts.models import Userprofile
+from cases.models import Case, CaseEvent, Complainant, CourtDecision, HotspotCell, Suspect, Witness
+from core import counts
+
+# Tables the listings read; the rest are small enough that a scan is the right plan
+CHECKED_MODELS = (Case, CaseEvent, Complainant, CourtDecision, HotspotCell, Suspect, Witness)
+
+# SQLite names the access path in each plan row: "SEARCH t USING INDEX ..." or a bare "SCAN t"
+SQLITE_SCAN = re.compile(r'^SCAN (\S+)(.*)$')
+
+# Totals of a whole table, or of every live case, read all of it whatever the
+# indexes; core.counts answers them from the planner estimate on large tables
+# and caches them otherwise, so they are not reported
+TABLE_COUNT = re.compile(r'^SELECT COUNT\(\*\) AS "__count" FROM "(\w+)"(?: WHERE NOT "\1"\."deleted")?$')
+
+
+def shapes(officer, decision):
+    """(who, url name, query string) for each query shape the hot views produce."""
+    day = decision.decision_date.date().isoformat() if decision else '2024-01-01'
+    return [
+        ('admin', 'cases:view_cases', {}),
+        ('officer', 'cases:view_cases', {}),
+        ('officer', 'cases:search_cases', {}),
+        ('officer', 'cases:search_cases', {'status': 'open'}),
+        ('officer', 'cases:search_cases', {'recorded_by': officer.username}),
+        ('officer', 'cases:search_cases', {'query': 'theft', 'status': 'open'}),
+        ('officer', 'cases:statistics', {}),
+        ('officer', 'cases:hotspots', {}),
+        ('officer', 'cases:hotspots', {'level': 'sub_county', 'case_type': 'BURGLARY', 'weeks': 52}),
+        ('admin', 'cases:reports', {}),
+        ('officer', 'cases:reports', {}),
+        ('officer', 'cases:court_rulings_list', {}),
+        ('officer', 'cases:court_rulings_list', {'type': 'CLOSED'}),
+        ('officer', 'cases:court_rulings_list', {'start_date': day, 'end_date': day}),
+        ('admin', 'core:admin_dashboard', {}),
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Request the case listing, search, statistics, hotspot, reports, court rulings and admin "
+        "dashboard views, run EXPLAIN on every SELECT they issue and fail when one reads a "
+        "large table with a sequential scan. Run it against a generated dataset "
+        "(generate_dataset --cases 100000); free-text icontains filters cannot use a "
+        "b-tree index and are not part of the checked shapes. Runs in a transaction that is "
+        "rolled back, so accounts made for the run are not kept."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-rows', type=int, default=10000,
+            help="Only report scans of tables with at least this many rows.",
+        )
+        parser.add_argument('--analyze', action='store_true', help="Refresh planner statistics first.")
+        parser.add_argument('--verbose-plans', action='store_true', help="Print every plan.")
+
+    def handle(self, *args, **options):
+        logging.getLogger('core.sql').setLevel(logging.WARNING)
+
+        if options['analyze']:
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+
+        # Rolled back so the accounts made for the run, and their sessions, are
+        # not left behind; a superuser nobody created on purpose is a hazard
+        with transaction.atomic():
+            failures = self.check_plans(options)
+            transaction.set_rollback(True)
+
+        if failures:
+            for failure in failures:
+                self.stderr.write(failure)
+            raise CommandError(f"{len(failures)} statements scan a large table.")
+        self.stdout.write(self.style.SUCCESS("No sequential scans on large tables."))
+
+    def check_plans(self, options):
+        """A description of every statement that scans a large table."""
+        table_rows = {model._meta.db_table: self.table_rows(model) for model in CHECKED_MODELS}
+        if table_rows[Case._meta.db_table] < options['min_rows']:
+            self.stderr.write(self.style.WARNING(
+                f"Only {table_rows[Case._meta.db_table]} cases; small tables are scanned "
+                f"whatever the indexes, so no plan will be checked. Run generate_dataset first."
+            ))
+        large = {table for table, rows in table_rows.items() if rows >= options['min_rows']}
+
+        # The admin dashboard is only shown to superusers
+        clients = {
+            'admin': self.client('admin', is_staff=True, is_superuser=True),
+            'officer': self.client('police'),
+        }
+        officer = User.objects.filter(cases_reported__isnull=False).first() or User.objects.first()
+        decision = CourtDecision.objects.order_by('-decision_date').first()
+
+        failures = []
+        for who, name, params in shapes(officer, decision):
+            url = reverse(name) + (f"?{urlencode(params)}" if params else '')
+            statements = self.capture(clients[who], url)
+            for sql, params_ in statements:
+                if TABLE_COUNT.match(sql):
+                    continue
+                plan = self.explain(sql, params_)
+                scans = sorted(set(self.scanned_tables(plan)) & large)
+                if options['verbose_plans']:
+                    self.stdout.write(f"{who} {url}\n  {sql[:200]}\n  " + "\n  ".join(plan))
+                for table in scans:
+                    failures.append(f"{who} {url}: sequential scan on {table}\n  {sql[:300]}")
+            self.stdout.write(f"{who:8} {url:70} {len(statements)} statements checked")
+        return failures
+
+    def table_rows(self, model):
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                               [model._meta.db_table])
+                row = cursor.fetchone()
+            if row and row[0] > 0:
+                return row[0]
+        return model._base_manager.count()
+
+    def client(self, role, **flags):
+        user = User.objects.filter(profile__user_role=role, is_active=True, **flags).first()
+        if user is None:
+            user, _ = User.objects.update_or_create(username=f'query_plans_{role}', defaults=flags)
+            Userprofile.objects.get_or_create(
+                user=user, defaults={'id_number': f'QUERY-PLANS-{role}', 'user_role': role},
+            )
+        client = Client()
+        client.force_login(user)
+        return client
+
+    def capture(self, client, url):
+        """The SELECT statements the view runs, with their parameters."""
+        statements = []
+
+        def record(execute, sql, params, many, context):
+            if not many and sql.lstrip().upper().startswith('SELECT'):
+                statements.append((sql, params))
+            return execute(sql, params, many, context)
+
+        # Cached counts would hide the COUNT queries
+        for model in CHECKED_MODELS:
+            counts.invalidate(model)
+        with connection.execute_wrapper(record):
+            response = client.get(url)
+        if response.status_code != 200:
+            raise CommandError(f"{url} returned {response.status_code}.")
+        return statements
+
+    def explain(self, sql, params):
+        """The plan as a list of lines (PostgreSQL: one JSON document)."""
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+                plan = cursor.fetchone()[0]
+                return [json.dumps(plan) if not isinstance(plan, str) else plan]
+            if connection.vendor == 'sqlite':
+                cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+                return [row[-1] for row in cursor.fetchall()]
+            raise CommandError(f"No plan parser for {connection.vendor}.")
+
+    def scanned_tables(self, plan):
+        if connection.vendor == 'postgresql':
+            def walk(node):
+                if node.get('Node Type') == 'Seq Scan':
+                    yield node['Relation Name']
+                for child in node.get('Plans', ()):
+                    yield from walk(child)
+            for document in plan:
+                for entry in json.loads(document):
+                    yield from walk(entry['Plan'])
+        else:
+            for line in plan:
+                match = SQLITE_SCAN.match(line)
+                # "SCAN t USING [COVERING] INDEX i" walks an index, not the table
+                if match and 'INDEX' not in match.group(2):
+                    yield match.group(1)
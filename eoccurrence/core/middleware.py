@@ -0,0 +1,100 @@
+import heapq
+import json
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('core.sql')
+
+# Statements kept per request in the log line, slowest first
+SLOWEST_STATEMENTS = getattr(settings, 'SQL_LOG_SLOWEST', 3)
+# {'cases:case_details': {'queries': 20, 'db_ms': 150}, ...}; a view's entry
+# is laid over the 'default' one, so it only names the limits it changes
+QUERY_BUDGETS = getattr(settings, 'QUERY_BUDGETS', {})
+
+
+class QueryRecorder:
+    """execute_wrapper that counts and times every statement of a request."""
+
+    def __init__(self, keep=SLOWEST_STATEMENTS):
+        self.keep = keep
+        self.count = 0
+        self.duration = 0.0
+        self._slowest = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.count += 1
+            self.duration += elapsed
+            entry = (elapsed, self.count, sql)
+            if len(self._slowest) < self.keep:
+                heapq.heappush(self._slowest, entry)
+            elif self.keep:
+                heapq.heappushpop(self._slowest, entry)
+
+    def slowest(self):
+        return [
+            {'ms': round(elapsed * 1000, 2), 'sql': sql[:500]}
+            for elapsed, _, sql in sorted(self._slowest, reverse=True)
+        ]
+
+
+class SQLInstrumentationMiddleware:
+    """
+    Count and time the SQL run by each request. Adds a Server-Timing header,
+    logs one JSON line per request under 'core.sql' keyed by the resolved URL
+    name, and warns when the view goes over its QUERY_BUDGETS entry.
+
+    Queries run while a streaming response is consumed happen after this
+    middleware returns and are not counted.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        total_ms = (time.perf_counter() - start) * 1000
+        db_ms = recorder.duration * 1000
+
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else None
+
+        response['Server-Timing'] = (
+            f'db;dur={db_ms:.1f};desc="{recorder.count} queries", total;dur={total_ms:.1f}'
+        )
+
+        record = {
+            'view': view,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': recorder.count,
+            'db_ms': round(db_ms, 2),
+            'total_ms': round(total_ms, 2),
+            'slowest': recorder.slowest(),
+        }
+        logger.info(json.dumps(record), extra={'sql_stats': record})
+
+        budget = {**QUERY_BUDGETS.get('default', {}), **QUERY_BUDGETS.get(view, {})}
+        if budget:
+            over = []
+            if 'queries' in budget and recorder.count > budget['queries']:
+                over.append(f"{recorder.count} queries > {budget['queries']}")
+            if 'db_ms' in budget and db_ms > budget['db_ms']:
+                over.append(f"{db_ms:.1f}ms > {budget['db_ms']}ms")
+            if over:
+                logger.warning("Query budget exceeded for %s: %s", view or request.path, ", ".join(over))
+        return response
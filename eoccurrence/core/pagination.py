@@ -0,0 +1,159 @@
+import base64
+import datetime
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+from . import counts
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def _exact(value):
+    # Not DjangoJSONEncoder, which cuts datetimes to milliseconds: the cursor
+    # would then seek past rows in the same millisecond as the one it names
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    return str(value)
+
+
+class CursorPage:
+    """
+    One page of a CursorPaginator. Iterates like a Paginator page and exposes
+    has_next/has_previous plus the opaque tokens for the neighbouring pages.
+    """
+
+    def __init__(self, object_list, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """
+    Keyset paginator. Pages are located with a WHERE on the ordering columns
+    instead of OFFSET, so page N costs the same as page 1, and no COUNT(*) is
+    needed to know whether another page exists.
+
+    ``ordering`` must end with a unique column (usually ``-id``) so every row
+    has a distinct position, e.g. ``('-created_at', '-id')``.
+    """
+
+    def __init__(self, queryset, per_page, ordering=('-created_at', '-id')):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.fields = [field.lstrip('-') for field in self.ordering]
+
+    def encode_cursor(self, obj, direction):
+        position = [getattr(obj, field) for field in self.fields]
+        payload = json.dumps([direction, position], default=_exact)
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            direction, position = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        except (ValueError, TypeError):
+            raise InvalidCursor(cursor)
+
+        if direction not in ('next', 'previous') or not isinstance(position, list) \
+                or len(position) != len(self.fields):
+            raise InvalidCursor(cursor)
+
+        try:
+            position = [
+                self.queryset.model._meta.get_field(field).to_python(value)
+                for field, value in zip(self.fields, position)
+            ]
+        except ValidationError:
+            raise InvalidCursor(cursor)
+        return direction, position
+
+    def _seek(self, position, reverse):
+        # Expands (a, b, id) < (x, y, z) into
+        # a < x OR (a = x AND b < y) OR (a = x AND b = y AND id < z)
+        condition = Q()
+        for index, ordering in enumerate(self.ordering):
+            descending = ordering.startswith('-') != reverse
+            lookup = 'lt' if descending else 'gt'
+
+            term = Q(**{f"{self.fields[index]}__{lookup}": position[index]})
+            for previous in range(index):
+                term &= Q(**{self.fields[previous]: position[previous]})
+            condition |= term
+        return condition
+
+    def _reversed_ordering(self):
+        return [
+            ordering[1:] if ordering.startswith('-') else f"-{ordering}"
+            for ordering in self.ordering
+        ]
+
+    def page(self, cursor=None):
+        direction, position = ('next', None) if not cursor else self.decode_cursor(cursor)
+        backwards = direction == 'previous'
+
+        queryset = self.queryset.order_by(
+            *(self._reversed_ordering() if backwards else self.ordering)
+        )
+        if position is not None:
+            queryset = queryset.filter(self._seek(position, reverse=backwards))
+
+        # Fetch one extra row to learn whether there is anything beyond this page
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+
+        if backwards:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, position is not None
+
+        next_cursor = self.encode_cursor(rows[-1], 'next') if rows and has_next else None
+        previous_cursor = self.encode_cursor(rows[0], 'previous') if rows and has_previous else None
+        return CursorPage(rows, next_cursor, previous_cursor)
+
+    def get_page(self, cursor=None):
+        """Like page(), but falls back to the first page on a malformed cursor."""
+        try:
+            return self.page(cursor)
+        except InvalidCursor:
+            return self.page()
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Paginator whose total comes from core.counts: a planner estimate for large
+    results, otherwise an exact count cached until the next write.
+    """
+
+    @cached_property
+    def count(self):
+        if hasattr(self.object_list, 'query'):
+            return counts.count(self.object_list)
+        return len(self.object_list)
@@ -1,3 +1,191 @@
+import datetime
+import json
+import os
+import tempfile
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.cache.backends.db import DatabaseCache
+from django.core.management import CommandError, call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import Userprofile
+from cases.models import Case
+
+from . import counts, middleware
+from .models import SupportRequest
+from .pagination import CachedCountPaginator, CursorPaginator
+
+
+class CursorPaginatorTests(TestCase):
+    def setUp(self):
+        start = timezone.make_aware(datetime.datetime(2025, 1, 1, 12))
+        # 25 rows, several in each millisecond, numbered oldest first
+        self.ids = []
+        for n in range(25):
+            request = SupportRequest.objects.create(message=f"Request {n + 1}")
+            SupportRequest.objects.filter(pk=request.pk).update(
+                created_at=start + datetime.timedelta(microseconds=n * 300),
+            )
+            self.ids.append(request.pk)
+        self.ids.reverse()  # Newest first, as listed
+
+    def pages(self, per_page=10):
+        paginator = CursorPaginator(SupportRequest.objects.all(), per_page)
+        return paginator, paginator.page()
+
+    def test_next_pages_list_every_row_once(self):
+        paginator, page = self.pages()
+        seen = [request.pk for request in page]
+        while page.has_next():
+            page = paginator.page(page.next_cursor)
+            seen += [request.pk for request in page]
+        self.assertEqual(seen, self.ids)
+
+    def test_previous_returns_to_the_same_page(self):
+        paginator, first = self.pages()
+        second = paginator.page(first.next_cursor)
+        third = paginator.page(second.next_cursor)
+        self.assertEqual([request.pk for request in third], self.ids[20:])
+        self.assertFalse(third.has_next())
+
+        back = paginator.page(third.previous_cursor)
+        self.assertEqual([request.pk for request in back], self.ids[10:20])
+        back = paginator.page(back.previous_cursor)
+        self.assertEqual([request.pk for request in back], self.ids[:10])
+        self.assertFalse(back.has_previous())
+
+    def test_malformed_cursor_gives_first_page(self):
+        paginator, first = self.pages()
+        self.assertEqual(list(paginator.get_page("not-a-cursor")), list(first))
+
+
+class CountTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.case = Case.objects.create(title="Theft", status="open")
+
+    def test_case_writes_bump_the_generation(self):
+        before = counts.generation(Case)
+        self.case.save()
+        self.assertEqual(counts.generation(Case), before + 1)
+        self.case.delete()
+        self.assertEqual(counts.generation(Case), before + 2)
+
+    def test_exact_counts_are_cached_until_a_write(self):
+        open_cases = Case.objects.filter(status="open")
+        self.assertEqual(counts.count(open_cases), 1)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(counts.count(Case.objects.filter(status="open")), 1)
+        # Only the shared generation is read, the count comes from the local cache
+        self.assertEqual(len(queries), 1)
+        self.assertIn("shared_cache", queries[0]["sql"])
+
+        Case.objects.create(title="Assault", status="open")
+        self.assertEqual(counts.count(open_cases), 2)
+        Case.all_with_deleted.get(pk=self.case.pk).delete()
+        self.assertEqual(counts.count(open_cases), 1)
+
+    def test_generation_is_shared_between_processes(self):
+        # Another process has its own local cache but reads the same shared one
+        other = DatabaseCache("shared_cache", {})
+        open_cases = Case.objects.filter(status="open")
+        self.assertEqual(counts.count(open_cases), 1)
+
+        counts.invalidate(Case)
+        self.assertEqual(other.get(counts._generation_key(Case)), counts.generation(Case))
+
+        Case.objects.bulk_create([Case(title="Imported", case_number="X-1", status="open")])
+        other.incr(counts._generation_key(Case))
+        self.assertEqual(counts.count(open_cases), 2)
+
+    def test_large_results_use_the_planner_estimate(self):
+        with mock.patch.object(counts, "estimate", return_value=counts.ESTIMATE_THRESHOLD) as estimate:
+            with self.assertNumQueries(0):
+                self.assertEqual(counts.count(Case.objects.all()), counts.ESTIMATE_THRESHOLD)
+                paginator = CachedCountPaginator(Case.objects.order_by("pk"), 10)
+                self.assertEqual(paginator.count, counts.ESTIMATE_THRESHOLD)
+            self.assertEqual(counts.count(Case.objects.all(), exact=True), 1)
+        self.assertEqual(estimate.call_count, 2)
+
+        # Below the threshold the exact count is used
+        with mock.patch.object(counts, "estimate", return_value=counts.ESTIMATE_THRESHOLD - 1):
+            self.assertEqual(counts.count(Case.objects.all()), 1)
+
+    def test_estimate_is_only_read_from_postgres(self):
+        if counts.estimate(Case.objects.all()) is not None:
+            self.skipTest("Backend has planner estimates")
+        self.assertIsNone(counts.estimate(Case.objects.filter(status="open")))
+
+
+class QueryBudgetTests(TestCase):
+    def test_view_budget_keeps_default_limits_it_does_not_name(self):
+        user = User.objects.create_user("officer")
+        Userprofile.objects.create(user=user, id_number="ID1", user_role="police")
+        self.client.force_login(user)
+        budgets = {"default": {"queries": 1000, "db_ms": 0}, "cases:view_cases": {"queries": 1000}}
+        with mock.patch.object(middleware, "QUERY_BUDGETS", budgets), self.assertLogs("core.sql", "WARNING") as logs:
+            self.client.get(reverse("cases:view_cases"))
+        self.assertEqual(len(logs.records), 1)
+        self.assertIn("Query budget exceeded for cases:view_cases", logs.output[0])
+        self.assertIn("ms > 0ms", logs.output[0])
+        self.assertNotIn("queries >", logs.output[0])
+
+
+class BenchmarkCommandTests(TestCase):
+    def setUp(self):
+        call_command("generate_dataset", cases=20, officers=2, seed=3, stdout=open(os.devnull, "w"))
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.output = os.path.join(directory.name, "benchmarks.json")
+
+    def run_benchmarks(self, only=("cases:view_cases", "cases:case_details"), **options):
+        call_command(
+            "run_benchmarks", iterations=3, warmup=1, output=self.output, only=list(only),
+            stdout=open(os.devnull, "w"), **options,
+        )
+        with open(self.output) as output:
+            return json.load(output)
+
+    def test_results_and_baseline_comparison(self):
+        results = self.run_benchmarks()
+        self.assertEqual(set(results), {"cases:view_cases", "cases:case_details"})
+        for result in results.values():
+            self.assertEqual(result["status"], 200)
+            self.assertGreater(result["queries"], 0)
+
+        baseline = os.path.join(os.path.dirname(self.output), "baseline.json")
+        for result in results.values():
+            result["p95_ms"] = 10 ** 6
+        with open(baseline, "w") as baseline_file:
+            json.dump(results, baseline_file)
+        self.run_benchmarks(baseline=baseline)
+
+        results["cases:view_cases"]["queries"] = 0
+        with open(baseline, "w") as baseline_file:
+            json.dump(results, baseline_file)
+        with self.assertRaises(CommandError):
+            self.run_benchmarks(baseline=baseline, stderr=open(os.devnull, "w"))
+
+
+    def test_superuser_made_for_the_run_is_removed(self):
+        results = self.run_benchmarks(only=["core:admin_dashboard"])
+        self.assertEqual(results["core:admin_dashboard"]["status"], 200)
+        self.assertFalse(User.objects.filter(username="benchmark_admin").exists())
+
+
+class QueryPlanCommandTests(TestCase):
+    def test_run_leaves_no_accounts_behind(self):
+        call_command("generate_dataset", cases=10, officers=1, seed=5, stdout=open(os.devnull, "w"))
+        users = set(User.objects.values_list("username", "is_superuser"))
+
+        call_command("verify_query_plans", stdout=open(os.devnull, "w"), stderr=open(os.devnull, "w"))
+
+        self.assertEqual(set(User.objects.values_list("username", "is_superuser")), users)
+        self.assertFalse(User.objects.filter(username__startswith="query_plans_").exists())
 
-# Create your tests here.
@@ -5,7 +5,7 @@ from django.contrib.auth.decorators import user_passes_test
 from django.contrib.auth.models import User
 from django.contrib import messages
 
-from django.core.paginator import Paginator
+from .pagination import CursorPaginator
 
 from .models import SupportRequest
 
@@ -13,7 +13,7 @@ from .forms import SupportRequestForm
 
 from accounts.models import Userprofile
 
-from cases.models import Case, CourtDecision
+from cases.models import Case, CaseEvent, CourtDecision
 
 from django.contrib.auth.decorators import login_required
 
@@ -67,8 +67,10 @@ def admin_dashboard(request):
     recent_cases = Case.objects.order_by("-created_at")[:5]
     recent_decisions = CourtDecision.objects.order_by("-decision_date")[:5]
     recent_support = SupportRequest.objects.order_by("-created_at")[:5]
-    recent_users = User.objects.order_by("-date_joined")[:5]
-    recently_deleted_cases = Case.objects.filter(deleted=True).order_by("-deleted_at")[:5]
+    recent_users = User.objects.select_related("profile").order_by("-date_joined")[:5]
+    recently_deleted_cases = Case.all_with_deleted.filter(deleted=True).order_by("-deleted_at")[:5]
+    # Cases by primary key rather than a join, so the feed stays one index range scan
+    recent_events = CaseEvent.objects.select_related("actor").prefetch_related("case").order_by("-occurred_at", "-id")[:10]
 
     context = {
         # Quick stats
@@ -84,18 +86,18 @@ def admin_dashboard(request):
         "recent_decisions": recent_decisions,
         "recent_support": recent_support,
         "recent_users": recent_users,
-        "recently_deleted_cases": recently_deleted_cases
+        "recently_deleted_cases": recently_deleted_cases,
+        "recent_events": recent_events,
     }
 
     return render(request, "core/admin_dashboard.html", context)
 
 def support_requests_list(request):
-    requests = SupportRequest.objects.all().order_by('-created_at')
+    requests = SupportRequest.objects.all()
     
-    # Paginate — display 10 per page
-    paginator = Paginator(requests, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Paginate — display 10 per page, newest first
+    paginator = CursorPaginator(requests, 10, ordering=('-created_at', '-id'))
+    page_obj = paginator.get_page(request.GET.get('cursor'))
 
     return render(request, 'core/support_requests_list.html', {'page_obj': page_obj})
 
@@ -36,8 +36,14 @@ LOGOUT_REDIRECT_URL = '/'
 
 SESSION_COOKIE_AGE = 30 * 60  # 30 minutes
 SESSION_SAVE_EVERY_REQUEST = True  # Reset timeout on every request
+# Cached sessions whose row is only rewritten when the data changes or a tenth
+# of the expiry age has passed, see accounts/sessions.py
+SESSION_ENGINE = 'accounts.sessions'
 SESSION_EXPIRE_AT_BROWSER_CLOSE = False  # Allows Remember Me to persist sessions
 
+# last_activity heartbeats are buffered per process, see accounts/activity.py
+ACTIVITY_FLUSH_INTERVAL = 30
+
 # Secure cookies (for production)
 SESSION_COOKIE_SECURE = True
 CSRF_COOKIE_SECURE = True
@@ -59,11 +65,13 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.SQLInstrumentationMiddleware',  # Query counts/timings per request, first so it sees everything
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'accounts.middleware.PrincipalMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 
@@ -112,6 +120,20 @@ DATABASES = {
 }
 '''
 
+# Each process keeps its own local cache for rendered fragments and counts.
+# What every process must agree on, the write generations that retire those
+# entries and the per-user export slots, lives in the database (created by
+# createcachetable), so a management command's writes reach the web workers.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'shared_cache',
+    },
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -158,6 +180,33 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Per-view SQL budgets checked by core.middleware.SQLInstrumentationMiddleware;
+# going over logs a warning. A view's entry overrides the limits it names in
+# 'default' and keeps the others.
+QUERY_BUDGETS = {
+    'default': {'queries': 30, 'db_ms': 250},
+    'cases:case_details': {'queries': 15},
+    'cases:view_cases': {'queries': 12},
+    'core:admin_dashboard': {'queries': 40},
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        # WARNING reports budget overruns only; set SQL_LOG_LEVEL=INFO to
+        # log the SQL summary of every request
+        'core.sql': {
+            'handlers': ['console'],
+            'level': os.environ.get('SQL_LOG_LEVEL', 'WARNING'),
+            'propagate': False,
+        },
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -0,0 +1,12 @@
+"""Gunicorn settings, read from the working directory by the start command in render.yaml."""
+
+
+def worker_exit(server, worker):
+    # Heartbeats buffered since the last request-end flush, see accounts/activity.py.
+    # Only once the worker loaded the app, or there is no Django to flush with.
+    from django.apps import apps
+
+    if apps.ready:
+        from accounts import activity
+
+        activity.flush_on_exit()